@@ -0,0 +1,228 @@
+"""Append-only per-ticker OHLCV store.
+
+Keeps the full daily (or coarser) history for each (ticker, interval) in SQLite and
+only asks Yahoo for the bars after the last stored one. Bars are stored one row each,
+so an update writes just the new tail instead of re-serializing the whole frame.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from .periods import period_start, slice_period, is_known_period
+
+_BAR_STORE_PATH = os.getenv('YF_BAR_STORE_PATH', os.path.join(os.getcwd(), '.cache', 'yf_bars.sqlite'))
+
+# intraday intervals have range limits on Yahoo's side, only daily-or-coarser bars are stored
+STORE_INTERVALS = ('1d', '5d', '1wk', '1mo', '3mo')
+
+# frame column -> table column
+_COLUMNS = [
+    ('Open', 'open'),
+    ('High', 'high'),
+    ('Low', 'low'),
+    ('Close', 'close'),
+    ('Adj Close', 'adj_close'),
+    ('Volume', 'volume'),
+    ('Dividends', 'dividends'),
+    ('Stock Splits', 'splits'),
+]
+
+# covered_from value meaning "the whole history ('max') is stored"
+_COVERED_ALL = -(2 ** 62)
+
+
+class BarStore:
+    def __init__(self, path: str = _BAR_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        c = self._conn.cursor()
+        try:
+            c.execute('PRAGMA journal_mode=WAL')
+        except Exception:
+            pass
+        cols = ', '.join(f'{col} REAL' for _, col in _COLUMNS)
+        c.execute(f'''CREATE TABLE IF NOT EXISTS bars (ticker TEXT, interval TEXT, ts INTEGER, {cols},
+                      PRIMARY KEY (ticker, interval, ts)) WITHOUT ROWID''')
+        c.execute('''CREATE TABLE IF NOT EXISTS bar_meta (ticker TEXT, interval TEXT, tz TEXT,
+                     covered_from INTEGER, updated REAL, PRIMARY KEY (ticker, interval))''')
+        self._conn.commit()
+
+    def meta(self, ticker: str, interval: str) -> Optional[Tuple[str, int, float]]:
+        """Return (tz, covered_from, updated) or None when nothing is stored."""
+        with self._lock:
+            c = self._conn.cursor()
+            c.execute('SELECT tz, covered_from, updated FROM bar_meta WHERE ticker = ? AND interval = ?', (ticker, interval))
+            return c.fetchone()
+
+    def load(self, ticker: str, interval: str, start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        m = self.meta(ticker, interval)
+        if m is None:
+            return pd.DataFrame()
+        tz = m[0]
+        names = ', '.join(col for _, col in _COLUMNS)
+        sql = f'SELECT ts, {names} FROM bars WHERE ticker = ? AND interval = ?'
+        params = [ticker, interval]
+        if start is not None:
+            sql += ' AND ts >= ?'
+            params.append(int(start.timestamp()))
+        sql += ' ORDER BY ts'
+        with self._lock:
+            c = self._conn.cursor()
+            c.execute(sql, params)
+            rows = c.fetchall()
+        if not rows:
+            return pd.DataFrame()
+        arr = np.array(rows, dtype='float64')
+        idx = pd.to_datetime(arr[:, 0].astype('int64'), unit='s', utc=True)
+        if tz:
+            idx = idx.tz_convert(tz)
+        idx.name = 'Date'
+        data = {}
+        for i, (name, _) in enumerate(_COLUMNS, start=1):
+            col = arr[:, i]
+            if np.isnan(col).all():
+                continue
+            data[name] = col
+        if 'Volume' in data:
+            data['Volume'] = np.nan_to_num(data['Volume']).astype('int64')
+        return pd.DataFrame(data, index=idx)
+
+    def _rows(self, ticker: str, interval: str, df: pd.DataFrame):
+        idx = df.index
+        if idx.tz is None:
+            idx = idx.tz_localize('UTC')
+        ts = (idx.asi8 // 10 ** 9).tolist()
+        cols = []
+        for name, _ in _COLUMNS:
+            if name in df.columns:
+                cols.append(pd.to_numeric(df[name], errors='coerce').astype('float64').tolist())
+            else:
+                cols.append([None] * len(df))
+        for i, t in enumerate(ts):
+            yield (ticker, interval, t) + tuple(None if v != v else v for v in (c[i] for c in cols))
+
+    def _write(self, ticker: str, interval: str, df: pd.DataFrame, from_ts: Optional[int], covered_from: Optional[int]):
+        """Delete stored bars at/after from_ts (all when None), insert df and update meta in one transaction."""
+        tz = str(df.index.tz) if getattr(df.index, 'tz', None) is not None else ''
+        marks = ', '.join('?' * (len(_COLUMNS) + 3))
+        with self._lock:
+            c = self._conn.cursor()
+            try:
+                if from_ts is None:
+                    c.execute('DELETE FROM bars WHERE ticker = ? AND interval = ?', (ticker, interval))
+                else:
+                    c.execute('DELETE FROM bars WHERE ticker = ? AND interval = ? AND ts >= ?', (ticker, interval, from_ts))
+                c.executemany(f'INSERT OR REPLACE INTO bars VALUES ({marks})', self._rows(ticker, interval, df))
+                if covered_from is None:
+                    c.execute('UPDATE bar_meta SET updated = ? WHERE ticker = ? AND interval = ?', (time.time(), ticker, interval))
+                else:
+                    c.execute('REPLACE INTO bar_meta (ticker, interval, tz, covered_from, updated) VALUES (?, ?, ?, ?, ?)',
+                              (ticker, interval, tz, covered_from, time.time()))
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def replace(self, ticker: str, interval: str, df: pd.DataFrame, covered_from: int):
+        self._write(ticker, interval, df, None, covered_from)
+
+    def append(self, ticker: str, interval: str, tail: pd.DataFrame):
+        """Merge a freshly fetched tail: bars at/after its first timestamp are overwritten."""
+        if tail is None or tail.empty:
+            return
+        first = tail.index[0]
+        if first.tzinfo is None:
+            first = first.tz_localize('UTC')
+        self._write(ticker, interval, tail, int(first.timestamp()), None)
+
+    def clear(self, ticker: Optional[str] = None):
+        with self._lock:
+            c = self._conn.cursor()
+            if ticker is None:
+                c.execute('DELETE FROM bars')
+                c.execute('DELETE FROM bar_meta')
+            else:
+                c.execute('DELETE FROM bars WHERE ticker = ?', (ticker,))
+                c.execute('DELETE FROM bar_meta WHERE ticker = ?', (ticker,))
+            self._conn.commit()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> BarStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BarStore()
+        return _store
+
+
+def _has_actions(df: pd.DataFrame) -> bool:
+    """True when the frame carries a dividend or split, which rewrites past Adj Close values."""
+    for col in ('Dividends', 'Stock Splits'):
+        if col in df.columns:
+            try:
+                if (df[col].fillna(0) != 0).any():
+                    return True
+            except Exception:
+                pass
+    return False
+
+
+def get_history(ticker: str, period: str, interval: str, fetch: Callable[..., pd.DataFrame],
+                store: Optional[BarStore] = None, stats=None) -> pd.DataFrame:
+    """Return `period` of bars for ticker, fetching only the missing tail when possible.
+
+    `fetch` is called with either period=... (full download) or start=... (tail download)
+    and must return a yfinance-style history frame. `stats` is an optional
+    metrics.MetricsRegistry that counts tail and full fetches.
+    """
+    if store is None:
+        store = get_store()
+    if not is_known_period(period):
+        return fetch(period=period)
+    start = period_start(period)
+    need_from = _COVERED_ALL if start is None else int(start.timestamp())
+
+    m = store.meta(ticker, interval)
+    stored = store.load(ticker, interval) if m is not None else pd.DataFrame()
+    if m is not None and m[1] <= need_from and not stored.empty:
+        last = stored.index[-1]
+        # refetch from the last stored bar: it may have been an unfinished session
+        tail = fetch(start=last.strftime('%Y-%m-%d'))
+        if tail is None:
+            tail = pd.DataFrame()
+        tail = tail[tail.index >= last] if not tail.empty else tail
+        if _has_actions(tail[tail.index > last]) or (_has_actions(tail[tail.index == last]) and not _has_actions(stored.iloc[-1:])):
+            # adjusted closes changed retroactively, the stored history is stale
+            full = fetch(period=period if start is not None else 'max')
+            if full is None:
+                full = pd.DataFrame()
+            store.replace(ticker, interval, full, need_from)
+            if stats is not None:
+                stats.incr('bar_store_full_fetches')
+            return slice_period(full, period)
+        if not tail.empty:
+            store.append(ticker, interval, tail)
+            stored = pd.concat([stored[stored.index < tail.index[0]], tail])
+        if stats is not None:
+            stats.incr('bar_store_tail_fetches')
+        return slice_period(stored, period)
+
+    full = fetch(period=period)
+    if full is None:
+        full = pd.DataFrame()
+    if not full.empty:
+        # the stored range was narrower than this request, the full download supersedes it
+        store.replace(ticker, interval, full, need_from)
+    if stats is not None:
+        stats.incr('bar_store_full_fetches')
+    return full
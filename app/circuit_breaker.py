@@ -0,0 +1,145 @@
+"""Negative caching for bad symbols and a circuit breaker for Yahoo outages."""
+import threading
+import time
+from typing import Hashable, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Yahoo while the breaker is open."""
+
+
+def is_symbol_error(exc: BaseException) -> bool:
+    """True when Yahoo answered but the symbol has no timezone / price data (delisted, mistyped)."""
+    if type(exc).__name__ in ('YFTzMissingError', 'YFPricesMissingError', 'YFTickerMissingError'):
+        return True
+    msg = str(exc).lower()
+    return 'possibly delisted' in msg or 'no timezone found' in msg or 'symbol may be delisted' in msg
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status carried by requests/curl_cffi HTTPError (exc.response) or urllib's (exc.code)."""
+    code = getattr(getattr(exc, 'response', None), 'status_code', None)
+    if code is None:
+        code = getattr(exc, 'code', None)
+    return code if isinstance(code, int) else None
+
+
+def is_outage_error(exc: BaseException) -> bool:
+    """True for errors that say Yahoo itself is unavailable (not a bad symbol or a 429).
+
+    Decided by exception type and HTTP status only: connection failures and timeouts
+    (builtin, requests or curl_cffi), YFDataException (yfinance's "Yahoo is currently
+    down" page) and 500/502/503/504 responses.
+    """
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    for cls in type(exc).__mro__:
+        if cls.__name__ in ('ConnectionError', 'Timeout', 'ReadTimeout', 'ConnectTimeout', 'YFDataException'):
+            return True
+    return _status_code(exc) in (500, 502, 503, 504)
+
+
+class NegativeCache:
+    """{key: (expires_at, reason)} for lookups known to fail, each kept for `ttl` seconds
+    unless mark() is given its own ttl."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Return the recorded reason if key is still negatively cached."""
+        with self._lock:
+            e = self._data.get(key)
+            if e is None:
+                return None
+            if time.time() >= e[0]:
+                del self._data[key]
+                return None
+            return e[1]
+
+    def mark(self, key: Hashable, reason: str, ttl: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (time.time() + (self.ttl if ttl is None else ttl), reason)
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive outage failures. While open, calls are
+    refused for `reset_timeout` seconds; then one probe is let through (half-open) and its
+    outcome closes or re-opens the breaker."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opens = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._probing = False
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go out now."""
+        if not self.allow():
+            raise CircuitOpenError('Yahoo circuit breaker is open')
+
+    def on_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release(self):
+        """End a half-open probe whose outcome says nothing about Yahoo's health."""
+        with self._lock:
+            self._probing = False
+
+    def on_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opens += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'state': self._state, 'failures': self._failures, 'opens': self.opens, 'rejected': self.rejected}
@@ -1,22 +1,40 @@
 import os
 import time
 import yfinance as yf
+import numpy as np
 import pandas as pd
-from typing import Optional
+from typing import Iterable, Optional
 import sqlite3
 import logging
 from logging.handlers import RotatingFileHandler
 import queue
-import pickle
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 import math
+import warnings
+import asyncio
+import atexit
+import json
+
+from . import bar_store, frame_codec, indicator_memo, info_cache, metrics, parquet_archive, shared_cache, tiered_cache
+from .singleflight import SingleFlight
+from .history_cache import HistoryCache
+from .rate_limiter import AdaptiveRateLimiter, is_rate_limit_error
+from .circuit_breaker import OPEN as CB_OPEN, CircuitBreaker, CircuitOpenError, NegativeCache, is_outage_error, is_symbol_error
 
-# simple in-memory cache for histories: { (ticker, period, interval): (timestamp, df) }
-_HISTORY_CACHE = {}
 _CACHE_TTL = int(os.getenv('YF_CACHE_TTL', '60'))  # seconds (env override)
+# in-memory LRU for histories: { (ticker, period, interval): (timestamp, df) }, bounded by frame bytes
+_HISTORY_CACHE_MAX_MB = float(os.getenv('YF_HISTORY_CACHE_MAX_MB', '256'))
+_HISTORY_CACHE_MAX_AGE = float(os.getenv('YF_HISTORY_CACHE_MAX_AGE', '3600'))  # drop entries older than this
+_HISTORY_CACHE = HistoryCache(int(_HISTORY_CACHE_MAX_MB * 1024 * 1024), max_age=_HISTORY_CACHE_MAX_AGE)
 _USE_SQLITE_CACHE = os.getenv('YF_USE_SQLITE_CACHE', '0') == '1'
 _SQLITE_CACHE_PATH = os.path.join(os.getcwd(), '.cache', 'yf_cache.sqlite')
+# cross-process mmap tier in front of sqlite (see app/shared_cache.py)
+_USE_SHARED_CACHE = os.getenv('YF_USE_SHARED_CACHE', '0') == '1'
+# long-term parquet archive of daily+ bars behind sqlite (needs pyarrow or fastparquet)
+_USE_ARCHIVE = os.getenv('YF_USE_PARQUET_ARCHIVE', '0') == '1'
+# persistent per-ticker bar store: refetch only the tail since the last stored bar
+_USE_BAR_STORE = os.getenv('YF_USE_BAR_STORE', '0') == '1'
 os.makedirs(os.path.dirname(_SQLITE_CACHE_PATH), exist_ok=True)
 
 # logging for data_fetcher
@@ -36,18 +54,69 @@ _SQLITE_POOL_SIZE = int(os.getenv('YF_SQLITE_POOL_SIZE', '4'))
 _conn_pool = queue.Queue(maxsize=_SQLITE_POOL_SIZE)
 _pool_lock = threading.Lock()
 
-# metrics
-_metrics = {
-    'cache_hits': 0,
-    'cache_misses': 0,
-    'chunk_successes': 0,
-    'chunk_failures': 0,
-    'per_chunk_retries': 0,
-}
+# metrics: thread-safe counters plus per-operation latency histograms (see app/metrics.py)
+_metrics = metrics.registry
+for _name in ('cache_hits', 'cache_misses', 'chunk_successes', 'chunk_failures', 'per_chunk_retries',
+              'bar_store_tail_fetches', 'bar_store_full_fetches', 'inflight_dedup', 'period_slices',
+              'throttle_events', 'info_hits', 'info_misses', 'stale_served', 'revalidations',
+              'sqlite_write_batches', 'sqlite_rows_written', 'sqlite_expired', 'sqlite_evictions',
+              'shared_hits', 'shared_misses', 'negative_hits', 'negative_marks', 'outage_errors',
+              'breaker_served_stale'):
+    _metrics.incr(_name, 0)
+_METRICS_DUMP_PATH = os.getenv('YF_METRICS_DUMP_PATH', os.path.join(os.getcwd(), 'logs', 'metrics.json'))
+
+# Ticker.info cache with static/fundamental/price freshness classes, persisted unless disabled
+_INFO_CACHE_PERSIST = os.getenv('YF_INFO_CACHE_PERSIST', '1') == '1'
+_info_cache = info_cache.InfoCache() if _INFO_CACHE_PERSIST else info_cache.InfoCache(path=None)
+
+# stale-while-revalidate: serve expired cache entries immediately and refresh them in the background
+_STALE_WHILE_REVALIDATE = os.getenv('YF_STALE_WHILE_REVALIDATE', '0') == '1'
+_revalidating = set()
+_revalidate_lock = threading.Lock()
+
+_shared = None
+
+
+def _shared_cache() -> shared_cache.SharedHistoryCache:
+    global _shared
+    if _shared is None:
+        _shared = shared_cache.SharedHistoryCache()
+    return _shared
+
+
+# in-flight registry: concurrent callers for the same key wait on one fetch
+_inflight = SingleFlight()
 
 
 def get_cache_stats():
-    return dict(_metrics)
+    stats = _metrics.counters()
+    for k, v in _HISTORY_CACHE.stats().items():
+        stats[f'history_cache_{k}'] = v
+    for k, v in _maint_report.items():
+        stats[f'sqlite_cache_{k}'] = v
+    for k, v in get_breaker_stats().items():
+        stats[f'breaker_{k}'] = v
+    # indicator_memo_hits / _misses are already registry counters
+    memo = indicator_memo.get_memo_stats()['total']
+    for k in ('hit_ratio', 'entries', 'invalidations'):
+        stats[f'indicator_memo_{k}'] = memo[k]
+    return stats
+
+
+def get_metrics() -> dict:
+    """Counters, p50/p95/p99 latency per operation and the slowest recent calls by ticker."""
+    snap = _metrics.snapshot()
+    snap['counters'] = get_cache_stats()
+    return snap
+
+
+def dump_metrics(path: Optional[str] = None) -> str:
+    """Write get_metrics() as JSON (default logs/metrics.json or YF_METRICS_DUMP_PATH)."""
+    path = path or _METRICS_DUMP_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(get_metrics(), f, ensure_ascii=False, indent=2, default=str)
+    return path
 
 
 def _get_conn():
@@ -89,41 +158,98 @@ _SQLITE_MAX_RETRIES = int(os.getenv('YF_SQLITE_MAX_RETRIES', '5'))
 _SQLITE_RETRY_DELAY = float(os.getenv('YF_SQLITE_RETRY_DELAY', '0.08'))
 _YF_MAX_WORKERS = int(os.getenv('YF_MAX_WORKERS', '6'))
 _YF_BATCH_SIZE = int(os.getenv('YF_BATCH_SIZE', '20'))
+# max chunk downloads in flight for the async bulk engine
+_YF_MAX_CONCURRENCY = int(os.getenv('YF_MAX_CONCURRENCY', str(_YF_MAX_WORKERS)))
 
-# rate limiter settings
+# rate limiter settings: one adaptive bucket per Yahoo endpoint
 _RATE_LIMIT_PER_SEC = float(os.getenv('YF_RATE_LIMIT_PER_SEC', '5'))
-_tokens = _RATE_LIMIT_PER_SEC
-_last_refill = time.time()
-_token_lock = threading.Lock()
-
-
-def _acquire_token():
-    """Simple token bucket: block until a token is available."""
-    global _tokens, _last_refill
-    with _token_lock:
-        now = time.time()
-        elapsed = now - _last_refill
-        # refill
-        refill = elapsed * _RATE_LIMIT_PER_SEC
-        if refill > 0:
-            _tokens = min(_RATE_LIMIT_PER_SEC, _tokens + refill)
-            _last_refill = now
-        if _tokens >= 1:
-            _tokens -= 1
-            return
-    # if no token, sleep small increments until available
-    while True:
-        time.sleep(0.2)
-        with _token_lock:
-            now = time.time()
-            elapsed = now - _last_refill
-            refill = elapsed * _RATE_LIMIT_PER_SEC
-            if refill > 0:
-                _tokens = min(_RATE_LIMIT_PER_SEC, _tokens + refill)
-                _last_refill = now
-            if _tokens >= 1:
-                _tokens -= 1
-                return
+_RATE_LIMIT_MIN_PER_SEC = float(os.getenv('YF_RATE_LIMIT_MIN_PER_SEC', '0.2'))
+_limiter = AdaptiveRateLimiter(_RATE_LIMIT_PER_SEC, min_rate=_RATE_LIMIT_MIN_PER_SEC)
+
+# bad symbols (delisted / mistyped) are remembered for YF_NEGATIVE_TTL seconds, a period with
+# no prices only for YF_NEGATIVE_PRICE_TTL; after YF_BREAKER_FAILURES consecutive outage
+# errors Yahoo calls stop for YF_BREAKER_RESET seconds
+_NEGATIVE_TTL = float(os.getenv('YF_NEGATIVE_TTL', str(6 * 3600)))
+_NEGATIVE_PRICE_TTL = float(os.getenv('YF_NEGATIVE_PRICE_TTL', '900'))
+_negative = NegativeCache(_NEGATIVE_TTL)
+_breaker = CircuitBreaker(int(os.getenv('YF_BREAKER_FAILURES', '5')), float(os.getenv('YF_BREAKER_RESET', '60')))
+# history(raise_errors=True) is how older yfinance surfaces symbol errors; newer ones warn about it
+warnings.filterwarnings('ignore', message=".*raise_errors.*deprecated", category=DeprecationWarning)
+
+
+def get_rate_limit_stats() -> dict:
+    """Per-endpoint limiter state: current rate, observed requests/sec, waits and 429 throttles."""
+    return _limiter.stats()
+
+
+def _try_acquire_token(endpoint: str = 'chart') -> float:
+    """Take a token if one is available. Returns 0 on success, else seconds until the next token."""
+    return _limiter.try_acquire(endpoint)
+
+
+def _acquire_token(endpoint: str = 'chart'):
+    """Block until a token for endpoint is available."""
+    _limiter.acquire(endpoint)
+
+
+async def _acquire_token_async(endpoint: str = 'chart', n: int = 1):
+    """Event-loop friendly variant of _acquire_token sharing the same buckets; takes n tokens."""
+    for _ in range(n):
+        while True:
+            wait = _try_acquire_token(endpoint)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+
+
+def _report_call(endpoint: str, exc: Optional[BaseException] = None):
+    """Feed a request outcome back into the limiter (429 -> cut rate, success -> recover)
+    and the circuit breaker (outage -> failure; success or bad symbol -> Yahoo is up)."""
+    if exc is None:
+        _limiter.on_success(endpoint)
+        _breaker.on_success()
+    elif is_symbol_error(exc):
+        _breaker.on_success()
+    elif is_rate_limit_error(exc) or isinstance(exc, EmptyDownloadError):
+        _metrics.incr('throttle_events')
+        _logger.warning('rate limited on %s: %s', endpoint, exc)
+        _limiter.on_throttle(endpoint)
+        _breaker.on_failure()
+    elif is_outage_error(exc):
+        _metrics.incr('outage_errors')
+        _logger.warning('Yahoo unavailable on %s: %s', endpoint, exc)
+        _breaker.on_failure()
+    else:
+        _breaker.release()
+
+
+def _negative_key(exc: BaseException, ticker: str, period: str, interval: str):
+    """A missing timezone means the symbol itself is unknown; missing prices only rule out
+    this period/interval."""
+    if type(exc).__name__ == 'YFTzMissingError' or 'no timezone found' in str(exc).lower():
+        return ticker
+    return (ticker, period, interval)
+
+
+def _negative_ttl(exc: BaseException) -> float:
+    """Unknown or delisted symbols stay cached for hours; missing prices (a transient Yahoo
+    gap or a range before listing) are retried after YF_NEGATIVE_PRICE_TTL."""
+    if any(c.__name__ == 'YFPricesMissingError' for c in type(exc).__mro__):
+        return _NEGATIVE_PRICE_TTL
+    if 'no price data found' in str(exc).lower():
+        return _NEGATIVE_PRICE_TTL
+    return _NEGATIVE_TTL
+
+
+def _negative_reason(ticker: str, period: str, interval: str) -> Optional[str]:
+    return _negative.get(ticker) or _negative.get((ticker, period, interval))
+
+
+def get_breaker_stats() -> dict:
+    """Circuit breaker state plus the number of negatively cached symbols."""
+    stats = _breaker.stats()
+    stats['negative_entries'] = len(_negative)
+    return stats
 
 
 def _init_sqlite_cache():
@@ -140,7 +266,19 @@ def _init_sqlite_cache():
             c.execute(f'PRAGMA busy_timeout = {_SQLITE_BUSY_TIMEOUT_MS}')
         except Exception:
             pass
-        c.execute('''CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, ts REAL, blob BLOB)''')
+        # must be set before the first table is created to take effect on a new file
+        try:
+            c.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        except Exception:
+            pass
+        c.execute('''CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, ts REAL, blob BLOB,
+                     atime REAL, nbytes INTEGER)''')
+        # older cache files lack the LRU columns
+        for col in ('atime REAL', 'nbytes INTEGER'):
+            try:
+                c.execute(f'ALTER TABLE cache ADD COLUMN {col}')
+            except sqlite3.OperationalError:
+                pass
         conn.commit()
         conn.close()
     except Exception:
@@ -148,24 +286,32 @@ def _init_sqlite_cache():
 
 
 def _get_sqlite_cache(key_str: str):
+    # frames still waiting in the write-behind queue
+    with _pending_lock:
+        pending = _pending_writes.get(key_str)
+    if pending is not None:
+        _metrics.incr('cache_hits')
+        return pending
     # retry loop for transient busy/lock errors
     last_exc = None
     for attempt in range(max(1, _SQLITE_MAX_RETRIES)):
         try:
-            conn = _get_conn()
-            c = conn.cursor()
-            c.execute('SELECT ts, blob FROM cache WHERE key = ?', (key_str,))
-            row = c.fetchone()
-            _release_conn(conn)
+            with _metrics.timer('sqlite_get'):
+                conn = _get_conn()
+                c = conn.cursor()
+                c.execute('SELECT ts, blob FROM cache WHERE key = ?', (key_str,))
+                row = c.fetchone()
+                _release_conn(conn)
             if row is None:
-                _metrics['cache_misses'] += 1
+                _metrics.incr('cache_misses')
                 return None
             ts, blob = row
-            try:
-                df = pickle.loads(blob)
-            except Exception:
-                df = pickle.loads(bytes(blob)) if blob is not None else pd.DataFrame()
-            _metrics['cache_hits'] += 1
+            with _atime_lock:
+                _sqlite_atimes[key_str] = time.time()
+            # columnar blobs decode as zero-copy views; legacy pickle blobs are still readable
+            with _metrics.timer('decode'):
+                df = frame_codec.decode(blob)
+            _metrics.incr('cache_hits')
             return (ts, df)
         except sqlite3.OperationalError as e:
             last_exc = e
@@ -177,55 +323,230 @@ def _get_sqlite_cache(key_str: str):
             break
     return None
 
-def _set_sqlite_cache(key_str: str, ts: float, df):
-    blob = pickle.dumps(df)
-    last_exc = None
+def _set_sqlite_cache_many(items: list):
+    """Write [(key_str, ts, df), ...] in a single transaction."""
+    rows = []
+    for key_str, ts, df in items:
+        with _metrics.timer('encode'):
+            blob = frame_codec.encode(df)
+        rows.append((key_str, ts, sqlite3.Binary(blob), ts, len(blob)))
+    if not rows:
+        return
     for attempt in range(max(1, _SQLITE_MAX_RETRIES)):
+        conn = None
         try:
-            conn = _get_conn()
-            c = conn.cursor()
-            c.execute('REPLACE INTO cache (key, ts, blob) VALUES (?, ?, ?)', (key_str, ts, sqlite3.Binary(blob)))
-            conn.commit()
-            _release_conn(conn)
+            with _metrics.timer('sqlite_set'):
+                conn = _get_conn()
+                with conn:
+                    conn.executemany('REPLACE INTO cache (key, ts, blob, atime, nbytes) VALUES (?, ?, ?, ?, ?)', rows)
+            _metrics.incr('sqlite_write_batches')
+            _metrics.incr('sqlite_rows_written', len(rows))
             return
-        except sqlite3.OperationalError as e:
-            _metrics['per_chunk_retries'] += 1
-            last_exc = e
+        except sqlite3.OperationalError:
+            _metrics.incr('per_chunk_retries')
             time.sleep(_SQLITE_RETRY_DELAY * (1 + attempt))
             continue
-        except Exception as e:
-            last_exc = e
+        except Exception:
+            _logger.exception('sqlite cache write of %d rows failed', len(rows))
             break
-    # swallow exceptions but preserve last exception in logs if needed
+        finally:
+            _release_conn(conn)
     return
 
 
-def _clean_sqlite_cache():
-    if not _USE_SQLITE_CACHE:
+# write-behind queue: frames are committed by one background writer in batched transactions.
+# Queued-but-uncommitted frames stay readable through _pending_writes.
+_SQLITE_WRITE_BEHIND = os.getenv('YF_SQLITE_WRITE_BEHIND', '1') == '1'
+_SQLITE_WRITE_BATCH = int(os.getenv('YF_SQLITE_WRITE_BATCH', '256'))
+_write_queue = queue.Queue()
+_pending_writes = {}
+_pending_lock = threading.Lock()
+_writer_thread = None
+_writer_lock = threading.Lock()
+
+
+def _queue_sqlite_writes(items: list):
+    if not items:
         return
-    now = time.time()
-    cutoff = now - _CACHE_TTL
-    for attempt in range(max(1, _SQLITE_MAX_RETRIES)):
+    if not _SQLITE_WRITE_BEHIND:
+        _set_sqlite_cache_many(items)
+        return
+    with _pending_lock:
+        for key_str, ts, df in items:
+            _pending_writes[key_str] = (ts, df)
+    _ensure_writer()
+    _write_queue.put(list(items))
+
+
+def _ensure_writer():
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_writer_loop, name='yf-sqlite-writer', daemon=True)
+            _writer_thread.start()
+
+
+def _writer_loop():
+    while True:
+        items = list(_write_queue.get())
+        taken = 1
+        # coalesce everything already queued into the same transaction
+        while len(items) < _SQLITE_WRITE_BATCH:
+            try:
+                items.extend(_write_queue.get_nowait())
+                taken += 1
+            except queue.Empty:
+                break
+        latest = {}
+        for key_str, ts, df in items:
+            latest[key_str] = (key_str, ts, df)
         try:
-            conn = _get_conn()
-            c = conn.cursor()
-            c.execute('DELETE FROM cache WHERE ts < ?', (cutoff,))
-            conn.commit()
-            _release_conn(conn)
-            return
-        except sqlite3.OperationalError:
-            time.sleep(_SQLITE_RETRY_DELAY * (1 + attempt))
-            continue
+            _set_sqlite_cache_many(list(latest.values()))
         except Exception:
-            break
-    return
+            _logger.exception('sqlite write-behind batch failed')
+        finally:
+            with _pending_lock:
+                for key_str, ts, df in latest.values():
+                    p = _pending_writes.get(key_str)
+                    if p is not None and p[1] is df:
+                        del _pending_writes[key_str]
+            for _ in range(taken):
+                _write_queue.task_done()
+
+
+def flush_sqlite_writes(timeout: Optional[float] = None) -> bool:
+    """Wait until queued sqlite writes are committed. Returns False on timeout."""
+    deadline = None if timeout is None else time.time() + timeout
+    while _write_queue.unfinished_tasks:
+        if deadline is not None and time.time() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+atexit.register(flush_sqlite_writes, 5.0)
+
+
+# background maintenance of the sqlite cache: TTL sweep, size cap with LRU eviction,
+# incremental vacuum and WAL checkpoint. Read times are batched in memory and flushed here.
+# Retention is separate from freshness: rows older than YF_CACHE_TTL are no longer fresh but
+# are kept (default 7 days) so stale-while-revalidate, the breaker and period slicing can use them.
+_SQLITE_CACHE_MAX_MB = float(os.getenv('YF_SQLITE_CACHE_MAX_MB', '512'))
+_SQLITE_CACHE_MAX_AGE = float(os.getenv('YF_SQLITE_CACHE_MAX_AGE', str(7 * 24 * 3600)))
+_CACHE_MAINT_INTERVAL = float(os.getenv('YF_CACHE_MAINT_INTERVAL', '300'))
+_sqlite_atimes = {}
+_atime_lock = threading.Lock()
+_maint_thread = None
+_maint_stop = threading.Event()
+_maint_report = {}
+
+
+def run_cache_maintenance(max_bytes: Optional[int] = None, max_age: Optional[float] = None) -> dict:
+    """One maintenance pass over the sqlite cache (and the shared mmap files). Returns a
+    size / hit-ratio report."""
+    if max_bytes is None:
+        max_bytes = int(_SQLITE_CACHE_MAX_MB * 1024 * 1024)
+    if max_age is None:
+        max_age = _SQLITE_CACHE_MAX_AGE
+    global _maint_report
+    report = {'expired': 0, 'evicted': 0}
+    if _USE_SHARED_CACHE:
+        try:
+            report['shared_removed'] = _shared_cache().sweep(max_age=max_age, max_bytes=max_bytes)
+        except Exception:
+            _logger.exception('shared cache sweep failed')
+    if not _USE_SQLITE_CACHE:
+        return report
+    with _atime_lock:
+        atimes = list(_sqlite_atimes.items())
+        _sqlite_atimes.clear()
+    conn = None
+    try:
+        with _metrics.timer('cache_maintenance'):
+            conn = _get_conn()
+            with conn:
+                if atimes:
+                    conn.executemany('UPDATE cache SET atime = ? WHERE key = ?', [(t, k) for k, t in atimes])
+                report['expired'] = conn.execute('DELETE FROM cache WHERE ts < ?', (time.time() - max_age,)).rowcount
+                total = conn.execute('SELECT COALESCE(SUM(COALESCE(nbytes, LENGTH(blob))), 0) FROM cache').fetchone()[0]
+                if total > max_bytes:
+                    # evict least recently used down to 90% of the cap so we do not thrash at the limit
+                    target = int(max_bytes * 0.9)
+                    victims = []
+                    for key, n in conn.execute('SELECT key, COALESCE(nbytes, LENGTH(blob)) FROM cache '
+                                               'ORDER BY COALESCE(atime, ts) ASC'):
+                        if total <= target:
+                            break
+                        victims.append((key,))
+                        total -= n
+                    conn.executemany('DELETE FROM cache WHERE key = ?', victims)
+                    report['evicted'] = len(victims)
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                # cache files created before incremental vacuum was enabled need one full VACUUM
+                try:
+                    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                    conn.execute('VACUUM')
+                except sqlite3.OperationalError:
+                    pass
+            for pragma in ('PRAGMA incremental_vacuum', 'PRAGMA wal_checkpoint(TRUNCATE)'):
+                try:
+                    conn.execute(pragma).fetchall()
+                except sqlite3.OperationalError:
+                    pass
+            report['entries'], report['payload_bytes'] = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(COALESCE(nbytes, LENGTH(blob))), 0) FROM cache').fetchone()
+    except Exception:
+        _logger.exception('sqlite cache maintenance failed')
+        return dict(_maint_report)
+    finally:
+        _release_conn(conn)
+    report['file_bytes'] = sum(os.path.getsize(_SQLITE_CACHE_PATH + ext)
+                               for ext in ('', '-wal') if os.path.exists(_SQLITE_CACHE_PATH + ext))
+    hits, misses = _metrics.get('cache_hits'), _metrics.get('cache_misses')
+    report['hit_ratio'] = hits / (hits + misses) if hits + misses else None
+    report['ts'] = time.time()
+    _metrics.incr('sqlite_expired', report['expired'])
+    _metrics.incr('sqlite_evictions', report['evicted'])
+    _maint_report = report
+    _logger.info('sqlite cache: %d entries, %.1f MB payload, %.1f MB on disk, expired %d, evicted %d, hit ratio %s',
+                 report['entries'], report['payload_bytes'] / 1e6, report['file_bytes'] / 1e6,
+                 report['expired'], report['evicted'], report['hit_ratio'])
+    return dict(report)
 
 
-# run a quick cleanup at import time when sqlite cache enabled
-if _USE_SQLITE_CACHE:
+def get_sqlite_cache_stats() -> dict:
+    """Report from the last maintenance pass (entries, payload/file bytes, hit ratio...)."""
+    return dict(_maint_report)
+
+
+def start_cache_maintenance(interval: Optional[float] = None):
+    """Start the maintenance thread (first pass runs immediately)."""
+    global _maint_thread
+    interval = _CACHE_MAINT_INTERVAL if interval is None else interval
+    if _maint_thread is not None and _maint_thread.is_alive():
+        return
+    _maint_stop.clear()
+
+    def _loop():
+        while True:
+            run_cache_maintenance()
+            if _maint_stop.wait(interval):
+                return
+
+    _maint_thread = threading.Thread(target=_loop, name='yf-cache-maint', daemon=True)
+    _maint_thread.start()
+
+
+def stop_cache_maintenance():
+    _maint_stop.set()
+
+
+# initialize and start periodic maintenance when a persistent cache is enabled
+if _USE_SQLITE_CACHE or _USE_SHARED_CACHE:
     try:
-        _init_sqlite_cache()
-        _clean_sqlite_cache()
+        if _USE_SQLITE_CACHE:
+            _init_sqlite_cache()
+        start_cache_maintenance()
     except Exception:
         pass
 
@@ -234,174 +555,570 @@ def get_ticker(ticker: str):
     return yf.Ticker(ticker)
 
 
+# exchange timezone / trading period seen in chart responses, used for market-hours scheduling
+_history_meta = {}
+
+
+def _remember_metadata(ticker: str, t):
+    try:
+        md = t.history_metadata or {}
+    except Exception:
+        return
+    if 'exchangeTimezoneName' in md:
+        _history_meta[ticker] = {k: md.get(k) for k in ('exchangeTimezoneName', 'currentTradingPeriod')}
+
+
+def get_history_metadata(ticker: str) -> Optional[dict]:
+    """Exchange timezone and current trading period from the last chart response, if any."""
+    return _history_meta.get(ticker)
+
+
+def _lookup_memory(ticker: str, period: str, interval: str, now: float, ttl: Optional[float] = None):
+    """Return an in-memory history younger than ttl (default YF_CACHE_TTL), slicing a longer
+    cached period when it covers the request."""
+    return _tiers.lookup(ticker, period, interval, now, _CACHE_TTL if ttl is None else ttl,
+                         stop=1, on_slice=lambda: _metrics.incr('period_slices'))
+
+
+def _lookup_stored(ticker: str, period: str, interval: str, now: float, ttl: Optional[float] = None):
+    """Same as _lookup_memory for the slower tiers (shared mmap, sqlite, parquet archive);
+    a hit is promoted into every faster tier."""
+    return _tiers.lookup(ticker, period, interval, now, _CACHE_TTL if ttl is None else ttl,
+                         start=1, on_slice=lambda: _metrics.incr('period_slices'))
+
+
+def _get_shared_cache(key_str: str):
+    with _metrics.timer('shared_get'):
+        r = _shared_cache().get(key_str)
+    _metrics.incr('shared_hits' if r is not None else 'shared_misses')
+    return r
+
+
+def _set_shared_cache(key_str: str, ts: float, df):
+    try:
+        with _metrics.timer('shared_set'):
+            _shared_cache().put(key_str, ts, df)
+    except Exception:
+        _logger.warning('shared cache write failed for %s', key_str, exc_info=True)
+
+
+def _persist(items: list):
+    """Write [(key_str, ts, df), ...] through to the shared mmap tier and the sqlite queue."""
+    try:
+        _tiers.put_through(items, start=1)
+    except Exception:
+        _logger.warning('persisting %d frames failed', len(items), exc_info=True)
+
+
+def _demote_evicted(key: tuple, ts: float, df):
+    """HistoryCache eviction hook: archive daily+ bars that are leaving memory."""
+    if _USE_ARCHIVE and key[2] in bar_store.STORE_INTERVALS and parquet_archive.available():
+        _get_executor().submit(_tiers.demote, 0, [(tiered_cache.make_key(*key), ts, df)])
+
+
+# memory -> shared mmap -> sqlite are write-through; the parquet archive is write-around
+# and fed by memory evictions and by bar-store style tail fetches
+_tiers = tiered_cache.TieredCache([
+    tiered_cache.MemoryTier(_HISTORY_CACHE, prepare=lambda df: _freeze(df)),
+    tiered_cache.Tier('shared', lambda k: _get_shared_cache(k),
+                      lambda items: [_set_shared_cache(*it) for it in items],
+                      enabled=lambda: _USE_SHARED_CACHE),
+    tiered_cache.Tier('sqlite', lambda k: _get_sqlite_cache(k), lambda items: _queue_sqlite_writes(items),
+                      enabled=lambda: _USE_SQLITE_CACHE),
+    tiered_cache.ArchiveTier(parquet_archive.get_archive, enabled=lambda: _USE_ARCHIVE),
+])
+_HISTORY_CACHE.on_evict = _demote_evicted
+
+
+def get_tier_stats() -> dict:
+    """Per-tier hits, misses, hit ratio, promotions, demotions and writes."""
+    stats = _tiers.stats()
+    stats['memory'].update(_HISTORY_CACHE.stats())
+    return stats
+
+
+def set_stale_while_revalidate(enabled: bool):
+    """Toggle stale-while-revalidate mode (also enabled with YF_STALE_WHILE_REVALIDATE=1)."""
+    global _STALE_WHILE_REVALIDATE
+    _STALE_WHILE_REVALIDATE = bool(enabled)
+
+
+def _revalidate(key: tuple, fn):
+    """Run fn on the I/O pool unless a refresh for key is already pending."""
+    with _revalidate_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+    _metrics.incr('revalidations')
+
+    def _run():
+        try:
+            _inflight.do(key, fn)
+        except Exception:
+            _logger.warning('background refresh failed for %s', key, exc_info=True)
+        finally:
+            with _revalidate_lock:
+                _revalidating.discard(key)
+
+    _get_executor().submit(_run)
+
+
+def _pandas_cow() -> bool:
+    try:
+        if int(pd.__version__.split('.')[0]) >= 3:
+            return True
+        return pd.get_option('mode.copy_on_write') is True
+    except Exception:
+        return False
+
+
+# Cached frames are shared with callers as shallow views instead of deep copies. Under
+# pandas copy-on-write (always on from pandas 3) any write through a view copies first.
+# Without CoW the cached arrays are made read-only, so an in-place write raises instead
+# of corrupting the cache; callers that need to mutate should .copy() explicitly.
+_COPY_ON_WRITE = _pandas_cow()
+
+
+def _freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """The frame to cache: as is under CoW, else rebuilt over read-only column arrays."""
+    if _COPY_ON_WRITE or df is None or df.empty:
+        return df
+    try:
+        cols = {}
+        for i in range(df.shape[1]):
+            col = df.iloc[:, i]
+            if isinstance(col.dtype, np.dtype):
+                # a view into the frame's block; the rebuilt frame keeps it without copying
+                col = col.to_numpy()
+                col.flags.writeable = False
+            cols[i] = col
+        out = pd.DataFrame(cols, index=df.index, copy=False)
+        out.columns = df.columns
+        out.attrs = dict(df.attrs)
+        return out
+    except Exception:
+        return df
+
+
+def _view(df: pd.DataFrame) -> pd.DataFrame:
+    """A new frame object over the cached data (own attrs, no data copy)."""
+    return df.copy(deep=False)
+
+
+def _mark(df: pd.DataFrame, fresh: bool) -> pd.DataFrame:
+    df.attrs['fresh'] = fresh
+    return df
+
+
 def get_history(ticker: str, period: str = '1y', interval: str = '1d') -> pd.DataFrame:
+    """Return price history for ticker. df.attrs['fresh'] is False when a stale frame was served
+    in stale-while-revalidate mode while a background refresh runs.
+
+    The frame shares its data with the cache; .copy() it before mutating in place."""
     key = (ticker, period, interval)
     now = time.time()
-    if key in _HISTORY_CACHE:
-        ts, df = _HISTORY_CACHE[key]
-        if now - ts < _CACHE_TTL:
-            return df.copy()
-    # try sqlite cache
+    df = _lookup_memory(ticker, period, interval, now)
+    if df is not None:
+        return _mark(_view(df), True)
+    if _STALE_WHILE_REVALIDATE:
+        df = _lookup_memory(ticker, period, interval, now, ttl=float('inf'))
+        if df is not None:
+            _metrics.incr('stale_served')
+            _revalidate(('history',) + key, lambda: _load_history(ticker, period, interval, time.time()))
+            return _mark(_view(df), False)
+    if _negative_reason(ticker, period, interval) is not None:
+        _metrics.incr('negative_hits')
+        return _mark(pd.DataFrame(), True)
+    # concurrent misses for the same key share one sqlite lookup / download
+    try:
+        df, shared = _inflight.do(('history',) + key, lambda: _load_history(ticker, period, interval, now))
+    except CircuitOpenError:
+        # Yahoo is down: serve the newest copy we have from any tier
+        inf = float('inf')
+        df = _lookup_memory(ticker, period, interval, now, ttl=inf)
+        if df is None:
+            df = _lookup_stored(ticker, period, interval, now, ttl=inf)
+        if df is None:
+            raise
+        _metrics.incr('breaker_served_stale')
+        return _mark(_view(df), False)
+    if shared:
+        _metrics.incr('inflight_dedup')
+    return _mark(_view(df), True)
+
+
+def _load_history(ticker: str, period: str, interval: str, now: float) -> pd.DataFrame:
+    key = (ticker, period, interval)
     key_str = f"{ticker}|{period}|{interval}"
-    if _USE_SQLITE_CACHE:
+    df = _lookup_stored(ticker, period, interval, now)
+    if df is not None:
+        return df
+
+    t = get_ticker(ticker)
+
+    def _fetch(**kw):
+        _breaker.check()
+        # respect rate limit before network call
         try:
-            r = _get_sqlite_cache(key_str)
-            if r is not None:
-                ts, df = r
-                if now - ts < _CACHE_TTL:
-                    _HISTORY_CACHE[key] = (ts, df)
-                    return df.copy()
+            _acquire_token('chart')
         except Exception:
             pass
+        try:
+            with _metrics.timer('fetch_history', ticker):
+                res = t.history(interval=interval, auto_adjust=False, raise_errors=True, **kw)
+        except Exception as e:
+            _report_call('chart', e)
+            raise
+        _report_call('chart')
+        _remember_metadata(ticker, t)
+        return res
 
-    # respect rate limit before network call
+    store = None
+    if interval in bar_store.STORE_INTERVALS:
+        if _USE_BAR_STORE:
+            store = bar_store.get_store()
+        elif _USE_ARCHIVE:
+            # the archive keeps settled bars, so only the tail since its last bar is fetched
+            store = parquet_archive.get_archive()
     try:
-        _acquire_token()
-    except Exception:
-        pass
-    t = get_ticker(ticker)
-    df = t.history(period=period, interval=interval, auto_adjust=False)
+        if store is not None:
+            try:
+                df = bar_store.get_history(ticker, period, interval, _fetch, store=store, stats=_metrics)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if is_symbol_error(e):
+                    raise
+                _logger.exception('bar store failed for %s, falling back to full download', ticker)
+                df = _fetch(period=period)
+        else:
+            df = _fetch(period=period)
+    except Exception as e:
+        if not is_symbol_error(e):
+            raise
+        # delisted / mistyped: remember it and answer with an empty frame as yfinance would
+        _negative.mark(_negative_key(e, ticker, period, interval), str(e), _negative_ttl(e))
+        _metrics.incr('negative_marks')
+        _logger.info('no data for %s (%s %s): %s', ticker, period, interval, e)
+        return pd.DataFrame()
     if df is None:
         df = pd.DataFrame()
+    df = _freeze(df)
     _HISTORY_CACHE[key] = (now, df)
-    if _USE_SQLITE_CACHE:
-        try:
-            _set_sqlite_cache(key_str, now, df)
-        except Exception:
-            pass
+    _persist([(key_str, now, df)])
     return df
 
 
-def get_histories(tickers: list, period: str = '1mo', interval: str = '1d') -> dict:
-    """Fetch histories for multiple tickers using yfinance.download for efficiency.
+def _split_download(df_chunk: pd.DataFrame, chunk: list) -> dict:
+    """Split a yf.download(group_by='ticker') frame into {ticker: OHLCV frame}."""
+    out = {}
+    if df_chunk is None or df_chunk.empty:
+        return {t: pd.DataFrame() for t in chunk}
+    cols = df_chunk.columns
+    if not isinstance(cols, pd.MultiIndex):
+        # older yfinance returns a flat frame for a single ticker
+        if len(chunk) == 1:
+            out[chunk[0]] = df_chunk.dropna(how='all')
+        return out
+    level = 0 if set(chunk) & set(cols.get_level_values(0)) else 1
+    for t in chunk:
+        try:
+            out[t] = df_chunk.xs(t, axis=1, level=level).dropna(how='all')
+        except KeyError:
+            out[t] = pd.DataFrame()
+    return out
+
+
+class EmptyDownloadError(ConnectionError):
+    """yf.download returned no bars for any ticker of a chunk.
+
+    yf.download swallows per-ticker errors (429s and timeouts included) and answers with
+    empty frames, so an empty chunk is reported to the limiter as a throttle and to the
+    breaker as a failure."""
+
+
+def _missing_symbols(frames: dict) -> list:
+    """Chunk tickers that came back with no column or only NaN rows.
+
+    Their error was swallowed by yf.download and may be a 429 or a timeout as easily as a
+    bad symbol, so they are refetched through get_history(), which sees the real exception
+    (and negatively caches only genuine symbol errors).
+    """
+    return [t for t, df in frames.items() if df.empty]
+
+
+def _store_histories(frames: dict, period: str, interval: str):
+    """Cache {ticker: df} (already _freeze()d) in memory and persist them (one batched sqlite
+    write for all)."""
+    now = time.time()
+    for t, df in frames.items():
+        _HISTORY_CACHE[(t, period, interval)] = (now, df)
+    _persist([(f"{t}|{period}|{interval}", now, df) for t, df in frames.items()])
+
 
-    Returns a dict {ticker: DataFrame}.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Single bounded pool for blocking yfinance calls made by the async engine."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_YF_MAX_WORKERS, thread_name_prefix='yf-io')
+        return _executor
+
+
+async def fetch_histories(tickers: list, period: str = '1mo', interval: str = '1d', concurrency: Optional[int] = None) -> dict:
+    """Fetch histories for many tickers on the running event loop.
+
+    Tickers are served from cache where possible; the rest are downloaded in chunks of
+    YF_BATCH_SIZE with at most `concurrency` (YF_MAX_CONCURRENCY) chunk downloads in flight.
+    Each yf.download runs with threads=False on one shared pool, so the total number of
+    network threads is bounded. Returns a dict {ticker: DataFrame}.
+
+    As in get_history(), stale-while-revalidate mode answers an expired in-memory frame at
+    once with attrs['fresh'] = False and refreshes it in the background. yf.download does
+    not expose chart metadata, so a ticker whose exchange session has not been seen yet is
+    fetched once through get_history(), which records it for the refresh scheduler.
     """
     # Normalize tickers
-    tlist = [t.strip().upper() for t in tickers if t]
+    tlist = list(dict.fromkeys(t.strip().upper() for t in tickers if t))
     if not tlist:
         return {}
-    # first, check sqlite cache for available tickers and skip them
+    # first, check memory and sqlite caches (including longer cached periods) and skip those tickers
     result = {}
     remaining = []
+    now = time.time()
+    single = []
     for t in tlist:
-        key_str = f"{t}|{period}|{interval}"
-        if _USE_SQLITE_CACHE:
-            try:
-                r = _get_sqlite_cache(key_str)
-                if r is not None:
-                    ts, df = r
-                    if time.time() - ts < _CACHE_TTL:
-                        result[t] = df
-                        continue
-            except Exception:
-                pass
+        df = _lookup_memory(t, period, interval, now)
+        if df is None:
+            df = _lookup_stored(t, period, interval, now)
+        if df is not None:
+            result[t] = _mark(_view(df), True)
+            continue
+        if _STALE_WHILE_REVALIDATE:
+            df = _lookup_memory(t, period, interval, now, ttl=float('inf'))
+            if df is not None:
+                _metrics.incr('stale_served')
+                _revalidate(('history', t, period, interval),
+                            lambda t=t: _load_history(t, period, interval, time.time()))
+                result[t] = _mark(_view(df), False)
+                continue
+        if _negative_reason(t, period, interval) is not None:
+            _metrics.incr('negative_hits')
+            result[t] = _mark(pd.DataFrame(), True)
+            continue
+        if t not in _history_meta:
+            single.append(t)
+            continue
         remaining.append(t)
 
-    if not remaining:
+    if not remaining and not single:
         return result
 
-    # attempt batch download for the remaining tickers
-    # try batched download with simple retry/backoff
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    sem = asyncio.Semaphore(max(1, concurrency or _YF_MAX_CONCURRENCY))
     max_attempts = 3
     delay = 1
-    last_exc = None
-    # We'll split remaining tickers into chunks and try downloading chunks in parallel.
     chunks = [remaining[i:i + _YF_BATCH_SIZE] for i in range(0, len(remaining), _YF_BATCH_SIZE)]
-    def _download_chunk(chunk):
-        # each chunk download respects the global token bucket
-        for attempt in range(1, max_attempts + 1):
-            try:
-                try:
-                    _acquire_token()
-                except Exception:
-                    pass
-                df_chunk = yf.download(chunk, period=period, interval=interval, group_by='ticker', auto_adjust=False, threads=True)
-                _metrics['chunk_successes'] += 1
-                return df_chunk, None
-            except Exception as e:
-                msg = str(e).lower()
-                if '429' in msg or 'too many' in msg or 'quota' in msg:
-                    time.sleep(delay * (2 ** (attempt - 1)))
-                else:
-                    time.sleep(delay * (2 ** (attempt - 1)))
-                last = e
-                continue
-        return None, last
-
-    # run chunk downloads in parallel but limit overall concurrency
-    with ThreadPoolExecutor(max_workers=min(_YF_MAX_WORKERS, len(chunks))) as ex:
-        futures = {ex.submit(_download_chunk, c): c for c in chunks}
-        for fut in as_completed(futures):
-            chunk = futures[fut]
-            df_chunk, exc = fut.result()
-            if exc is not None or df_chunk is None:
-                # on failure, fall back to per-ticker get_history for this chunk
-                _metrics['chunk_failures'] += 1
-                for t in chunk:
-                    try:
-                        df = get_history(t, period=period, interval=interval)
-                        result[t] = df
-                    except Exception:
-                        result[t] = pd.DataFrame()
-                continue
-            # parse df_chunk for tickers
-            if len(chunk) == 1:
-                # single-ticker download may return plain DataFrame
-                tname = chunk[0]
-                result[tname] = df_chunk
-                # cache it
-                if _USE_SQLITE_CACHE:
-                    try:
-                        _set_sqlite_cache(f"{tname}|{period}|{interval}", time.time(), df_chunk)
-                    except Exception:
-                        pass
-                continue
-            for t in chunk:
+
+    async def _download_chunk(chunk):
+        last = None
+        async with sem:
+            for attempt in range(1, max_attempts + 1):
+                if not _breaker.allow():
+                    return chunk, None, CircuitOpenError('Yahoo circuit breaker is open')
+                # yf.download(threads=False) sends one chart request per ticker
+                await _acquire_token_async('chart', len(chunk))
                 try:
-                    sub = df_chunk[t]
-                    sub.columns = df_chunk.columns.levels[0] if hasattr(df_chunk.columns, 'levels') else df_chunk.columns
-                    df_sub = sub.dropna(how='all')
-                except Exception:
-                    df_sub = pd.DataFrame()
-                result[t] = df_sub
-                if _USE_SQLITE_CACHE:
-                    try:
-                        _set_sqlite_cache(f"{t}|{period}|{interval}", time.time(), df_sub)
-                    except Exception:
-                        pass
+                    t0 = time.perf_counter()
+                    df_chunk = await loop.run_in_executor(executor, lambda: yf.download(
+                        chunk, period=period, interval=interval, group_by='ticker',
+                        auto_adjust=False, threads=False, progress=False))
+                    _metrics.observe('fetch_download', time.perf_counter() - t0, ','.join(chunk))
+                    # split right away so the wide chunk frame can be freed
+                    with _metrics.timer('parse_download'):
+                        frames = _split_download(df_chunk, chunk)
+                    if all(f.empty for f in frames.values()):
+                        # yf.download swallows errors; nothing at all for a whole chunk means Yahoo failed
+                        raise EmptyDownloadError('empty download for %d tickers' % len(chunk))
+                    _report_call('chart')
+                    _metrics.incr('chunk_successes')
+                    return chunk, frames, None
+                except Exception as e:
+                    _report_call('chart', e)
+                    last = e
+                    # a lone ticker goes straight to get_history(), which sees the real error
+                    if _breaker.state == CB_OPEN or (len(chunk) == 1 and isinstance(e, EmptyDownloadError)):
+                        break
+                    await asyncio.sleep(delay * (2 ** (attempt - 1)))
+        return chunk, None, last
+
+    async def _fallback(t):
+        # failed chunks, tickers a chunk came back without and tickers whose session metadata
+        # is still unknown: per-ticker get_history under the same concurrency limit
+        async with sem:
+            try:
+                return t, await loop.run_in_executor(executor, get_history, t, period, interval)
+            except Exception:
+                return t, pd.DataFrame()
+
+    failed = []
+    for fut in asyncio.as_completed([_download_chunk(c) for c in chunks]):
+        chunk, frames, exc = await fut
+        if exc is not None or frames is None:
+            _metrics.incr('chunk_failures')
+            failed.extend(chunk)
+            continue
+        stored = {t: _freeze(frames.get(t, pd.DataFrame())) for t in chunk}
+        for t in _missing_symbols(stored):
+            del stored[t]
+            failed.append(t)
+        result.update((t, _mark(_view(df), True)) for t, df in stored.items())
+        _store_histories(stored, period, interval)
+
+    failed.extend(single)
+    if failed:
+        for t, df in await asyncio.gather(*[_fallback(t) for t in failed]):
+            result[t] = df
     return result
-    
 
 
-def get_quote(ticker: str) -> dict:
+def _run_sync(coro):
+    """Run a coroutine to completion from synchronous code (GUI threads, scripts)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # called from inside an event loop: run on a helper thread with its own loop
+    box = {}
+
+    def _runner():
+        try:
+            box['result'] = asyncio.run(coro)
+        except BaseException as e:
+            box['error'] = e
+
+    th = threading.Thread(target=_runner, daemon=True)
+    th.start()
+    th.join()
+    if 'error' in box:
+        raise box['error']
+    return box['result']
+
+
+def get_histories(tickers: list, period: str = '1mo', interval: str = '1d') -> dict:
+    """Fetch histories for multiple tickers using yfinance.download for efficiency.
+
+    Synchronous wrapper around fetch_histories(). Returns a dict {ticker: DataFrame}; like
+    get_history() the frames share data with the cache.
+    """
+    return _run_sync(fetch_histories(tickers, period=period, interval=interval))
+
+
+def get_info(ticker: str, fields: Optional[Iterable[str]] = None, classes: Optional[Iterable[str]] = None) -> dict:
+    """Return Ticker.info for ticker, refetching only when a needed freshness class is stale.
+
+    Pass `fields` (e.g. ('sector', 'industry')) or `classes` (info_cache.STATIC/FUNDAMENTAL/PRICE)
+    to say which data must be fresh; by default all classes must be.
+    """
+    return get_info_fresh(ticker, fields=fields, classes=classes)[0]
+
+
+def get_info_fresh(ticker: str, fields: Optional[Iterable[str]] = None, classes: Optional[Iterable[str]] = None) -> tuple:
+    """get_info() as (info, fresh); fresh is False when a stale entry was served while it
+    revalidates (stale-while-revalidate) or because the refetch failed."""
+    if fields is not None:
+        need = info_cache.classes_for(fields)
+    else:
+        need = tuple(classes) if classes is not None else info_cache.ALL_CLASSES
+    return _get_info(ticker, need)
+
+
+def _get_info(ticker: str, need) -> tuple:
+    """Return (info, fresh) for the freshness classes in need."""
+    cached = _info_cache.get(ticker, need)
+    if cached is not None:
+        _metrics.incr('info_hits')
+        return dict(cached), True
+    _metrics.incr('info_misses')
+    stale = _info_cache.get(ticker, allow_stale=True)
+    if _STALE_WHILE_REVALIDATE and stale is not None:
+        _metrics.incr('stale_served')
+        _revalidate(('info', ticker), lambda: _fetch_info(ticker))
+        return dict(stale), False
+    try:
+        info, _ = _inflight.do(('info', ticker), lambda: _fetch_info(ticker))
+    except Exception:
+        # serve whatever we have rather than failing the whole evaluation
+        if stale is None:
+            raise
+        return dict(stale), False
+    return dict(info), True
+
+
+def _fetch_info(ticker: str) -> dict:
     t = get_ticker(ticker)
-    info = t.info or {}
+    _breaker.check()
+    _acquire_token('quoteSummary')
+    try:
+        with _metrics.timer('fetch_info', ticker):
+            info = t.info or {}
+    except Exception as e:
+        _report_call('quoteSummary', e)
+        raise
+    _report_call('quoteSummary')
+    _info_cache.put(ticker, info)
+    return info
+
+
+def get_quote(ticker: str) -> dict:
+    quote, shared = _inflight.do(('quote', ticker), lambda: _load_quote(ticker))
+    if shared:
+        _metrics.incr('inflight_dedup')
+        return dict(quote)
+    return quote
+
+
+def _load_quote(ticker: str) -> dict:
+    # prices come from the bars below, so only profile and fundamentals need to be fresh here
+    info, fresh = _get_info(ticker, (info_cache.STATIC, info_cache.FUNDAMENTAL))
     quote = {}
     hist = None
     try:
-        hist = t.history(period='5d')
+        # usually answered by slicing an already cached longer history
+        hist = get_history(ticker, period='5d')
     except Exception:
         hist = None
     quote['info'] = info
     if hist is not None and not hist.empty:
+        fresh = fresh and hist.attrs.get('fresh', True)
         quote['last'] = hist['Close'].iloc[-1]
         quote['open'] = hist['Open'].iloc[-1]
         quote['high'] = hist['High'].iloc[-1]
         quote['low'] = hist['Low'].iloc[-1]
     else:
+        try:
+            info, fresh = _get_info(ticker, info_cache.ALL_CLASSES)
+            quote['info'] = info
+        except Exception:
+            pass
         quote['last'] = info.get('regularMarketPrice')
         quote['open'] = info.get('open')
         quote['high'] = info.get('dayHigh')
         quote['low'] = info.get('dayLow')
+    # False when any part was served stale while a background refresh runs
+    quote['fresh'] = fresh
     return quote
 
 
 def get_vix() -> Optional[float]:
-    # VIX ticker on Yahoo: ^VIX
+    # VIX ticker on Yahoo: ^VIX (cached, rate limited and breaker-guarded like any history)
     try:
-        t = yf.Ticker('^VIX')
-        h = t.history(period='5d')
+        h = get_history('^VIX', period='5d')
         if h is not None and not h.empty:
             return float(h['Close'].iloc[-1])
     except Exception:
@@ -0,0 +1,149 @@
+"""Write-behind sink for the PEG/revenue decision log (logs/peg_revenue.log, JSON lines).
+
+indicators.calc_peg / revenue_growth record which info field they used for every ticker
+on every refresh. submit() only puts a tuple on a bounded queue and never blocks: when
+the queue is full the record is dropped and counted. A daemon thread drains the queue in
+batches, drops decisions already logged this session (same ticker, field, value and
+note), formats the JSON lines and hands each batch to the rotating file handler as one
+write.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+
+from .metrics import registry as _metrics
+
+_logger = logging.getLogger(__name__)
+
+_LOG_DIR = os.path.join(os.getcwd(), 'logs')
+_LOG_PATH = os.path.join(_LOG_DIR, 'peg_revenue.log')
+_ASYNC = os.getenv('YF_DECISION_LOG_ASYNC', '1') != '0'
+_QUEUE_SIZE = int(os.getenv('YF_DECISION_LOG_QUEUE', '10000'))
+_BATCH = int(os.getenv('YF_DECISION_LOG_BATCH', '512'))
+
+for _name in ('decision_log_written', 'decision_log_deduped', 'decision_log_dropped'):
+    _metrics.incr(_name, 0)
+
+
+class DecisionLogSink:
+    def __init__(self, path: str = _LOG_PATH, max_bytes: int = 2_000_000, backup_count: int = 5,
+                 async_writes: bool = _ASYNC, queue_size: int = _QUEUE_SIZE, batch: int = _BATCH):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.async_writes = async_writes
+        self.batch = batch
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._seen = set()
+        self._handler = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, symbol, used_field: str, value, note: str = ''):
+        """Queue one decision; returns immediately."""
+        rec = (time.time(), kind, symbol, used_field, value, note)
+        if not self.async_writes:
+            self._write([rec])
+            return
+        try:
+            self._queue.put_nowait(rec)
+        except queue.Full:
+            _metrics.incr('decision_log_dropped')
+            return
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='decision-log-writer', daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            recs = [self._queue.get()]
+            while len(recs) < self.batch:
+                try:
+                    recs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(recs)
+            except Exception:
+                _logger.debug('decision log batch failed', exc_info=True)
+            finally:
+                for _ in recs:
+                    self._queue.task_done()
+
+    def _write(self, recs):
+        lines = []
+        with self._lock:
+            for ts, kind, symbol, used_field, value, note in recs:
+                try:
+                    value_key = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+                except Exception:
+                    value_key = repr(value)
+                key = (kind, symbol, used_field, value_key, note)
+                if key in self._seen:
+                    _metrics.incr('decision_log_deduped')
+                    continue
+                self._seen.add(key)
+                rec = {
+                    'ts': datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+                    'kind': kind,
+                    'symbol': symbol,
+                    'used_field': used_field,
+                    'value': value,
+                    'note': note,
+                }
+                lines.append(json.dumps(rec, ensure_ascii=False, default=str))
+            if not lines:
+                return
+            handler = self._get_handler()
+            # one emit per batch: a single write and flush, rotation checked once
+            handler.emit(logging.LogRecord('peg_logger', logging.INFO, __file__, 0, '\n'.join(lines), None, None))
+        _metrics.incr('decision_log_written', len(lines))
+
+    def _get_handler(self) -> RotatingFileHandler:
+        if self._handler is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            h = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8')
+            h.setFormatter(logging.Formatter('%(message)s'))
+            self._handler = h
+        return self._handler
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued records are written. Returns False on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def new_session(self):
+        """Forget logged decisions so each is written once more."""
+        with self._lock:
+            self._seen.clear()
+
+    def close(self):
+        self.flush(5.0)
+        with self._lock:
+            if self._handler is not None:
+                self._handler.close()
+                self._handler = None
+
+
+sink = DecisionLogSink()
+atexit.register(sink.flush, 5.0)
+
+
+def flush_decision_log(timeout: Optional[float] = None) -> bool:
+    return sink.flush(timeout)
@@ -0,0 +1,81 @@
+"""Vectorized DeMark pivot levels over full histories and many tickers at once.
+
+Both DeMark variants in the app share one shape: from a bar's X,
+    pivot = X / 4,  support (buy limit) = X / 2 - High,  resistance (sell limit) = X / 2 - Low
+and they differ only in X:
+  - SIMPLE (indicators.demark_targets): X = H + L + C
+  - CONDITIONAL (stock_analysis, the GUI and the Gemini prompt): X = 2H + L + C after an
+    up close (C > O), H + 2L + C after a down close, H + L + 2C on a doji
+levels() works on scalars, per-bar series or (bars x tickers) arrays. next_bar_levels()
+shifts by one bar so row i holds the limits that apply on bar i, and limit_entries()
+evaluates a DeMark limit-entry backtest for every bar and ticker with array operations.
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from . import panel
+
+SIMPLE = 'simple'
+CONDITIONAL = 'conditional'
+
+
+def levels(open_, high, low, close, variant: str = CONDITIONAL) -> Dict[str, np.ndarray]:
+    """Pivot, support and resistance from each bar (for the bar after it).
+
+    Keys: 'pivot', 'support', 'resistance' and the aliases 'buy_limit' / 'sell_limit'.
+    `open_` is only read by the CONDITIONAL variant and may be None for SIMPLE.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    if variant == SIMPLE:
+        x = high + low + close
+    elif variant == CONDITIONAL:
+        open_ = np.asarray(open_, dtype=np.float64)
+        # start from H + L + C and double the leg the candle closed towards
+        x = high + low + close + np.where(close > open_, high, np.where(close < open_, low, close))
+    else:
+        raise ValueError(f'unknown DeMark variant {variant!r}')
+    support = x / 2.0 - high
+    resistance = x / 2.0 - low
+    return {'pivot': x / 4.0, 'support': support, 'resistance': resistance,
+            'buy_limit': support, 'sell_limit': resistance}
+
+
+def next_bar_levels(open_, high, low, close, variant: str = CONDITIONAL) -> Dict[str, np.ndarray]:
+    """levels() of the previous bar, aligned to the bar they apply to (first row NaN)."""
+    out = {}
+    for k, v in levels(open_, high, low, close, variant).items():
+        shifted = np.full(v.shape, np.nan)
+        shifted[1:] = v[:-1]
+        out[k] = shifted
+    return out
+
+
+def ohlc_panel(histories: Dict[str, pd.DataFrame], align: str = 'bars', max_bars=None) -> Dict[str, panel.Panel]:
+    """Open/High/Low/Close panels for many tickers, aligned the same way (see panel.build_panel)."""
+    return {c: panel.build_panel(histories, column=c, align=align, max_bars=max_bars)
+            for c in ('Open', 'High', 'Low', 'Close')}
+
+
+def limit_entries(open_, high, low, close, variant: str = CONDITIONAL) -> Dict[str, np.ndarray]:
+    """Every bar's DeMark buy-limit entry, exited at that bar's close.
+
+    A buy limit at the previous bar's support fills when the bar trades down to it; a bar
+    that opens below the limit fills at the open. Returns 'filled' (bool), 'entry' (fill
+    price, NaN when not filled), 'ret' (close / entry - 1) and the levels used.
+    """
+    open_ = np.asarray(open_, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    lv = next_bar_levels(open_, high, low, close, variant)
+    limit = lv['buy_limit']
+    with np.errstate(invalid='ignore'):
+        filled = low <= limit
+        entry = np.where(filled, np.minimum(open_, limit), np.nan)
+        ret = close / entry - 1.0
+    out = dict(lv)
+    out.update({'filled': filled, 'entry': entry, 'ret': ret})
+    return out
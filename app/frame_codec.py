@@ -0,0 +1,165 @@
+"""Columnar binary encoding for OHLCV frames.
+
+Layout: MAGIC | uint32 header length | JSON header | column buffers (8-byte aligned).
+Each column is a raw little-endian NumPy buffer, so decoding is np.frombuffer over the
+blob (or an mmap of a file) with no per-value parsing and no copy. Frames the format
+cannot describe (object/string columns, MultiIndex, ...) fall back to pickle, and
+decode() still accepts the pickle blobs written by older versions of the cache.
+"""
+import json
+import mmap
+import pickle
+import struct
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+MAGIC = b'YFC1'
+_ALIGN = 8
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def _column_supported(arr: np.ndarray) -> bool:
+    return arr.dtype.kind in 'fiub'
+
+
+def _encode_index(idx: pd.Index):
+    """Return (meta, ndarray) for the index, or None if it is not representable."""
+    if isinstance(idx, pd.DatetimeIndex):
+        tz = str(idx.tz) if idx.tz is not None else None
+        return {'kind': 'datetime', 'unit': idx.unit, 'tz': tz, 'name': idx.name}, idx.asi8
+    if isinstance(idx, pd.RangeIndex):
+        return {'kind': 'range', 'start': idx.start, 'step': idx.step, 'name': idx.name}, None
+    if isinstance(idx, pd.MultiIndex):
+        return None
+    values = np.asarray(idx)
+    if _column_supported(values):
+        return {'kind': 'values', 'name': idx.name}, values
+    return None
+
+
+def encode(df: pd.DataFrame) -> bytes:
+    """Encode a DataFrame to the columnar format (pickle when unsupported)."""
+    if df is None:
+        df = pd.DataFrame()
+    cols = list(df.columns)
+    if isinstance(df.columns, pd.MultiIndex) or any(not isinstance(c, str) for c in cols) or len(set(cols)) != len(cols):
+        return pickle.dumps(df)
+    index_meta = _encode_index(df.index)
+    if index_meta is None:
+        return pickle.dumps(df)
+    # group columns by dtype so each group decodes as a single 2-D pandas block
+    groups = {}
+    for pos, c in enumerate(cols):
+        arr = df[c].to_numpy()
+        if not _column_supported(arr):
+            return pickle.dumps(df)
+        groups.setdefault(arr.dtype.newbyteorder('<').str, []).append((pos, arr))
+    imeta, ivalues = index_meta
+    buffers = []
+    if ivalues is not None:
+        imeta['dtype'] = ivalues.dtype.newbyteorder('<').str
+        buffers.append((imeta, np.ascontiguousarray(ivalues, dtype=imeta['dtype'])))
+    blocks = []
+    for dtype, items in groups.items():
+        m = {'dtype': dtype, 'placement': [pos for pos, _ in items]}
+        blocks.append(m)
+        buffers.append((m, np.ascontiguousarray(np.stack([a for _, a in items]).astype(dtype, copy=False))))
+
+    # offsets are relative to the start of the data section
+    offset = 0
+    for m, arr in buffers:
+        m['offset'] = offset
+        offset += arr.nbytes + _pad(arr.nbytes)
+    header = json.dumps({'nrows': len(df), 'columns': cols, 'index': imeta, 'blocks': blocks}).encode('utf-8')
+    head = MAGIC + struct.pack('<I', len(header)) + header
+    parts = [head, b'\0' * _pad(len(head))]
+    for _, arr in buffers:
+        parts.append(arr.tobytes())
+        parts.append(b'\0' * _pad(arr.nbytes))
+    return b''.join(parts)
+
+
+def _datetime_index(raw: np.ndarray, unit: str, tz: Optional[str], name) -> pd.DatetimeIndex:
+    values = raw.view(f'datetime64[{unit}]')
+    if tz:
+        try:
+            # values are already UTC epoch offsets: wrap them without re-validating every element
+            from pandas.arrays import DatetimeArray
+            arr = DatetimeArray._simple_new(values, dtype=pd.DatetimeTZDtype(unit, tz))
+            return pd.DatetimeIndex(arr, name=name)
+        except Exception:
+            return pd.DatetimeIndex(values, name=name).tz_localize('UTC').tz_convert(tz)
+    return pd.DatetimeIndex(values, name=name)
+
+
+@lru_cache(maxsize=64)
+def _columns_index(names: tuple) -> pd.Index:
+    # building a string Index dominates decode time for short frames; Index objects are immutable so share them
+    return pd.Index(list(names))
+
+
+def _from_blocks(blocks, index: pd.Index, columns: list) -> pd.DataFrame:
+    try:
+        from pandas.api.internals import create_dataframe_from_blocks
+    except ImportError:
+        # pandas < 3: the dict constructor still avoids copying, it just makes one block per column
+        data = {}
+        for values, placement in blocks:
+            for row, pos in enumerate(placement):
+                data[columns[pos]] = values[row]
+        return pd.DataFrame(data, index=index, columns=columns, copy=False)
+    return create_dataframe_from_blocks(blocks, index=index, columns=_columns_index(tuple(columns)))
+
+
+def decode(buf) -> pd.DataFrame:
+    """Decode a blob produced by encode() (or a legacy pickle) without copying column data.
+
+    Columnar frames are backed by read-only views of `buf`; copy before mutating in place.
+    """
+    if buf is None:
+        return pd.DataFrame()
+    mv = memoryview(buf)
+    if bytes(mv[:4]) != MAGIC:
+        return pickle.loads(mv)
+    (hlen,) = struct.unpack_from('<I', mv, 4)
+    header = json.loads(bytes(mv[8:8 + hlen]).decode('utf-8'))
+    base = 8 + hlen + _pad(8 + hlen)
+    nrows = header['nrows']
+
+    def _view(m, count):
+        return np.frombuffer(mv, dtype=np.dtype(m['dtype']), count=count, offset=base + m['offset'])
+
+    imeta = header['index']
+    if imeta['kind'] == 'datetime':
+        index = _datetime_index(_view(imeta, nrows), imeta['unit'], imeta['tz'], imeta['name'])
+    elif imeta['kind'] == 'range':
+        index = pd.RangeIndex(imeta['start'], imeta['start'] + imeta['step'] * nrows, imeta['step'], name=imeta['name'])
+    else:
+        index = pd.Index(_view(imeta, nrows), name=imeta['name'])
+    blocks = []
+    for m in header['blocks']:
+        k = len(m['placement'])
+        values = _view(m, k * nrows).reshape(k, nrows)
+        blocks.append((values, np.asarray(m['placement'], dtype=np.intp)))
+    return _from_blocks(blocks, index, header['columns'])
+
+
+def write_file(path: str, df: pd.DataFrame):
+    with open(path, 'wb') as f:
+        f.write(encode(df))
+
+
+def read_file(path: str) -> Optional[pd.DataFrame]:
+    """Memory-map a file written by write_file(); columns are views into the mapping."""
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            return None
+    return decode(mm)
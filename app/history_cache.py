@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+import pandas as pd
+
+
+def frame_nbytes(df) -> int:
+    """Approximate in-memory size of a cached frame (numeric OHLCV, so no deep inspection)."""
+    try:
+        return int(df.memory_usage(index=True, deep=False).sum())
+    except Exception:
+        return 0
+
+
+class HistoryCache:
+    """Thread-safe LRU of {key: (fetched_at, DataFrame)} bounded by total frame bytes.
+
+    Entries older than `max_age` seconds are dropped on access and by periodic sweeps;
+    when the byte budget is exceeded the least recently used entries are evicted.
+    Freshness for serving (the TTL) is still decided by callers from `fetched_at`.
+    `on_evict(key, fetched_at, df)`, if given, is called (outside the lock) for entries
+    dropped by LRU eviction or age sweeps, so they can be demoted to a slower tier.
+    """
+
+    def __init__(self, max_bytes: int, max_age: Optional[float] = None, sweep_every: int = 64,
+                 on_evict: Optional[Callable] = None):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._sweep_every = sweep_every
+        self._lock = threading.Lock()
+        self._data: 'OrderedDict[Hashable, Tuple[float, pd.DataFrame, int]]' = OrderedDict()
+        self._bytes = 0
+        self._sets = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.oversize = 0
+        self.on_evict = on_evict
+
+    def _drop(self, key):
+        ts, df, n = self._data.pop(key)
+        self._bytes -= n
+        return ts, df
+
+    def _notify(self, dropped):
+        if self.on_evict is None:
+            return
+        for key, ts, df in dropped:
+            try:
+                self.on_evict(key, ts, df)
+            except Exception:
+                pass
+
+    def _expired(self, ts: float, now: float) -> bool:
+        return self.max_age is not None and now - ts >= self.max_age
+
+    def get(self, key, default=None):
+        with self._lock:
+            e = self._data.get(key)
+            if e is None:
+                return default
+            if self._expired(e[0], time.time()):
+                self._drop(key)
+                self.expirations += 1
+                return default
+            self._data.move_to_end(key)
+            return (e[0], e[1])
+
+    def __getitem__(self, key):
+        e = self.get(key)
+        if e is None:
+            raise KeyError(key)
+        return e
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def __setitem__(self, key, value):
+        ts, df = value
+        n = frame_nbytes(df)
+        dropped = []
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            if n > self.max_bytes:
+                # a single frame larger than the whole budget is not worth caching
+                self.oversize += 1
+                return
+            self._data[key] = (ts, df, n)
+            self._bytes += n
+            self._sets += 1
+            if self._sets % self._sweep_every == 0:
+                dropped += self._sweep(time.time())
+            while self._bytes > self.max_bytes and self._data:
+                old = next(iter(self._data))
+                dropped.append((old,) + self._drop(old))
+                self.evictions += 1
+        self._notify(dropped)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            ts, df, _ = self._data[key]
+            self._drop(key)
+            return (ts, df)
+
+    def _sweep(self, now: float) -> list:
+        if self.max_age is None:
+            return []
+        dropped = []
+        for key in [k for k, e in self._data.items() if self._expired(e[0], now)]:
+            dropped.append((key,) + self._drop(key))
+            self.expirations += 1
+        return dropped
+
+    def expire(self):
+        """Drop every entry older than max_age."""
+        with self._lock:
+            dropped = self._sweep(time.time())
+        self._notify(dropped)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'oversize': self.oversize,
+            }
@@ -0,0 +1,130 @@
+"""Memoized indicator results, keyed on the data they were computed from.
+
+One refresh cycle asks for the same ticker's RSI14 several times (evaluate_ticker for the
+scan, again inside ai_backtest, the detail pane). MA200 and DeMark levels are cheaper to
+recompute than to fingerprint their input, so only RSI goes through the memo. Results are
+kept under (ticker, kind, params) together with a version of the input: its length,
+first and last index, last two rows and the sum of its values. A new bar, a tick that
+revises the latest bar or a back-adjustment of older bars changes the version, and the
+next lookup recomputes and replaces the entry. No TTL or wall-clock is involved.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .metrics import registry as _metrics
+
+_MAX_ENTRIES = int(os.getenv('YF_INDICATOR_MEMO_SIZE', '8192'))
+
+for _name in ('indicator_memo_hits', 'indicator_memo_misses'):
+    _metrics.incr(_name, 0)
+
+
+def data_version(data) -> tuple:
+    """Fingerprint of a Series/DataFrame that changes when a bar is added or revised.
+
+    Besides the length and first/last index it holds the raw bytes of the last two rows
+    (DeMark reads bar -2) and the sum of all values, so a split or dividend back-adjustment
+    of older bars changes it too. That costs one float conversion and one nansum, tens of
+    microseconds for a year of daily bars: more than an SMA or DeMark levels cost to
+    compute directly, far less than RSI.
+    """
+    n = len(data)
+    if n == 0:
+        return (0,)
+    try:
+        values = data.to_numpy(dtype=np.float64, na_value=np.nan)
+    except (TypeError, ValueError):
+        # non-numeric columns: compare the last two rows as Python values
+        tail = np.asarray(data.iloc[-2:], dtype=object).reshape(min(n, 2), -1)
+        tail = tuple(tuple(None if pd.isna(x) else x for x in row) for row in tail)
+        return (n, data.index[0], data.index[-1], tail)
+    # bytes compare NaN bit patterns equal, unlike NaN != NaN
+    return (n, data.index[0], data.index[-1], values[-2:].tobytes(), float(np.nansum(values)))
+
+
+class IndicatorMemo:
+    def __init__(self, max_entries: int = _MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._stats = {}
+        self.invalidations = 0
+
+    def _count(self, kind: str, field: str):
+        s = self._stats.setdefault(kind, {'hits': 0, 'misses': 0})
+        s[field] += 1
+
+    def get(self, ticker: str, kind: str, params: tuple, version: tuple, compute: Callable):
+        """Return the memoized value for this data version, computing it on a miss."""
+        key = (ticker, kind, params)
+        with self._lock:
+            e = self._data.get(key)
+            if e is not None and e[0] == version:
+                self._data.move_to_end(key)
+                self._count(kind, 'hits')
+                _metrics.incr('indicator_memo_hits')
+                return _copy(e[1])
+            if e is not None:
+                self.invalidations += 1
+            self._count(kind, 'misses')
+        _metrics.incr('indicator_memo_misses')
+        value = compute()
+        with self._lock:
+            self._data[key] = (version, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return _copy(value)
+
+    def stats(self) -> dict:
+        """Per-kind hits, misses and hit_ratio, plus totals."""
+        with self._lock:
+            out = {}
+            hits = misses = 0
+            for kind, s in self._stats.items():
+                total = s['hits'] + s['misses']
+                out[kind] = dict(s, hit_ratio=s['hits'] / total if total else None)
+                hits += s['hits']
+                misses += s['misses']
+            out['total'] = {'hits': hits, 'misses': misses, 'hit_ratio': hits / (hits + misses) if hits + misses else None,
+                            'entries': len(self._data), 'invalidations': self.invalidations}
+            return out
+
+    def clear(self, ticker: Optional[str] = None):
+        with self._lock:
+            if ticker is None:
+                self._data.clear()
+                self._stats.clear()
+                self.invalidations = 0
+            else:
+                for key in [k for k in self._data if k[0] == ticker]:
+                    del self._data[key]
+
+
+def _copy(value):
+    # dict results (DeMark levels) end up in result payloads callers may edit
+    return dict(value) if isinstance(value, dict) else value
+
+
+memo = IndicatorMemo()
+
+
+def memoized(ticker: Optional[str], kind: str, data, params: tuple, compute: Callable,
+             version: Optional[tuple] = None):
+    """memo.get() for an indicator computed from `data`; without a ticker it just computes.
+
+    Only worth it for indicators that cost much more than data_version() (RSI's Wilder
+    recursion); pass `version` when several lookups share the same data.
+    """
+    if not ticker or data is None:
+        return compute()
+    return memo.get(ticker, kind, params, data_version(data) if version is None else version, compute)
+
+
+def get_memo_stats() -> dict:
+    return memo.stats()
@@ -1,28 +1,11 @@
 import logging
-import json
-import os
 import pandas as pd
 import numpy as np
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
-logger = logging.getLogger(__name__)
-
-# ensure logs dir
-_LOG_DIR = os.path.join(os.getcwd(), 'logs')
-os.makedirs(_LOG_DIR, exist_ok=True)
-_PEG_LOG = os.path.join(_LOG_DIR, 'peg_revenue.log')
+from . import decision_log, demark
 
-# setup rotating JSONL logger for PEG/revenue decisions
-_PEG_LOGGER = logging.getLogger('peg_logger')
-if not _PEG_LOGGER.handlers:
-    from logging.handlers import RotatingFileHandler
-    rh = RotatingFileHandler(_PEG_LOG, maxBytes=2_000_000, backupCount=5, encoding='utf-8')
-    rh.setLevel(logging.INFO)
-    # handler will receive a JSON string as the message
-    formatter = logging.Formatter('%(message)s')
-    rh.setFormatter(formatter)
-    _PEG_LOGGER.addHandler(rh)
-    _PEG_LOGGER.setLevel(logging.INFO)
+logger = logging.getLogger(__name__)
 
 
 def _append_decision_log(kind: str, info: dict, used_field: str, value, note: str = ''):
@@ -30,30 +13,35 @@ def _append_decision_log(kind: str, info: dict, used_field: str, value, note: st
         symbol = None
         if isinstance(info, dict):
             symbol = info.get('symbol') or info.get('ticker') or info.get('shortName')
-        rec = {
-            'ts': time_fmt(),
-            'kind': kind,
-            'symbol': symbol,
-            'used_field': used_field,
-            'value': value,
-            'note': note,
-        }
-        # write as a single JSON line via the rotating logger
-        _PEG_LOGGER.info(json.dumps(rec, ensure_ascii=False))
+        # queued for the background writer (deduplicated, batched); never blocks
+        decision_log.sink.submit(kind, symbol, used_field, value, note)
     except Exception:
         # best-effort logging - avoid crashing indicators
         logger.debug('failed to append decision log')
 
 
-def time_fmt():
-    from datetime import datetime, timezone
-    return datetime.now(timezone.utc).isoformat()
+def ma(series: pd.Series, window: int = 200) -> Optional[float]:
+    return moving_averages(series, (window,))[window]
 
 
-def ma(series: pd.Series, window: int = 200) -> Optional[float]:
-    if series is None or len(series) < window:
-        return None
-    return float(series.rolling(window).mean().iloc[-1])
+def moving_averages(series: pd.Series, windows: Iterable[int] = (20, 50, 200)) -> Dict[int, Optional[float]]:
+    """Latest simple moving average for every window, from one cumulative sum over the tail.
+
+    Same values as series.rolling(w).mean().iloc[-1]: None when the series is shorter than
+    the window, NaN when the window holds a NaN.
+    """
+    windows = [int(w) for w in windows]
+    out: Dict[int, Optional[float]] = {w: None for w in windows}
+    n = 0 if series is None else len(series)
+    usable = [w for w in windows if 0 < w <= n]
+    if not usable:
+        return out
+    tail = np.asarray(series.to_numpy()[n - max(usable):], dtype=np.float64)
+    # suffix sums: sums[k-1] is the sum of the last k bars (NaN once a NaN is included)
+    sums = np.cumsum(tail[::-1])
+    for w in usable:
+        out[w] = float(sums[w - 1] / w)
+    return out
 
 
 def rsi(series: pd.Series, window: int = 14) -> Optional[float]:
@@ -211,13 +199,10 @@ def gap_vs_sector(current_price: float, sector_mean_ma20: float) -> Optional[flo
 
 
 def demark_targets(prev_high: float, prev_low: float, prev_close: float) -> dict:
-    # Using X = High + Low + Close as a simple approach
-    X = (prev_high or 0) + (prev_low or 0) + (prev_close or 0)
-    pivot = X / 4.0
-    support = X / 2.0 - (prev_high or 0)
-    resistance = X / 2.0 - (prev_low or 0)
+    # Using X = High + Low + Close as a simple approach (demark.SIMPLE)
+    lv = demark.levels(None, prev_high or 0, prev_low or 0, prev_close or 0, variant=demark.SIMPLE)
     return {
-        'pivot': pivot,
-        'support': support,
-        'resistance': resistance,
+        'pivot': float(lv['pivot']),
+        'support': float(lv['support']),
+        'resistance': float(lv['resistance']),
     }
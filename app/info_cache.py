@@ -0,0 +1,144 @@
+"""Ticker.info cache with per-field freshness classes.
+
+Yahoo's info payload mixes data that changes on very different time scales, so each
+field belongs to a freshness class with its own TTL:
+  - static: company profile (sector, industry, names, exchange...), kept for days
+  - fundamental: ratios and growth figures (pegRatio, revenueGrowth...), kept for hours
+  - price: quote fields (regularMarketPrice, dayHigh...), kept for seconds
+A lookup names the classes it needs and is a hit when all of them are fresh. Entries
+are persisted to SQLite so a restart starts warm; the database is opened on first use.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+STATIC = 'static'
+FUNDAMENTAL = 'fundamental'
+PRICE = 'price'
+ALL_CLASSES = (STATIC, FUNDAMENTAL, PRICE)
+
+DEFAULT_TTLS = {
+    STATIC: float(os.getenv('YF_INFO_TTL_STATIC', str(7 * 24 * 3600))),
+    FUNDAMENTAL: float(os.getenv('YF_INFO_TTL_FUNDAMENTAL', str(6 * 3600))),
+    PRICE: float(os.getenv('YF_INFO_TTL_PRICE', '15')),
+}
+
+_INFO_CACHE_PATH = os.path.join(os.getcwd(), '.cache', 'yf_info.sqlite')
+
+_STATIC_FIELDS = frozenset((
+    'symbol', 'shortName', 'longName', 'displayName', 'sector', 'sectorKey', 'sectorDisp',
+    'industry', 'industryKey', 'industryDisp', 'country', 'city', 'state', 'zip', 'address1',
+    'address2', 'phone', 'website', 'irWebsite', 'longBusinessSummary', 'fullTimeEmployees',
+    'companyOfficers', 'exchange', 'fullExchangeName', 'exchangeTimezoneName',
+    'exchangeTimezoneShortName', 'gmtOffSetMilliseconds', 'timeZoneFullName', 'timeZoneShortName',
+    'quoteType', 'typeDisp', 'currency', 'financialCurrency', 'market', 'region', 'language',
+    'firstTradeDateEpochUtc', 'firstTradeDateMilliseconds', 'messageBoardId', 'uuid',
+))
+
+_PRICE_FIELDS = frozenset((
+    'currentPrice', 'regularMarketPrice', 'regularMarketOpen', 'regularMarketDayHigh',
+    'regularMarketDayLow', 'regularMarketVolume', 'regularMarketChange',
+    'regularMarketChangePercent', 'regularMarketPreviousClose', 'regularMarketTime',
+    'open', 'dayHigh', 'dayLow', 'previousClose', 'volume', 'bid', 'ask', 'bidSize', 'askSize',
+    'preMarketPrice', 'preMarketChange', 'preMarketChangePercent', 'postMarketPrice',
+    'postMarketChange', 'postMarketChangePercent', 'marketState',
+))
+
+
+def field_class(field: str) -> str:
+    if field in _STATIC_FIELDS:
+        return STATIC
+    if field in _PRICE_FIELDS:
+        return PRICE
+    return FUNDAMENTAL
+
+
+def classes_for(fields: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sorted({field_class(f) for f in fields}))
+
+
+class InfoCache:
+    def __init__(self, path: Optional[str] = _INFO_CACHE_PATH, ttls: Optional[Dict[str, float]] = None):
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self._lock = threading.Lock()
+        # ticker -> (info, {class: fetched_at})
+        self._mem: Dict[str, Tuple[dict, Dict[str, float]]] = {}
+        self.path = path
+        self._conn = None
+        self._opened = False
+
+    def _db(self):
+        """The SQLite connection, opened on first use (caller holds self._lock)."""
+        if not self._opened:
+            self._opened = True
+            if self.path:
+                try:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+                    conn.execute('''CREATE TABLE IF NOT EXISTS info (ticker TEXT PRIMARY KEY,
+                                    ts_static REAL, ts_fundamental REAL, ts_price REAL, payload TEXT)''')
+                    conn.commit()
+                    self._conn = conn
+                except Exception:
+                    self._conn = None
+        return self._conn
+
+    def _entry(self, ticker: str):
+        e = self._mem.get(ticker)
+        if e is None and self._db() is not None:
+            try:
+                row = self._conn.execute('SELECT ts_static, ts_fundamental, ts_price, payload FROM info WHERE ticker = ?',
+                                         (ticker,)).fetchone()
+            except Exception:
+                row = None
+            if row is not None:
+                e = (json.loads(row[3]), {STATIC: row[0], FUNDAMENTAL: row[1], PRICE: row[2]})
+                self._mem[ticker] = e
+        return e
+
+    def get(self, ticker: str, classes: Iterable[str] = ALL_CLASSES, allow_stale: bool = False) -> Optional[dict]:
+        """Return the cached info if every requested class is fresh (or any entry when allow_stale)."""
+        now = time.time()
+        with self._lock:
+            e = self._entry(ticker)
+        if e is None:
+            return None
+        info, stamps = e
+        if not allow_stale:
+            for cls in classes:
+                ts = stamps.get(cls)
+                if ts is None or now - ts >= self.ttls[cls]:
+                    return None
+        return info
+
+    def put(self, ticker: str, info: dict):
+        now = time.time()
+        stamps = {cls: now for cls in ALL_CLASSES}
+        with self._lock:
+            self._mem[ticker] = (info, stamps)
+            if self._db() is not None:
+                try:
+                    self._conn.execute('REPLACE INTO info (ticker, ts_static, ts_fundamental, ts_price, payload) VALUES (?, ?, ?, ?, ?)',
+                                       (ticker, now, now, now, json.dumps(info, ensure_ascii=False, default=str)))
+                    self._conn.commit()
+                except Exception:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db() is not None:
+                try:
+                    self._conn.execute('DELETE FROM info')
+                    self._conn.commit()
+                except Exception:
+                    pass
+
+    def __len__(self):
+        with self._lock:
+            return len(self._mem)
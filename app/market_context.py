@@ -0,0 +1,69 @@
+"""Market-wide inputs (VIX, benchmark histories and returns) built once per scan.
+
+Per-ticker evaluations take a MarketContext instead of downloading ^VIX and the
+benchmark index again for every ticker.
+"""
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from .data_fetcher import get_histories, get_history, get_vix
+
+DEFAULT_BENCHMARKS = ('^IXIC', '^KS11')
+
+
+class MarketContext:
+    def __init__(self, vix: Optional[float], benchmarks: Dict[str, pd.DataFrame], period: str = '1y'):
+        self.vix = vix
+        self.period = period
+        self.built_at = time.time()
+        self._benchmarks = dict(benchmarks)
+        self._returns = {}
+        self._lock = threading.Lock()
+
+    def benchmark_history(self, symbol: str) -> pd.DataFrame:
+        """History for a benchmark; one not fetched at build time is fetched once and kept."""
+        symbol = symbol.upper()
+        with self._lock:
+            df = self._benchmarks.get(symbol)
+        if df is None:
+            try:
+                df = get_history(symbol, period=self.period)
+            except Exception:
+                df = pd.DataFrame()
+            with self._lock:
+                df = self._benchmarks.setdefault(symbol, df)
+        return df
+
+    def benchmark_return(self, symbol: str, days: int = 20) -> Optional[float]:
+        """Latest `days`-bar return of the benchmark close, or None without enough data."""
+        key = (symbol.upper(), days)
+        with self._lock:
+            if key in self._returns:
+                return self._returns[key]
+        df = self.benchmark_history(symbol)
+        ret = None
+        if df is not None and 'Close' in df.columns and len(df) > days:
+            r = df['Close'].pct_change(days).iloc[-1]
+            ret = None if pd.isna(r) else float(r)
+        with self._lock:
+            self._returns[key] = ret
+        return ret
+
+
+def build_market_context(benchmarks: Iterable[str] = DEFAULT_BENCHMARKS, period: str = '1y') -> MarketContext:
+    """Fetch VIX and all benchmark histories (one bulk request) for the coming scan."""
+    try:
+        vix = get_vix()
+    except Exception:
+        vix = None
+    symbols = [b.upper() for b in benchmarks]
+    try:
+        histories = get_histories(symbols, period=period) if symbols else {}
+    except Exception:
+        histories = {}
+    # keep only usable frames so a failed one is retried lazily by benchmark_history()
+    histories = {s: df for s, df in histories.items() if df is not None and not df.empty}
+    return MarketContext(vix, histories, period=period)
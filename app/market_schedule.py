@@ -0,0 +1,152 @@
+"""Market-hours aware refresh scheduling for the ticker universe.
+
+Each ticker maps to an exchange session (timezone, regular open/close), taken from the
+history metadata Yahoo returns with a chart request when data_fetcher has seen it, and
+otherwise from a static table keyed by the ticker suffix. RefreshScheduler then decides
+which tickers need a refresh:
+  - market open: every `open_interval` seconds
+  - after the close: once, `post_close_grace` seconds after the closing bell
+  - before the open: once, `prefetch_lead` seconds ahead of the next open, to warm caches
+Weekends count as closed; exchange holidays simply look like a session with no new bars.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, time as dtime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+Session = namedtuple('Session', 'tz open close')
+
+SESSIONS = {
+    'US': Session('America/New_York', dtime(9, 30), dtime(16, 0)),
+    'KR': Session('Asia/Seoul', dtime(9, 0), dtime(15, 30)),
+    'JP': Session('Asia/Tokyo', dtime(9, 0), dtime(15, 30)),
+    'HK': Session('Asia/Hong_Kong', dtime(9, 30), dtime(16, 0)),
+    'CN': Session('Asia/Shanghai', dtime(9, 30), dtime(15, 0)),
+    'GB': Session('Europe/London', dtime(8, 0), dtime(16, 30)),
+    'EU': Session('Europe/Berlin', dtime(9, 0), dtime(17, 30)),
+    'CA': Session('America/Toronto', dtime(9, 30), dtime(16, 0)),
+}
+
+_SUFFIX_MARKET = {
+    'KS': 'KR', 'KQ': 'KR', 'T': 'JP', 'HK': 'HK', 'SS': 'CN', 'SZ': 'CN', 'L': 'GB',
+    'DE': 'EU', 'F': 'EU', 'PA': 'EU', 'AS': 'EU', 'MI': 'EU', 'MC': 'EU', 'TO': 'CA', 'V': 'CA',
+}
+_INDEX_MARKET = {'^KS11': 'KR', '^KQ11': 'KR', '^N225': 'JP', '^HSI': 'HK', '^FTSE': 'GB', '^GDAXI': 'EU'}
+
+_OPEN_INTERVAL = float(os.getenv('YF_REFRESH_OPEN_SECONDS', '60'))
+_POST_CLOSE_GRACE = float(os.getenv('YF_REFRESH_POST_CLOSE_SECONDS', '900'))
+_PREFETCH_LEAD = float(os.getenv('YF_REFRESH_PREFETCH_SECONDS', '900'))
+
+
+def market_for(ticker: str) -> str:
+    t = ticker.upper()
+    if t in _INDEX_MARKET:
+        return _INDEX_MARKET[t]
+    if '.' in t:
+        return _SUFFIX_MARKET.get(t.rsplit('.', 1)[1], 'US')
+    return 'US'
+
+
+def session_from_metadata(meta: Optional[dict]) -> Optional[Session]:
+    """Session from yfinance history metadata (exchangeTimezoneName + currentTradingPeriod)."""
+    try:
+        tz = meta['exchangeTimezoneName']
+        regular = meta['currentTradingPeriod']['regular']
+        start = pd.Timestamp(regular['start'], unit='s', tz='UTC').tz_convert(tz)
+        end = pd.Timestamp(regular['end'], unit='s', tz='UTC').tz_convert(tz)
+    except Exception:
+        return None
+    if end <= start:
+        return None
+    return Session(tz, start.time(), end.time())
+
+
+def session_for(ticker: str, meta: Optional[dict] = None) -> Session:
+    return session_from_metadata(meta) or SESSIONS[market_for(ticker)]
+
+
+def market_state(session: Session, now: Optional[float] = None):
+    """Return (is_open, last_close, next_open), the last two as epoch seconds."""
+    local = pd.Timestamp(time.time() if now is None else now, unit='s', tz='UTC').tz_convert(session.tz)
+
+    def at(day, t):
+        return pd.Timestamp(datetime.combine(day, t)).tz_localize(session.tz)
+
+    today = local.date()
+    is_open = local.weekday() < 5 and at(today, session.open) <= local < at(today, session.close)
+    d = today
+    while d.weekday() >= 5 or at(d, session.close) > local:
+        d -= timedelta(days=1)
+    last_close = at(d, session.close)
+    d = today
+    while d.weekday() >= 5 or at(d, session.open) <= local:
+        d += timedelta(days=1)
+    next_open = at(d, session.open)
+    return is_open, last_close.timestamp(), next_open.timestamp()
+
+
+class RefreshScheduler:
+    def __init__(self, tickers: Iterable[str], meta_lookup: Optional[Callable[[str], Optional[dict]]] = None,
+                 open_interval: float = _OPEN_INTERVAL, post_close_grace: float = _POST_CLOSE_GRACE,
+                 prefetch_lead: float = _PREFETCH_LEAD):
+        self.tickers = list(tickers)
+        self.meta_lookup = meta_lookup
+        self.open_interval = open_interval
+        self.post_close_grace = post_close_grace
+        self.prefetch_lead = prefetch_lead
+        self._lock = threading.Lock()
+        self._last: Dict[str, float] = {}
+
+    def _session(self, ticker: str) -> Session:
+        meta = None
+        if self.meta_lookup is not None:
+            try:
+                meta = self.meta_lookup(ticker)
+            except Exception:
+                meta = None
+        return session_for(ticker, meta)
+
+    def _next_due(self, ticker: str, now: float) -> float:
+        """Epoch time at which ticker next needs a refresh (<= now means due)."""
+        last = self._last.get(ticker)
+        if last is None:
+            return now
+        is_open, last_close, next_open = market_state(self._session(ticker), now)
+        if is_open:
+            return last + self.open_interval
+        settle = last_close + self.post_close_grace
+        prefetch = next_open - self.prefetch_lead
+        if last < settle:
+            return settle
+        if last < prefetch:
+            return prefetch
+        # nothing new until the open; then the open cadence applies
+        return max(next_open, last + self.open_interval)
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        now = time.time() if now is None else now
+        with self._lock:
+            return [t for t in self.tickers if self._next_due(t, now) <= now]
+
+    def seconds_until_due(self, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        with self._lock:
+            if not self.tickers:
+                return float('inf')
+            return max(0.0, min(self._next_due(t, now) for t in self.tickers) - now)
+
+    def mark_refreshed(self, tickers: Iterable[str], now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            for t in tickers:
+                self._last[t] = now
+
+    def invalidate(self, tickers: Optional[Iterable[str]] = None):
+        """Make tickers (all by default) due on the next check."""
+        with self._lock:
+            for t in list(self._last) if tickers is None else tickers:
+                self._last.pop(t, None)
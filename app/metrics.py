@@ -0,0 +1,138 @@
+"""In-process metrics: atomic counters, latency histograms and slow-call tracking.
+
+Histograms use fixed log-spaced buckets (20 per decade from 1us to 1000s), so
+recording is O(log buckets) with bounded memory and p50/p95/p99 are estimated by
+interpolating inside the bucket that holds the requested rank.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+_BOUNDS = [10 ** (e / 20.0) * 1e-6 for e in range(0, 9 * 20 + 1)]  # 1us .. 1000s
+
+_SLOW_CALL_SECONDS = float(os.getenv('YF_SLOW_CALL_SECONDS', '2.0'))
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = _BOUNDS[i - 1] if i > 0 else 0.0
+                hi = _BOUNDS[i] if i < len(_BOUNDS) else self.max
+                est = lo + (hi - lo) * ((rank - seen) / c)
+                return min(est, self.max)
+            seen += c
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'mean_s': self.total / self.count if self.count else None,
+            'p50_s': self.quantile(0.50),
+            'p95_s': self.quantile(0.95),
+            'p99_s': self.quantile(0.99),
+            'max_s': self.max,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, slow_threshold: float = _SLOW_CALL_SECONDS, max_slow_calls: int = 200):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._hists: Dict[str, Histogram] = {}
+        self.slow_threshold = slow_threshold
+        self._slow = deque(maxlen=max_slow_calls)
+        self._slow_by_label: Dict[str, dict] = {}
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def get(self, name: str, default: int = 0) -> int:
+        with self._lock:
+            return self._counters.get(name, default)
+
+    def observe(self, op: str, seconds: float, label: Optional[str] = None):
+        """Record one call of op taking `seconds`; label (usually the ticker) is kept for slow calls."""
+        with self._lock:
+            h = self._hists.get(op)
+            if h is None:
+                h = self._hists[op] = Histogram()
+            h.observe(seconds)
+            if label is not None and seconds >= self.slow_threshold:
+                self._slow.append({'ts': time.time(), 'op': op, 'label': label, 'seconds': seconds})
+                s = self._slow_by_label.setdefault(label, {'count': 0, 'total_s': 0.0, 'max_s': 0.0})
+                s['count'] += 1
+                s['total_s'] += seconds
+                s['max_s'] = max(s['max_s'], seconds)
+
+    @contextmanager
+    def timer(self, op: str, label: Optional[str] = None):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(op, time.perf_counter() - t0, label)
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def histograms(self) -> Dict[str, dict]:
+        with self._lock:
+            return {op: h.summary() for op, h in self._hists.items()}
+
+    def slow_calls(self, n: int = 20) -> list:
+        with self._lock:
+            return sorted(self._slow, key=lambda r: r['seconds'], reverse=True)[:n]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            slow_by_label = {k: dict(v) for k, v in self._slow_by_label.items()}
+        return {
+            'ts': time.time(),
+            'counters': self.counters(),
+            'latency': self.histograms(),
+            'slow_calls': self.slow_calls(),
+            'slow_by_label': slow_by_label,
+        }
+
+    def dump(self, path: str) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._hists.clear()
+            self._slow.clear()
+            self._slow_by_label.clear()
+
+
+# process-wide default registry
+registry = MetricsRegistry()
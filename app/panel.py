@@ -0,0 +1,192 @@
+"""Indicators for a whole universe at once over a (bars x tickers) price matrix.
+
+indicators.ma / rsi take one Series per call; these take a 2-D float array whose columns
+are tickers and compute every column in the same NumPy operations. Results are arrays of
+the same shape, row-aligned with the input, with NaN where a value is undefined (the
+cases where the per-ticker functions return None).
+
+build_panel() makes the matrix from get_histories() output. With align='bars' each
+column holds that ticker's own bars right-aligned, so the last row is every ticker's
+latest bar and exchange holidays never leave gaps in the middle; that is what a scan
+wants and it reproduces the per-ticker results exactly. align='dates' joins on the
+trading date instead (for cross-sectional work and backtests).
+"""
+from collections import namedtuple
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# index: DatetimeIndex for align='dates', None for align='bars'
+Panel = namedtuple('Panel', 'tickers index values')
+
+
+def _floats(s: pd.Series) -> np.ndarray:
+    if s.dtype == np.float64:
+        return s.to_numpy()
+    return s.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def build_panel(histories: Dict[str, pd.DataFrame], column: str = 'Close', align: str = 'bars',
+                max_bars: Optional[int] = None) -> Panel:
+    """Stack one column of each history into a float64 matrix, one column per ticker.
+
+    Tickers with no usable history get an all-NaN column. `max_bars` keeps only the most
+    recent rows.
+    """
+    tickers = list(histories)
+    series = []
+    for t in tickers:
+        df = histories[t]
+        if df is None or df.empty or column not in df.columns:
+            series.append(None)
+        else:
+            series.append(df[column])
+    if align == 'bars':
+        rows = max([len(s) for s in series if s is not None], default=0)
+        if max_bars is not None:
+            rows = min(rows, max_bars)
+        values = np.full((rows, len(tickers)), np.nan)
+        for j, s in enumerate(series):
+            if s is None or not rows:
+                continue
+            v = _floats(s)[-rows:]
+            values[rows - len(v):, j] = v
+        return Panel(tickers, None, values)
+    if align != 'dates':
+        raise ValueError(f'unknown align {align!r}')
+    dates = [None] * len(tickers)
+    for j, s in enumerate(series):
+        if s is None or not isinstance(s.index, pd.DatetimeIndex):
+            continue
+        idx = s.index
+        # join on the local trading date so Seoul and New York daily bars line up
+        dates[j] = (idx.tz_localize(None) if idx.tz is not None else idx).normalize().to_numpy()
+    present = [d for d in dates if d is not None]
+    index = pd.DatetimeIndex(np.unique(np.concatenate(present)) if present else [])
+    if max_bars is not None:
+        index = index[-max_bars:]
+    values = np.full((len(index), len(tickers)), np.nan)
+    for j, d in enumerate(dates):
+        if d is None:
+            continue
+        # for duplicate dates the later bar wins, as it is written last
+        rows = index.get_indexer(d)
+        keep = rows >= 0
+        values[rows[keep], j] = _floats(series[j])[keep]
+    return Panel(tickers, index, values)
+
+
+def sma_windows(values: np.ndarray, windows: Iterable[int]) -> Dict[int, np.ndarray]:
+    """Simple moving averages for several windows from one prefix-sum pass.
+
+    Works on a single series (1-D) or a panel (2-D, one column per ticker). A value is NaN
+    until `window` valid bars and whenever the window holds a NaN, as with pandas
+    rolling(window).mean().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    windows = sorted({int(w) for w in windows})
+    out = {w: np.full(values.shape, np.nan) for w in windows}
+    n = values.shape[0]
+    if not windows or n < windows[0]:
+        return out
+    valid = ~np.isnan(values)
+    # prefix sums with a leading zero row: sum over (i-window, i] = cs[i+1] - cs[i+1-window]
+    cs = np.zeros((n + 1,) + values.shape[1:])
+    np.cumsum(np.where(valid, values, 0.0), axis=0, out=cs[1:])
+    cnt = np.zeros(cs.shape)
+    np.cumsum(valid, axis=0, out=cnt[1:])
+    for w in windows:
+        if w < 1 or n < w:
+            continue
+        full = (cnt[w:] - cnt[:-w]) == w
+        out[w][w - 1:] = np.where(full, (cs[w:] - cs[:-w]) / w, np.nan)
+    return out
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average of each column (see sma_windows)."""
+    return sma_windows(values, (window,))[int(window)]
+
+
+def rsi(values: np.ndarray, window: int = 14) -> np.ndarray:
+    """Wilder RSI of each column, matching indicators.rsi bar for bar.
+
+    Smoothing starts at each ticker's first price change; the recursion runs over the bars
+    while every ticker is updated at once. A missing bar keeps the previous averages.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    n = values.shape[0]
+    if n < 2:
+        return out
+    delta = np.diff(values, axis=0)
+    up = np.where(delta > 0, delta, 0.0)
+    down = np.where(delta < 0, -delta, 0.0)
+    have = ~np.isnan(delta)
+    alpha = 1.0 / window
+    avg_up = np.full(values.shape[1:], np.nan)
+    avg_down = np.full(values.shape[1:], np.nan)
+    for i in range(n - 1):
+        h = have[i]
+        start = h & np.isnan(avg_up)
+        avg_up = np.where(start, up[i], np.where(h, avg_up + alpha * (up[i] - avg_up), avg_up))
+        avg_down = np.where(start, down[i], np.where(h, avg_down + alpha * (down[i] - avg_down), avg_down))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = avg_up / np.where(avg_down == 0, np.nan, avg_down)
+        out[i + 1] = np.where(h, 100.0 - 100.0 / (1.0 + rs), np.nan)
+    # indicators.rsi needs `window` prices before it answers at all
+    counts = np.cumsum(~np.isnan(values), axis=0)
+    out[counts < window] = np.nan
+    return out
+
+
+def returns(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Fractional change over `periods` bars (pandas pct_change(periods))."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if 0 < periods < values.shape[0]:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[periods:] = values[periods:] / values[:-periods] - 1.0
+    return out
+
+
+def gap_pct(price: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Percent distance of price from reference (indicators.gap_vs_sector); NaN where reference is 0."""
+    price = np.asarray(price, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(reference == 0, np.nan, (price / reference - 1.0) * 100.0)
+
+
+def last(values: np.ndarray) -> np.ndarray:
+    """The last row (each ticker's latest value when the panel is bar-aligned)."""
+    values = np.asarray(values)
+    if values.shape[0] == 0:
+        return np.full(values.shape[1:], np.nan)
+    return values[-1]
+
+
+def compute(panel: Panel, ma_windows: Iterable[int] = (20, 200), rsi_window: int = 14,
+            return_periods: Iterable[int] = (20,), benchmark: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Standard scan indicators for every ticker, as arrays shaped like panel.values.
+
+    Keys: 'ma{w}', 'rsi{rsi_window}', 'ret{p}', and, when a benchmark close column (same
+    rows) is given, 'gap{p}' = benchmark return minus ticker return, as the GUI reports it.
+    """
+    v = panel.values
+    out = {}
+    for w, m in sma_windows(v, ma_windows).items():
+        out[f'ma{w}'] = m
+    out[f'rsi{rsi_window}'] = rsi(v, rsi_window)
+    for p in return_periods:
+        out[f'ret{p}'] = returns(v, p)
+        if benchmark is not None:
+            bench = returns(np.asarray(benchmark, dtype=np.float64).reshape(-1, 1), p)
+            out[f'gap{p}'] = bench - out[f'ret{p}']
+    return out
+
+
+def to_frame(panel: Panel, values: np.ndarray) -> pd.DataFrame:
+    """Label a result array with the panel's tickers (and dates when date-aligned)."""
+    return pd.DataFrame(values, index=panel.index, columns=panel.tickers)
@@ -0,0 +1,160 @@
+"""Long-term Parquet archive of daily (or coarser) bars, one file per (ticker, interval).
+
+Past bars do not change once a session has closed (apart from dividends and splits,
+which bar_store.get_history detects and answers with a full rewrite), so the archive
+keeps them indefinitely and only the tail is fetched again. It implements the same
+meta/load/replace/append/clear interface as bar_store.BarStore and can be used as its
+backend. Parquet needs pyarrow (or fastparquet); without one, available() is False and
+the archive tier is skipped.
+"""
+import json
+import os
+import threading
+import time
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import pandas as pd
+
+_ARCHIVE_DIR = os.getenv('YF_ARCHIVE_DIR', os.path.join(os.getcwd(), '.cache', 'yf_archive'))
+
+_engine = None
+
+
+def available() -> bool:
+    """True when pandas can write Parquet (pyarrow or fastparquet installed)."""
+    global _engine
+    if _engine is None:
+        _engine = ''
+        for name in ('pyarrow', 'fastparquet'):
+            try:
+                __import__(name)
+            except ImportError:
+                continue
+            _engine = name
+            break
+    return bool(_engine)
+
+
+class ParquetArchive:
+    def __init__(self, root: str = _ARCHIVE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _base(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, interval, quote(ticker, safe=''))
+
+    def _read_meta(self, ticker: str, interval: str) -> Optional[dict]:
+        try:
+            with open(self._base(ticker, interval) + '.json', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def meta(self, ticker: str, interval: str) -> Optional[Tuple[str, int, float]]:
+        """Return (tz, covered_from, updated) or None when nothing is archived."""
+        m = self._read_meta(ticker, interval)
+        if m is None:
+            return None
+        return m['tz'], m['covered_from'], m['updated']
+
+    def fetched_at(self, ticker: str, interval: str) -> Optional[float]:
+        """When the newest archived bars were fetched from Yahoo (not when they were written)."""
+        m = self._read_meta(ticker, interval)
+        if m is None:
+            return None
+        return m.get('fetched_at', m['updated'])
+
+    def load(self, ticker: str, interval: str, start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        m = self.meta(ticker, interval)
+        if m is None:
+            return pd.DataFrame()
+        try:
+            df = pd.read_parquet(self._base(ticker, interval) + '.parquet')
+        except Exception:
+            return pd.DataFrame()
+        if m[0] and df.index.tz is not None:
+            df.index = df.index.tz_convert(m[0])
+        if start is not None and not df.empty:
+            df = df[df.index >= start]
+        return df
+
+    def _write(self, ticker: str, interval: str, df: pd.DataFrame, covered_from: int, fetched_at: float):
+        base = self._base(ticker, interval)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        tz = str(df.index.tz) if getattr(df.index, 'tz', None) is not None else ''
+        tmp = base + '.parquet.tmp'
+        df.to_parquet(tmp, engine=_engine or 'auto')
+        os.replace(tmp, base + '.parquet')
+        with open(base + '.json.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'tz': tz, 'covered_from': covered_from, 'updated': time.time(), 'fetched_at': fetched_at}, f)
+        os.replace(base + '.json.tmp', base + '.json')
+
+    def replace(self, ticker: str, interval: str, df: pd.DataFrame, covered_from: int,
+                fetched_at: Optional[float] = None):
+        with self._lock:
+            self._write(ticker, interval, df, covered_from, time.time() if fetched_at is None else fetched_at)
+
+    def append(self, ticker: str, interval: str, tail: pd.DataFrame, fetched_at: Optional[float] = None):
+        """Merge a freshly fetched tail into an existing archive (see merge)."""
+        self.merge(ticker, interval, tail, None, fetched_at)
+
+    def merge(self, ticker: str, interval: str, df: pd.DataFrame, covered_from: Optional[int],
+              fetched_at: Optional[float] = None):
+        """Merge bars fetched at `fetched_at` (default now) into the archive.
+
+        A frame at least as new as the archive overwrites the archived bars in its date
+        range and keeps the ones before and after it; an older frame only adds bars the
+        archive does not have. covered_from only moves back; with None and nothing
+        archived, nothing is written.
+        """
+        if df is None or df.empty:
+            return
+        if fetched_at is None:
+            fetched_at = time.time()
+        with self._lock:
+            m = self._read_meta(ticker, interval)
+            if m is None:
+                if covered_from is not None:
+                    self._write(ticker, interval, df, covered_from, fetched_at)
+                return
+            archived_at = m.get('fetched_at', m['updated'])
+            stored = self.load(ticker, interval)
+            if stored.empty:
+                parts = [df]
+            elif fetched_at >= archived_at:
+                parts = [stored[stored.index < df.index[0]], df, stored[stored.index > df.index[-1]]]
+            else:
+                parts = [stored, df[~df.index.isin(stored.index)]]
+            merged = pd.concat([p for p in parts if not p.empty]).sort_index()
+            covered = m['covered_from'] if covered_from is None else min(covered_from, m['covered_from'])
+            self._write(ticker, interval, merged, covered, max(fetched_at, archived_at))
+
+    def clear(self, ticker: Optional[str] = None):
+        with self._lock:
+            for interval in os.listdir(self.root):
+                d = os.path.join(self.root, interval)
+                if not os.path.isdir(d):
+                    continue
+                for name in os.listdir(d):
+                    if ticker is None or name.split('.')[0] == quote(ticker, safe=''):
+                        try:
+                            os.remove(os.path.join(d, name))
+                        except OSError:
+                            pass
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> Optional[ParquetArchive]:
+    """Process-wide archive, or None when no Parquet engine is installed."""
+    global _archive
+    if not available():
+        return None
+    with _archive_lock:
+        if _archive is None:
+            _archive = ParquetArchive()
+        return _archive
@@ -0,0 +1,82 @@
+from typing import Optional
+import pandas as pd
+
+# yfinance period strings -> calendar offsets used to turn a period into a start date
+_PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+
+def is_known_period(period: str) -> bool:
+    return period in _PERIOD_OFFSETS or period in ('ytd', 'max')
+
+
+def period_start(period: str, now: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+    """Return the UTC start timestamp a yfinance period string refers to.
+
+    Returns None for 'max' (unbounded) and raises ValueError for unknown periods.
+    """
+    if now is None:
+        now = pd.Timestamp.now(tz='UTC')
+    elif now.tzinfo is None:
+        now = now.tz_localize('UTC')
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1, tz='UTC')
+    off = _PERIOD_OFFSETS.get(period)
+    if off is None:
+        raise ValueError(f'unknown period: {period}')
+    return (now - off).normalize()
+
+
+def slice_period(df: pd.DataFrame, period: str, now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Slice a history frame down to what yfinance would return for `period`.
+
+    Day periods ('1d', '5d') count trading sessions like Yahoo does; the rest are calendar ranges.
+    """
+    if df is None or df.empty or period == 'max':
+        return df
+    if period in ('1d', '5d'):
+        n = int(period[:-1])
+        days = df.index.normalize()
+        keep = days.unique()[-n:]
+        return df[days.isin(keep)]
+    start = period_start(period, now)
+    idx = df.index
+    if idx.tz is None:
+        start = start.tz_localize(None)
+    return df[idx >= start]
+
+
+# longest first, so callers probing the cache find the widest series
+KNOWN_PERIODS = ('max', '10y', '5y', '2y', '1y', 'ytd', '6mo', '3mo', '1mo', '5d', '1d')
+_SESSION_PERIODS = ('1d', '5d')
+
+
+def covers(longer: str, shorter: str, now: Optional[pd.Timestamp] = None) -> bool:
+    """True if a history fetched for `longer` contains everything `shorter` would return."""
+    if longer == shorter or longer == 'max':
+        return True
+    if shorter == 'max' or not (is_known_period(longer) and is_known_period(shorter)):
+        return False
+    if now is None:
+        now = pd.Timestamp.now(tz='UTC')
+    elif now.tzinfo is None:
+        now = now.tz_localize('UTC')
+    if shorter in _SESSION_PERIODS:
+        if longer in _SESSION_PERIODS:
+            return int(longer[:-1]) >= int(shorter[:-1])
+        # five sessions can span well over a calendar week around holidays
+        return period_start(longer, now) <= (now - pd.DateOffset(days=14)).normalize()
+    if longer in _SESSION_PERIODS:
+        return False
+    return period_start(longer, now) <= period_start(shorter, now)
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+# Yahoo endpoints we rate limit separately
+ENDPOINTS = ('chart', 'quoteSummary', 'quote', 'timeseries')
+
+
+class _Bucket:
+    def __init__(self, rate: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.monotonic()
+        self.acquired = 0
+        self.waits = 0
+        self.throttles = 0
+        self.recent = deque()  # acquisition times for observed throughput
+
+    def refill(self, now: float):
+        elapsed = now - self.last
+        if elapsed > 0:
+            self.tokens = min(max(self.rate, 1.0), self.tokens + elapsed * self.rate)
+            self.last = now
+
+
+class AdaptiveRateLimiter:
+    """Per-endpoint token buckets with AIMD rate control.
+
+    Each endpoint starts at `rate` requests/second. A throttle signal (HTTP 429)
+    multiplies that endpoint's rate by `decrease` (floored at `min_rate`) and drains
+    its bucket; each successful request adds `increase` back until the configured
+    rate is reached again. Waiters block on a condition variable for exactly the time
+    until the next token instead of polling.
+    """
+
+    def __init__(self, rate: float, endpoints: Iterable[str] = ENDPOINTS, min_rate: float = 0.2,
+                 increase: float = 0.05, decrease: float = 0.5, window: float = 60.0):
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self._default_rate = rate
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, _Bucket] = {e: _Bucket(rate) for e in endpoints}
+
+    def _bucket(self, endpoint: str) -> _Bucket:
+        b = self._buckets.get(endpoint)
+        if b is None:
+            b = self._buckets[endpoint] = _Bucket(self._default_rate)
+        return b
+
+    def _take(self, b: _Bucket, now: float) -> float:
+        b.refill(now)
+        if b.tokens >= 1:
+            b.tokens -= 1
+            b.acquired += 1
+            b.recent.append(now)
+            while b.recent and b.recent[0] < now - self.window:
+                b.recent.popleft()
+            return 0.0
+        return (1 - b.tokens) / b.rate
+
+    def try_acquire(self, endpoint: str = 'chart') -> float:
+        """Take a token if available. Returns 0 on success, else seconds until the next token."""
+        with self._cond:
+            return self._take(self._bucket(endpoint), time.monotonic())
+
+    def acquire(self, endpoint: str = 'chart', timeout: Optional[float] = None) -> bool:
+        """Block until a token for endpoint is available (or timeout). Returns True if acquired."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            b = self._bucket(endpoint)
+            waited = False
+            while True:
+                now = time.monotonic()
+                wait = self._take(b, now)
+                if wait <= 0:
+                    return True
+                if not waited:
+                    b.waits += 1
+                    waited = True
+                if deadline is not None:
+                    if now >= deadline:
+                        return False
+                    wait = min(wait, deadline - now)
+                # woken early when the rate changes
+                self._cond.wait(wait)
+
+    def on_success(self, endpoint: str = 'chart'):
+        with self._cond:
+            b = self._bucket(endpoint)
+            if b.rate < b.max_rate:
+                b.refill(time.monotonic())
+                b.rate = min(b.max_rate, b.rate + self.increase)
+                self._cond.notify_all()
+
+    def on_throttle(self, endpoint: str = 'chart'):
+        with self._cond:
+            b = self._bucket(endpoint)
+            b.refill(time.monotonic())
+            b.rate = max(self.min_rate, b.rate * self.decrease)
+            b.tokens = 0.0
+            b.throttles += 1
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        out = {}
+        with self._cond:
+            for name, b in self._buckets.items():
+                while b.recent and b.recent[0] < now - self.window:
+                    b.recent.popleft()
+                out[name] = {
+                    'rate': b.rate,
+                    'max_rate': b.max_rate,
+                    'acquired': b.acquired,
+                    'waits': b.waits,
+                    'throttles': b.throttles,
+                    'observed_rps': len(b.recent) / self.window,
+                }
+        return out
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True for yfinance's YFRateLimitError or any error that looks like an HTTP 429."""
+    if type(exc).__name__ == 'YFRateLimitError':
+        return True
+    msg = str(exc).lower()
+    return '429' in msg or 'too many requests' in msg or 'rate limit' in msg
@@ -1,27 +1,32 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 import numpy as np
-import pandas as pd
-from .data_fetcher import get_history, get_ticker, get_histories
+from .data_fetcher import get_history, get_info, get_histories
+from .indicators import moving_averages
 
 
-def compute_sector_stats(tickers: List[str], period: str = '3mo', interval: str = '1d', ma_window: int = 20) -> Dict:
-    """Compute per-ticker moving average (ma_window) and group tickers by sector (using yfinance info).
+def compute_sector_stats(tickers: List[str], period: str = '3mo', interval: str = '1d', ma_window: int = 20,
+                         ma_windows: Iterable[int] = ()) -> Dict:
+    """Compute per-ticker moving average (ma_window) and group tickers by sector (using cached yfinance info).
 
     Parameters:
       - tickers: list of ticker symbols
       - period: history period passed to yfinance (e.g., '1mo', '3mo')
       - interval: data interval (e.g., '1d')
       - ma_window: moving average window (e.g., 20 for MA20)
+      - ma_windows: extra windows (e.g., (200,)) computed in the same pass, for callers
+        that would otherwise recompute them from the same history
 
     Returns a dict with keys:
       - 'ticker_ma': {ticker: ma or None}
       - 'ticker_sector': {ticker: sector_name or 'Unclassified'}
       - 'sector_mean_ma': {sector_name: mean_ma or None}
       - 'sector_overall_mean': overall mean MA across all tickers with MA
+      - 'ticker_mas': {ticker: {window: ma or None}} for ma_window and ma_windows
     """
     ticker_ma: Dict[str, Optional[float]] = {}
+    ticker_mas: Dict[str, Dict[int, Optional[float]]] = {}
+    windows = [ma_window] + [w for w in ma_windows if w != ma_window]
     ticker_sector: Dict[str, str] = {}
-    sector_groups: Dict[str, List[float]] = {}
 
     # fetch histories in batch for efficiency
     histories = get_histories(tickers, period=period, interval=interval)
@@ -29,8 +34,8 @@ def compute_sector_stats(tickers: List[str], period: str = '3mo', interval: str
     for t in tickers:
         sector = 'Unclassified'
         try:
-            tk = get_ticker(t)
-            info = getattr(tk, 'info', None) or {}
+            # profile fields are cached for days, so this rarely hits the network
+            info = get_info(t, fields=('sector', 'industry')) or {}
             sec = info.get('sector') or info.get('industry')
             if sec:
                 sector = sec
@@ -40,21 +45,40 @@ def compute_sector_stats(tickers: List[str], period: str = '3mo', interval: str
         ticker_sector[t] = sector
 
         try:
-            hist = histories.get(t) or histories.get(t.upper()) or histories.get(t.lower()) or pd.DataFrame()
+            hist = None
+            for key in (t, t.upper(), t.lower()):
+                hist = histories.get(key)
+                if hist is not None:
+                    break
             if hist is None or hist.empty or 'Close' not in hist.columns:
                 ticker_ma[t] = None
+                ticker_mas[t] = {w: None for w in windows}
                 continue
             close = hist['Close']
+            mas = moving_averages(close, windows)
+            ticker_mas[t] = mas
             if len(close) < ma_window:
                 ma_val = float(close.mean()) if len(close) > 0 else None
             else:
-                ma_val = float(close.rolling(ma_window).mean().iloc[-1])
+                ma_val = mas[ma_window]
             ticker_ma[t] = ma_val
-            if ma_val is not None:
-                sector_groups.setdefault(sector, []).append(ma_val)
         except Exception:
             ticker_ma[t] = None
 
+    stats = aggregate_sector_stats(ticker_ma, ticker_sector)
+    stats['ticker_mas'] = ticker_mas
+    return stats
+
+
+def aggregate_sector_stats(ticker_ma: Dict[str, Optional[float]], ticker_sector: Dict[str, str]) -> Dict:
+    """Sector means from per-ticker MAs, in the same shape compute_sector_stats returns.
+
+    Lets callers that refresh only part of the universe merge new MAs with earlier ones.
+    """
+    sector_groups: Dict[str, List[float]] = {}
+    for t, ma_val in ticker_ma.items():
+        if ma_val is not None:
+            sector_groups.setdefault(ticker_sector.get(t, 'Unclassified'), []).append(ma_val)
     sector_mean_ma: Dict[str, Optional[float]] = {}
     all_vals = []
     for sec, vals in sector_groups.items():
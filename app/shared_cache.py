@@ -0,0 +1,89 @@
+"""Cross-process history cache backed by memory-mapped files.
+
+Each frame is one frame_codec file under .cache/yf_shm (or YF_SHARED_CACHE_DIR), with
+the file mtime holding the fetch time. Readers mmap the file, so every local process
+(GUI, backtest scripts, ad-hoc scans) shares the same page-cache pages for the OHLCV
+arrays and only parses a small JSON header. Files are replaced atomically, so a reader
+holding an old mapping keeps a consistent snapshot. The sqlite cache stays the
+durable tier behind this one.
+"""
+import os
+import tempfile
+import time
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import pandas as pd
+
+from . import frame_codec
+
+_SHARED_CACHE_DIR = os.getenv('YF_SHARED_CACHE_DIR', os.path.join(os.getcwd(), '.cache', 'yf_shm'))
+_SUFFIX = '.yfc'
+
+
+class SharedHistoryCache:
+    def __init__(self, root: str = _SHARED_CACHE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, quote(key, safe='') + _SUFFIX)
+
+    def get(self, key: str) -> Optional[Tuple[float, pd.DataFrame]]:
+        """Return (fetched_at, df) with read-only columns mapped from the shared file."""
+        path = self._path(key)
+        try:
+            ts = os.stat(path).st_mtime
+            df = frame_codec.read_file(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        if df is None:
+            return None
+        return ts, df
+
+    def put(self, key: str, ts: float, df: pd.DataFrame):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(frame_codec.encode(df))
+            os.utime(tmp, (ts, ts))
+            os.replace(tmp, self._path(key))
+        except OSError:
+            # e.g. the target is mapped by another process on Windows; keep the old copy
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def sweep(self, max_age: Optional[float] = None, max_bytes: Optional[int] = None) -> int:
+        """Remove files older than max_age, then the oldest ones until under max_bytes."""
+        now = time.time()
+        files = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith('.tmp') and now - st.st_mtime > 3600:
+                # left behind by a crashed writer
+                files.append((0.0, 0, path))
+            elif name.endswith(_SUFFIX):
+                files.append((st.st_mtime, st.st_size, path))
+        files.sort()
+        total = sum(f[1] for f in files)
+        removed = 0
+        for mtime, size, path in files:
+            stale = mtime == 0.0 or (max_age is not None and now - mtime >= max_age)
+            if not stale and (max_bytes is None or total <= max_bytes):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        self.sweep(max_age=0)
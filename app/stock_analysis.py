@@ -1,15 +1,23 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
+from . import demark
+from .data_fetcher import get_history, get_info
+from .market_context import MarketContext, build_market_context
+from .indicators import moving_averages
+from .panel import sma_windows
 
-def analyze_stock_logic(ticker: str, benchmark_ticker: str = "^KS11") -> Dict[str, Any]:
+
+def analyze_stock_logic(ticker: str, benchmark_ticker: str = "^KS11",
+                        context: Optional[MarketContext] = None) -> Dict[str, Any]:
     """Run technical + simple fundamental checks for a ticker (yfinance) and return a summary dict.
 
     This function prints the human-friendly report (same style as original) and also
     returns a dictionary with key metrics so callers can aggregate results programmatically.
+    VIX and the benchmark come from `context` (e.g. the running scan's); without one a
+    context is built for this call. All data goes through the data_fetcher caches.
     """
     print(f"\n{'='*60}")
     print(f"🚀 [AI ANALYSIS START] Ticker: {ticker}")
@@ -30,16 +38,12 @@ def analyze_stock_logic(ticker: str, benchmark_ticker: str = "^KS11") -> Dict[st
     }
 
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period="1y")
-        bench = yf.Ticker(benchmark_ticker)
-        bench_hist = bench.history(period="1y")
-        vix = yf.Ticker("^VIX")
-        vix_hist = vix.history(period="5d")
-        current_vix = None
-        if not vix_hist.empty:
-            current_vix = float(vix_hist['Close'].iloc[-1])
-        info = stock.info or {}
+        if context is None:
+            context = build_market_context(benchmarks=(benchmark_ticker,))
+        hist = get_history(ticker, period="1y")
+        bench_hist = context.benchmark_history(benchmark_ticker)
+        current_vix = context.vix
+        info = get_info(ticker, fields=('pegRatio', 'revenueGrowth', 'marketCap')) or {}
     except Exception as e:
         print(f"❌ Error fetching data for {ticker}: {e}")
         summary['reasons'].append(f"data_error: {e}")
@@ -55,14 +59,17 @@ def analyze_stock_logic(ticker: str, benchmark_ticker: str = "^KS11") -> Dict[st
     current_price = float(hist['Close'].iloc[-1])
     summary['current_price'] = current_price
 
-    ma200 = float(hist['Close'].rolling(window=200).mean().iloc[-1]) if len(hist) >= 200 else float(hist['Close'].rolling(window=len(hist)).mean().iloc[-1])
+    # MA200, or the mean of the whole history when it is shorter
+    ma_window = min(200, len(hist))
+    ma200 = moving_averages(hist['Close'], (ma_window,))[ma_window]
     summary['ma200'] = ma200
 
-    delta = hist['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    rsi = float((100 - (100 / (1 + rs))).iloc[-1])
+    # 14-day simple-average RSI: gain and loss averages from one prefix-sum pass
+    delta = hist['Close'].diff().to_numpy()
+    moves = np.column_stack([np.where(delta > 0, delta, 0.0), np.where(delta < 0, -delta, 0.0)])
+    gain, loss = sma_windows(moves, (14,))[14][-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = float(100 - (100 / (1 + gain / loss)))
     summary['rsi'] = rsi
 
     stock_ret_20 = hist['Close'].pct_change(20).iloc[-1] if len(hist) > 20 else 0.0
@@ -113,18 +120,10 @@ def analyze_stock_logic(ticker: str, benchmark_ticker: str = "^KS11") -> Dict[st
     # DeMark pivot (yesterday)
     if len(hist) >= 2:
         yesterday = hist.iloc[-2]
-        y_open = yesterday['Open']
-        y_high = yesterday['High']
-        y_low = yesterday['Low']
-        y_close = yesterday['Close']
-        if y_close > y_open:
-            pivot = (y_high * 2 + y_low + y_close) / 4
-        elif y_close < y_open:
-            pivot = (y_high + y_low * 2 + y_close) / 4
-        else:
-            pivot = (y_high + y_low + y_close * 2) / 4
-        target_high = pivot * 2 - y_low
-        target_low = pivot * 2 - y_high
+        lv = demark.levels(yesterday['Open'], yesterday['High'], yesterday['Low'], yesterday['Close'],
+                           variant=demark.CONDITIONAL)
+        target_high = float(lv['sell_limit'])
+        target_low = float(lv['buy_limit'])
     else:
         target_high = None
         target_low = None
@@ -1,6 +1,16 @@
-from typing import Dict, Any
-from .data_fetcher import get_history, get_quote
-from .indicators import ma, rsi, calc_peg, revenue_growth, demark_targets, gap_vs_sector
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+from . import info_cache, panel
+from .demark import SIMPLE, levels as demark_levels
+from .data_fetcher import get_history, get_histories, get_info_fresh, get_quote
+from .indicator_memo import memoized
+from .indicators import moving_averages, rsi, calc_peg, revenue_growth, demark_targets, gap_vs_sector
+from .metrics import registry as _metrics
+from .sector import aggregate_sector_stats
+import numpy as np
 import pandas as pd
 
 
@@ -14,11 +24,20 @@ DEFAULTS = {
 }
 
 
-def evaluate_ticker(ticker: str, sector_ma20: float = None, vix: float = None) -> Dict[str, Any]:
-    """Returns evaluation dict with grade, reasons, demark targets, and key indicators."""
+def evaluate_ticker(ticker: str, sector_ma20: float = None, vix: float = None, context=None,
+                    mas: Dict[int, float] = None) -> Dict[str, Any]:
+    """Returns evaluation dict with grade, reasons, demark targets, and key indicators.
+
+    `context` is the scan's market_context.MarketContext; its VIX is used when vix is not given.
+    `mas` are moving averages ({window: value}) the scan already computed for this ticker.
+    """
+    if vix is None and context is not None:
+        vix = context.vix
     hist = get_history(ticker, period='1y')
     quote = get_quote(ticker)
     info = quote.get('info', {})
+    # False when stale cached data was served (stale-while-revalidate mode)
+    fresh = bool(hist.attrs.get('fresh', True)) and bool(quote.get('fresh', True))
     close_series = hist['Close'] if not hist.empty else pd.Series()
 
     indicators = {}
@@ -30,8 +49,12 @@ def evaluate_ticker(ticker: str, sector_ma20: float = None, vix: float = None) -
     indicators['sector'] = None
     indicators['sector_ma'] = sector_ma20
 
-    indicators['ma200'] = ma(close_series, window=DEFAULTS['ma_days'])
-    indicators['rsi14'] = rsi(close_series, window=14) if len(close_series) > 14 else None
+    ma_days = DEFAULTS['ma_days']
+    if mas is None or ma_days not in mas:
+        mas = moving_averages(close_series, (ma_days,))
+    indicators['ma200'] = mas[ma_days]
+    indicators['rsi14'] = memoized(ticker, 'rsi', close_series, (14,),
+                                   lambda: rsi(close_series, window=14) if len(close_series) > 14 else None)
     indicators['peg'] = calc_peg(info)
     indicators['rev_growth'] = revenue_growth(hist, info)
 
@@ -48,6 +71,11 @@ def evaluate_ticker(ticker: str, sector_ma20: float = None, vix: float = None) -
     else:
         demark = demark_targets(indicators.get('high'), indicators.get('low'), indicators.get('last'))
 
+    return _grade(ticker, indicators, demark, vix, fresh)
+
+
+def _grade(ticker: str, indicators: Dict[str, Any], demark: dict, vix: float, fresh: bool) -> Dict[str, Any]:
+    """Apply the filters to computed indicators and build the evaluation dict."""
     # Filters
     reasons = []
     grade = 'F'
@@ -55,7 +83,7 @@ def evaluate_ticker(ticker: str, sector_ma20: float = None, vix: float = None) -
     # VIX filter
     if vix is not None and vix >= DEFAULTS['vix_threshold']:
         reasons.append(f'VIX {vix:.1f} >= {DEFAULTS["vix_threshold"]} -> trading halted')
-        return {'ticker': ticker, 'grade': 'F', 'reasons': reasons, 'indicators': indicators, 'demark': demark}
+        return {'ticker': ticker, 'grade': 'F', 'reasons': reasons, 'indicators': indicators, 'demark': demark, 'fresh': fresh}
 
     # Trend filter MA200
     if indicators['ma200'] is None or indicators['last'] is None:
@@ -109,4 +137,145 @@ def evaluate_ticker(ticker: str, sector_ma20: float = None, vix: float = None) -
             pos = sum(1 for c in conds if c)
             grade = 'A' if pos >= 3 else 'F'
 
-    return {'ticker': ticker, 'grade': grade, 'reasons': reasons, 'indicators': indicators, 'demark': demark}
+    return {'ticker': ticker, 'grade': grade, 'reasons': reasons, 'indicators': indicators, 'demark': demark, 'fresh': fresh}
+
+
+_UNIVERSE_WORKERS = int(os.getenv('YF_UNIVERSE_WORKERS', '8'))
+
+
+@contextmanager
+def _stage(timings: Dict[str, float], name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        timings[name] = dt
+        _metrics.observe(f'universe_{name}', dt)
+
+
+def _num(x) -> Optional[float]:
+    return None if x is None or x != x else float(x)
+
+
+def _lookup(frames: dict, ticker: str) -> pd.DataFrame:
+    for key in (ticker, ticker.upper(), ticker.lower()):
+        df = frames.get(key)
+        if df is not None:
+            return df
+    return pd.DataFrame()
+
+
+def _fetch_infos(tickers: List[str], max_workers: int) -> Dict[str, tuple]:
+    """(info, fresh) with profile and fundamentals for every ticker (mostly info-cache hits),
+    fetched concurrently."""
+    def one(t):
+        try:
+            info, fresh = get_info_fresh(t, classes=(info_cache.STATIC, info_cache.FUNDAMENTAL))
+            return info or {}, fresh
+        except Exception:
+            return {}, True
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as ex:
+        return dict(zip(tickers, ex.map(one, tickers)))
+
+
+def evaluate_universe(tickers: List[str], vix: float = None, context=None, period: str = '1y',
+                      ticker_ma: Optional[Dict[str, Optional[float]]] = None,
+                      ticker_sector: Optional[Dict[str, str]] = None,
+                      max_workers: int = _UNIVERSE_WORKERS) -> Dict[str, Any]:
+    """Evaluate a whole ticker list: one bulk history fetch, concurrent info lookups and panel indicators.
+
+    Each result is what evaluate_ticker() returns, with the sector and its MA20 mean filled
+    in from the same histories. ticker_ma / ticker_sector from earlier partial refreshes are
+    merged in before the sector means are taken. Returns
+    {'results': [...] (ticker order), 'timings': {stage: seconds}, 'ticker_ma': {...},
+     'ticker_sector': {...}, 'sector_stats': {...}}.
+    """
+    if vix is None and context is not None:
+        vix = context.vix
+    tickers = list(dict.fromkeys(tickers))
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+
+    with _stage(timings, 'fetch_histories'):
+        try:
+            fetched = get_histories(tickers, period=period) if tickers else {}
+        except Exception:
+            fetched = {}
+        hists = {t: _lookup(fetched, t) for t in tickers}
+
+    with _stage(timings, 'fetch_info'):
+        infos = _fetch_infos(tickers, max_workers)
+
+    ma_days = DEFAULTS['ma_days']
+    with _stage(timings, 'indicators'):
+        bars = {c: panel.build_panel(hists, column=c).values for c in ('Open', 'High', 'Low', 'Close')}
+        close = bars['Close']
+        counts = (~np.isnan(close)).sum(axis=0)
+        mas = panel.sma_windows(close, (20, ma_days))
+        ma20 = panel.last(mas[20])
+        ma_long = panel.last(mas[ma_days])
+        rsi14 = panel.last(panel.rsi(close, 14))
+        last = {c: panel.last(v) for c, v in bars.items()}
+        if close.shape[0] >= 2:
+            prev_levels = demark_levels(None, bars['High'][-2], bars['Low'][-2], close[-2], variant=SIMPLE)
+        else:
+            prev_levels = None
+
+    with _stage(timings, 'sector_stats'):
+        merged_ma = dict(ticker_ma or {})
+        merged_sector = dict(ticker_sector or {})
+        for j, t in enumerate(tickers):
+            info = infos[t][0]
+            merged_sector[t] = info.get('sector') or info.get('industry') or 'Unclassified'
+            if counts[j] >= 20:
+                merged_ma[t] = _num(ma20[j])
+            else:
+                # short histories use the plain mean, as compute_sector_stats does
+                merged_ma[t] = float(np.nanmean(close[:, j])) if counts[j] else None
+        stats = aggregate_sector_stats(merged_ma, merged_sector)
+
+    results = []
+    with _stage(timings, 'grade'):
+        for j, t in enumerate(tickers):
+            hist = hists[t]
+            info, info_fresh = infos[t]
+            try:
+                sec = merged_sector.get(t)
+                sector_ma = stats['sector_mean_ma'].get(sec) or stats['sector_overall_mean']
+                ind = {}
+                if counts[j]:
+                    ind['last'] = _num(last['Close'][j])
+                    ind['open'] = _num(last['Open'][j])
+                    ind['high'] = _num(last['High'][j])
+                    ind['low'] = _num(last['Low'][j])
+                else:
+                    ind['last'] = info.get('regularMarketPrice')
+                    ind['open'] = info.get('open')
+                    ind['high'] = info.get('dayHigh')
+                    ind['low'] = info.get('dayLow')
+                ind['sector'] = sec
+                ind['sector_ma'] = sector_ma
+                ind['ma200'] = _num(ma_long[j])
+                ind['rsi14'] = _num(rsi14[j]) if counts[j] > 14 else None
+                ind['peg'] = calc_peg(info)
+                ind['rev_growth'] = revenue_growth(hist, info)
+                ind['gap_pct'] = gap_vs_sector(ind['last'], sector_ma) if ind['last'] and sector_ma else None
+                if prev_levels is not None and counts[j] >= 2:
+                    dm = {k: float(prev_levels[k][j]) for k in ('pivot', 'support', 'resistance')}
+                else:
+                    dm = demark_targets(ind.get('high'), ind.get('low'), ind.get('last'))
+                if counts[j]:
+                    # later evaluate_ticker() calls on the same bars reuse it
+                    memoized(t, 'rsi', hist['Close'], (14,), lambda: ind['rsi14'])
+                # False when the history or the info was served stale while it revalidates
+                fresh = bool(hist.attrs.get('fresh', True)) and bool(info_fresh)
+                results.append(_grade(t, ind, dm, vix, fresh))
+            except Exception as e:
+                results.append({'ticker': t, 'grade': 'F', 'reasons': [str(e)], 'indicators': {}, 'demark': {}})
+
+    timings['total'] = time.perf_counter() - t0
+    return {'results': results, 'timings': timings, 'ticker_ma': merged_ma, 'ticker_sector': merged_sector,
+            'sector_stats': stats}
@@ -0,0 +1,174 @@
+"""One lookup path over the history cache tiers, fastest first.
+
+A tier is any object with `name`, `get(key) -> (fetched_at, df) | None`, `put(items)` for
+[(key, fetched_at, df), ...] and `enabled()`. Keys are 'TICKER|period|interval' strings.
+A hit in a slower tier is promoted into every enabled faster tier. Write-through tiers
+receive every new frame via put_through(); write-around tiers (the Parquet archive) only
+receive frames demoted from faster tiers, e.g. on memory eviction.
+"""
+import threading
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from . import bar_store, periods
+
+
+def split_key(key: str):
+    ticker, period, interval = key.split('|')
+    return ticker, period, interval
+
+
+def make_key(ticker: str, period: str, interval: str) -> str:
+    return f"{ticker}|{period}|{interval}"
+
+
+class Tier:
+    def __init__(self, name: str, get: Callable, put: Callable, enabled: Callable[[], bool] = lambda: True,
+                 write_through: bool = True):
+        self.name = name
+        self.get = get
+        self.put = put
+        self.enabled = enabled
+        self.write_through = write_through
+
+
+class MemoryTier(Tier):
+    """Adapter for history_cache.HistoryCache, which is keyed by (ticker, period, interval)."""
+
+    def __init__(self, cache, prepare: Optional[Callable] = None):
+        self.cache = cache
+        self.prepare = prepare
+        super().__init__('memory', self._get, self._put)
+
+    def _get(self, key):
+        return self.cache.get(tuple(split_key(key)))
+
+    def _put(self, items):
+        for key, ts, df in items:
+            self.cache[tuple(split_key(key))] = (ts, df if self.prepare is None else self.prepare(df))
+
+
+class ArchiveTier(Tier):
+    """Write-around adapter for a bar_store.BarStore-like archive (parquet_archive.ParquetArchive).
+
+    Only daily-or-coarser bars are archived. A hit carries the fetch time of the newest
+    archived bars, so a demoted stale frame is never served as fresh, and demoting an
+    older frame never overwrites newer archived bars.
+    """
+
+    def __init__(self, get_archive: Callable, enabled: Callable[[], bool] = lambda: True):
+        self.get_archive = get_archive
+        super().__init__('archive', self._get, self._put,
+                         enabled=lambda: enabled() and get_archive() is not None, write_through=False)
+
+    def _get(self, key):
+        ticker, period, interval = split_key(key)
+        if interval not in bar_store.STORE_INTERVALS or not periods.is_known_period(period):
+            return None
+        archive = self.get_archive()
+        m = archive.meta(ticker, interval)
+        if m is None:
+            return None
+        start = periods.period_start(period)
+        if m[1] > (bar_store._COVERED_ALL if start is None else int(start.timestamp())):
+            return None
+        df = archive.load(ticker, interval)
+        if df.empty:
+            return None
+        return archive.fetched_at(ticker, interval), periods.slice_period(df, period)
+
+    def _put(self, items):
+        archive = self.get_archive()
+        for key, ts, df in items:
+            ticker, period, interval = split_key(key)
+            if (interval not in bar_store.STORE_INTERVALS or not periods.is_known_period(period)
+                    or df is None or df.empty or not isinstance(df.index, pd.DatetimeIndex)):
+                continue
+            start = periods.period_start(period)
+            covered = bar_store._COVERED_ALL if start is None else int(start.timestamp())
+            archive.merge(ticker, interval, df, covered, fetched_at=ts)
+
+
+class TieredCache:
+    def __init__(self, tiers: List[Tier]):
+        self.tiers = tiers
+        self._lock = threading.Lock()
+        self._stats = {t.name: {'hits': 0, 'misses': 0, 'promotions': 0, 'demotions': 0, 'writes': 0} for t in tiers}
+
+    def _count(self, tier: Tier, field: str, n: int = 1):
+        with self._lock:
+            self._stats[tier.name][field] += n
+
+    def lookup(self, ticker: str, period: str, interval: str, now: float, ttl: float,
+               start: int = 0, stop: Optional[int] = None, on_slice: Optional[Callable] = None):
+        """Return the first frame younger than ttl for the request, searching tiers[start:stop].
+
+        A longer cached period that covers the request is sliced down to it (on_slice is
+        called when that happens). Returns None on a miss.
+        """
+        candidates = [period]
+        if periods.is_known_period(period):
+            candidates += [p for p in periods.KNOWN_PERIODS if p != period and periods.covers(p, period)]
+        for i in range(start, len(self.tiers) if stop is None else stop):
+            tier = self.tiers[i]
+            if not tier.enabled():
+                continue
+            for p in candidates:
+                key = make_key(ticker, p, interval)
+                try:
+                    r = tier.get(key)
+                except Exception:
+                    r = None
+                if r is None or now - r[0] >= ttl:
+                    continue
+                self._count(tier, 'hits')
+                if i > 0:
+                    self._promote(i, key, r[0], r[1])
+                if p == period:
+                    return r[1]
+                if on_slice is not None:
+                    on_slice()
+                return periods.slice_period(r[1], period)
+            self._count(tier, 'misses')
+        return None
+
+    def _promote(self, level: int, key: str, ts: float, df):
+        for tier in self.tiers[:level]:
+            if not tier.enabled():
+                continue
+            try:
+                tier.put([(key, ts, df)])
+                self._count(tier, 'promotions')
+            except Exception:
+                pass
+
+    def put_through(self, items: list, start: int = 0):
+        """Write new frames to every enabled write-through tier from tiers[start] down."""
+        if not items:
+            return
+        for tier in self.tiers[start:]:
+            if tier.enabled() and tier.write_through:
+                tier.put(items)
+                self._count(tier, 'writes', len(items))
+
+    def demote(self, level: int, items: list):
+        """Hand frames leaving tiers[level] to the slower write-around tiers."""
+        for tier in self.tiers[level + 1:]:
+            if tier.enabled() and not tier.write_through:
+                try:
+                    tier.put(items)
+                    self._count(tier, 'demotions', len(items))
+                except Exception:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {}
+            for t in self.tiers:
+                s = dict(self._stats[t.name])
+                s['enabled'] = t.enabled()
+                total = s['hits'] + s['misses']
+                s['hit_ratio'] = s['hits'] / total if total else None
+                out[t.name] = s
+            return out
@@ -4,10 +4,14 @@ from PyQt6.QtWidgets import QHeaderView
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QAbstractTableModel, QModelIndex, QTimer
 from PyQt6.QtGui import QFont
 import json
-from .strategy import evaluate_ticker
-from .data_fetcher import get_vix
-from .market_lists import load_market_list, save_example_lists
+from .strategy import evaluate_ticker, evaluate_universe
 from .sector import compute_sector_stats
+from .data_fetcher import dump_metrics, get_history_metadata
+from .market_context import build_market_context
+from .metrics import registry as metrics
+from .market_lists import load_market_list, save_example_lists
+from .market_schedule import RefreshScheduler
+import math
 import time
 import csv
 
@@ -22,63 +26,66 @@ class WorkerThread(QThread):
         super().__init__(parent)
         self.tickers = tickers
         self._running = True
+        # refresh open markets often, closed markets once after the close and before the open
+        self.scheduler = RefreshScheduler(tickers, meta_lookup=get_history_metadata)
+        self._results = {}
+        self._ticker_ma = {}
+        self._ticker_sector = {}
+        # the latest scan's market context, reused by the AI actions
+        self.context = None
+
+    def _sleep(self, seconds):
+        for _ in range(max(1, int(math.ceil(seconds)))):
+            if not self._running:
+                break
+            time.sleep(1)
+
+    def _ordered_results(self):
+        return [self._results[t] for t in self.tickers if t in self._results]
 
     def run(self):
         while self._running:
-            vix = get_vix()
-            results = []
+            due = self.scheduler.due()
+            if not due:
+                self._sleep(min(self.scheduler.seconds_until_due(), 60))
+                continue
+            scan_t0 = time.perf_counter()
+            # VIX once per scan, shared by every evaluation below; the scan grades no
+            # benchmark-relative figures, so no benchmark histories are fetched up front
+            context = build_market_context(benchmarks=())
+            self.context = context
+            vix = context.vix
+            # the due tickers in one batch: bulk histories, concurrent info, panel indicators;
+            # sector means merge the new MA20s with the earlier ones of tickers not refreshed
             try:
-                stats = compute_sector_stats(self.tickers, period='3mo', interval='1d', ma_window=20)
-            except Exception:
-                # backward compatible: try calling compute_sector_stats
-                try:
-                    from .sector import compute_sector_stats as _css
-                    stats = _css(self.tickers)
-                except Exception:
-                    stats = None
-
-            # stats structure: ticker_ma20, ticker_sector, sector_mean_ma20, sector_overall_mean
-            total = len(self.tickers)
-            for idx, t in enumerate(self.tickers):
-                try:
-                    sector_ma = None
-                    sector_ma = None
-                    sector_name = None
-                    if stats:
-                        sec = stats.get('ticker_sector', {}).get(t)
-                        sector_name = sec
-                        if sec:
-                            sector_ma = stats.get('sector_mean_ma', {}).get(sec) or stats.get('sector_overall_mean')
-                        else:
-                            sector_ma = stats.get('sector_overall_mean')
-                    r = evaluate_ticker(t, sector_ma20=sector_ma, vix=vix)
-                    # attach sector info to indicators for UI display
-                    try:
-                        if isinstance(r, dict) and 'indicators' in r and isinstance(r['indicators'], dict):
-                            r['indicators']['sector'] = sector_name
-                            r['indicators']['sector_ma'] = sector_ma
-                    except Exception:
-                        pass
-                    results.append(r)
-                except Exception as e:
-                    results.append({'ticker': t, 'grade': 'F', 'reasons': [str(e)], 'indicators': {}, 'demark': {}})
-
-                # emit incremental progress after each ticker
-                try:
-                    self.update.emit({'vix': vix, 'results': list(results), 'progress': (idx + 1, total)})
-                except Exception:
-                    pass
+                with metrics.timer('scan_universe'):
+                    out = evaluate_universe(due, vix=vix, context=context, ticker_ma=self._ticker_ma,
+                                            ticker_sector=self._ticker_sector)
+                self._ticker_ma = out['ticker_ma']
+                self._ticker_sector = out['ticker_sector']
+                for r in out['results']:
+                    self._results[r['ticker']] = r
+            except Exception as e:
+                for t in due:
+                    self._results[t] = {'ticker': t, 'grade': 'F', 'reasons': [str(e)], 'indicators': {}, 'demark': {}}
+            total = len(due)
 
-            # final emit
+            # emit the refreshed table
+            try:
+                self.update.emit({'vix': vix, 'results': self._ordered_results(), 'progress': (total, total)})
+            except Exception:
+                pass
+            metrics.observe('scan', time.perf_counter() - scan_t0)
             try:
-                self.update.emit({'vix': vix, 'results': results, 'progress': (total, total)})
+                dump_metrics()
             except Exception:
                 pass
-            # refresh every 60 seconds
-            for _ in range(60):
-                if not self._running:
-                    break
-                time.sleep(1)
+            self.scheduler.mark_refreshed(due)
+            # stale data was rendered while it revalidates: look at those tickers again shortly
+            stale = [t for t in due if isinstance(self._results.get(t), dict) and self._results[t].get('fresh') is False]
+            if stale:
+                self._sleep(5)
+                self.scheduler.invalidate(stale)
 
     def stop(self):
         self._running = False
@@ -379,7 +386,11 @@ class MainWindow(QMainWindow):
                         'gapThreshold': DEFAULTS.get('gap_threshold_pct', 5.0),
                         'rsiThreshold': DEFAULTS.get('rsi_max', 70.0)
                     }
-                    v = get_vix() or 0
+                    # VIX of the running scan's market context, else fetched once (cached)
+                    context = self.worker.context if self.worker is not None else None
+                    if context is None:
+                        context = build_market_context(benchmarks=())
+                    v = context.vix or 0
                     tickers = self.current_tickers[:50]
                     parsed = analyze_with_gemini(adapter, equity=10000000, vix=v, tickers=tickers, settings=settings, context='ANALYZE')
                     out = json.dumps(parsed, ensure_ascii=False, indent=2)
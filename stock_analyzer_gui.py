@@ -8,6 +8,11 @@ import sys
 import io
 from contextlib import redirect_stdout
 
+try:
+    from app.market_context import build_market_context
+except ImportError:
+    build_market_context = None
+
 # Import the analysis function from the original file
 sys.path.append(r"c:\Users\USER\Downloads\StockCode\My stock\My stock")
 try:
@@ -431,7 +436,7 @@ class StockAnalyzerGUI:
             # Re-enable button
             self.analyze_button.config(state=tk.NORMAL, text="🔍 Analyze Stock")
     
-    def get_stock_rating(self, ticker, benchmark_ticker="^IXIC"):
+    def get_stock_rating(self, ticker, benchmark_ticker="^IXIC", context=None):
         """Get just the rating (S/A/F) and key metrics for a stock"""
         try:
             stock = yf.Ticker(ticker)
@@ -447,12 +452,7 @@ class StockAnalyzerGUI:
                     'error': 'Insufficient data'
                 }
             
-            bench = yf.Ticker(benchmark_ticker)
-            bench_hist = bench.history(period="1y")
-            
-            vix = yf.Ticker("^VIX")
-            vix_hist = vix.history(period="5d")
-            current_vix = vix_hist['Close'].iloc[-1]
+            current_vix, bench_ret_20 = market_inputs(benchmark_ticker, context)
             
             info = stock.info
             
@@ -468,7 +468,6 @@ class StockAnalyzerGUI:
             
             # Gap
             stock_ret_20 = hist['Close'].pct_change(20).iloc[-1]
-            bench_ret_20 = bench_hist['Close'].pct_change(20).iloc[-1]
             gap = bench_ret_20 - stock_ret_20
             
             # PEG & Growth
@@ -559,12 +558,15 @@ class StockAnalyzerGUI:
         
         self.multi_status_label.config(text=f"Analyzing {len(tickers)} stocks in background...")
         
+        # VIX and the benchmark are the same for every ticker: fetch them once
+        context = make_market_context(benchmark)
+        
         # Analyze each stock quietly (no printing)
         results = []
         for i, ticker in enumerate(tickers):
             self.multi_status_label.config(text=f"Analyzing {i+1}/{len(tickers)}: {ticker}...")
             self.root.update()
-            result = self.get_stock_rating(ticker, benchmark)
+            result = self.get_stock_rating(ticker, benchmark, context=context)
             results.append(result)
         
         # Store all results
@@ -800,8 +802,30 @@ class StockAnalyzerGUI:
         cards_frame.grid_columnconfigure(1, weight=1)
 
 
+def make_market_context(benchmark_ticker):
+    """Shared VIX/benchmark snapshot for a batch of tickers, or None without the app package."""
+    if build_market_context is None:
+        return None
+    try:
+        return build_market_context([benchmark_ticker])
+    except Exception:
+        return None
+
+
+def market_inputs(benchmark_ticker, context=None):
+    """Return (current VIX, benchmark 20-day return), from the context when one is given."""
+    if context is None:
+        bench_hist = yf.Ticker(benchmark_ticker).history(period="1y")
+        vix_hist = yf.Ticker("^VIX").history(period="5d")
+        return vix_hist['Close'].iloc[-1], bench_hist['Close'].pct_change(20).iloc[-1]
+    if context.vix is None:
+        raise ValueError("VIX data unavailable")
+    bench_ret_20 = context.benchmark_return(benchmark_ticker, 20)
+    return context.vix, float('nan') if bench_ret_20 is None else bench_ret_20
+
+
 # Define the analysis function here if import fails
-def analyze_stock_logic(ticker, benchmark_ticker="^IXIC"):
+def analyze_stock_logic(ticker, benchmark_ticker="^IXIC", context=None):
     print(f"\n{'='*60}")
     print(f"🚀 [AI 분석 시작] 종목: {ticker}")
     print(f"{'='*60}")
@@ -815,12 +839,7 @@ def analyze_stock_logic(ticker, benchmark_ticker="^IXIC"):
             print("❌ 데이터가 부족합니다 (200일 미만). 분석 불가.")
             return
         
-        bench = yf.Ticker(benchmark_ticker)
-        bench_hist = bench.history(period="1y")
-        
-        vix = yf.Ticker("^VIX")
-        vix_hist = vix.history(period="5d")
-        current_vix = vix_hist['Close'].iloc[-1]
+        current_vix, bench_ret_20 = market_inputs(benchmark_ticker, context)
         
         info = stock.info
         
@@ -841,7 +860,6 @@ def analyze_stock_logic(ticker, benchmark_ticker="^IXIC"):
     
     # Gap
     stock_ret_20 = hist['Close'].pct_change(20).iloc[-1]
-    bench_ret_20 = bench_hist['Close'].pct_change(20).iloc[-1]
     gap = bench_ret_20 - stock_ret_20
 
     # PEG & 성장률
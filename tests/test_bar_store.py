@@ -0,0 +1,63 @@
+import pandas as pd
+import numpy as np
+
+from app import bar_store
+from app.metrics import MetricsRegistry
+
+
+def make_bars(end, days, start_price=100.0, tz='America/New_York'):
+    idx = pd.date_range(end=end, periods=days, freq='B', tz=tz)
+    price = start_price + np.arange(days, dtype=float)
+    return pd.DataFrame({
+        'Open': price, 'High': price + 1, 'Low': price - 1, 'Close': price, 'Adj Close': price,
+        'Volume': np.full(days, 1000, dtype='int64'),
+        'Dividends': np.zeros(days), 'Stock Splits': np.zeros(days),
+    }, index=idx)
+
+
+class FakeFeed:
+    def __init__(self, full):
+        self.full = full
+        self.calls = []
+
+    def __call__(self, period=None, start=None):
+        self.calls.append({'period': period, 'start': start})
+        if start is not None:
+            return self.full[self.full.index >= pd.Timestamp(start, tz=self.full.index.tz)]
+        return self.full
+
+
+def test_second_call_fetches_only_tail(tmp_path):
+    store = bar_store.BarStore(str(tmp_path / 'bars.sqlite'))
+    today = pd.Timestamp.now(tz='America/New_York').normalize()
+    feed = FakeFeed(make_bars(today, 200))
+
+    first = bar_store.get_history('AAA', '1y', '1d', feed, store=store)
+    assert feed.calls[-1]['period'] == '1y'
+
+    # one new bar arrives and the last one is revised
+    nxt = feed.full.iloc[-1:].copy()
+    nxt.index = nxt.index + pd.offsets.BDay(1)
+    nxt['Close'] = 999.0
+    feed.full = pd.concat([feed.full, nxt])
+    stats = MetricsRegistry()
+    second = bar_store.get_history('AAA', '1y', '1d', feed, store=store, stats=stats)
+    assert feed.calls[-1]['start'] is not None
+    assert stats.get('bar_store_tail_fetches') == 1
+    assert second['Close'].iloc[-1] == 999.0
+    assert len(second) >= len(first)
+    assert not second.index.duplicated().any()
+
+
+def test_dividend_in_tail_triggers_full_refetch(tmp_path):
+    store = bar_store.BarStore(str(tmp_path / 'bars.sqlite'))
+    today = pd.Timestamp.now(tz='America/New_York').normalize()
+    feed = FakeFeed(make_bars(today, 200))
+    bar_store.get_history('AAA', '1y', '1d', feed, store=store)
+
+    nxt = feed.full.iloc[-1:].copy()
+    nxt.index = nxt.index + pd.offsets.BDay(1)
+    nxt['Dividends'] = 0.5
+    feed.full = pd.concat([feed.full, nxt])
+    bar_store.get_history('AAA', '1y', '1d', feed, store=store)
+    assert feed.calls[-1]['period'] == '1y'
@@ -0,0 +1,68 @@
+import time
+
+from app.circuit_breaker import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, NegativeCache,
+                                 is_outage_error, is_symbol_error)
+
+
+class YFTzMissingError(Exception):
+    pass
+
+
+class YFDataException(Exception):
+    pass
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f'HTTP Error {status_code}')
+        self.response = type('Response', (), {'status_code': status_code})()
+
+
+def test_error_classification():
+    assert is_symbol_error(YFTzMissingError('$ABCD: possibly delisted; no timezone found'))
+    assert not is_symbol_error(YFDataException('*** YAHOO! FINANCE IS CURRENTLY DOWN! ***'))
+    assert is_outage_error(YFDataException('*** YAHOO! FINANCE IS CURRENTLY DOWN! ***'))
+    assert is_outage_error(HTTPError(503))
+    assert is_outage_error(ConnectionResetError('reset by peer'))
+    assert not is_outage_error(HTTPError(404))
+    assert not is_outage_error(Exception('period=500d is invalid'))
+    # only types and status codes count, not words in the message
+    assert not is_outage_error(ValueError('connection string is malformed'))
+    assert not is_outage_error(Exception('HTTP Error 503: Service Unavailable'))
+
+
+def test_breaker_opens_and_probes():
+    cb = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        assert cb.allow()
+        cb.on_failure()
+    assert cb.state == OPEN
+    assert not cb.allow()
+    time.sleep(0.06)
+    assert cb.allow()  # the single half-open probe
+    assert cb.state == HALF_OPEN
+    assert not cb.allow()
+    cb.on_failure()
+    assert cb.state == OPEN
+    time.sleep(0.06)
+    assert cb.allow()
+    cb.on_success()
+    assert cb.state == CLOSED
+    assert cb.stats()['opens'] == 2
+
+
+def test_negative_cache_expires():
+    neg = NegativeCache(ttl=0.05)
+    neg.mark('BAD', 'no timezone found')
+    assert neg.get('BAD') == 'no timezone found'
+    time.sleep(0.06)
+    assert neg.get('BAD') is None
+
+
+def test_negative_cache_per_entry_ttl():
+    neg = NegativeCache(ttl=60)
+    neg.mark('GAP', 'no price data found', ttl=0.05)
+    neg.mark('BAD', 'no timezone found')
+    time.sleep(0.06)
+    assert neg.get('GAP') is None
+    assert neg.get('BAD') == 'no timezone found'
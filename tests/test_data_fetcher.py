@@ -0,0 +1,368 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import data_fetcher
+from app.rate_limiter import AdaptiveRateLimiter
+
+
+def make_history(days=30):
+    idx = pd.date_range(end=pd.Timestamp.today().normalize(), periods=days, freq='B')
+    price = np.linspace(100.0, 110.0, days)
+    return pd.DataFrame({'Open': price, 'High': price + 1, 'Low': price - 1, 'Close': price,
+                         'Volume': np.full(days, 1000)}, index=idx)
+
+
+class SlowTicker:
+    calls = 0
+    lock = threading.Lock()
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def history(self, **kw):
+        with SlowTicker.lock:
+            SlowTicker.calls += 1
+        time.sleep(0.2)
+        return make_history()
+
+
+@pytest.fixture
+def fake_yahoo(monkeypatch):
+    SlowTicker.calls = 0
+    monkeypatch.setattr(data_fetcher, 'get_ticker', SlowTicker)
+    monkeypatch.setattr(data_fetcher, '_USE_SQLITE_CACHE', False)
+    monkeypatch.setattr(data_fetcher, '_USE_BAR_STORE', False)
+    data_fetcher._HISTORY_CACHE.clear()
+    yield
+    data_fetcher._HISTORY_CACHE.clear()
+
+
+NY_META = {'exchangeTimezoneName': 'America/New_York',
+           'currentTradingPeriod': {'regular': {'start': 1700058600, 'end': 1700082000}}}
+
+
+def seen_sessions(monkeypatch, tickers):
+    """Mark tickers' chart metadata as already seen, so fetch_histories downloads them in bulk."""
+    for t in tickers:
+        monkeypatch.setitem(data_fetcher._history_meta, t, NY_META)
+
+
+def test_concurrent_misses_share_one_download(fake_yahoo):
+    before = data_fetcher.get_cache_stats()['inflight_dedup']
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(data_fetcher.get_history('SFT', period='1y')))
+               for _ in range(5)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert SlowTicker.calls == 1
+    assert len(results) == 5 and all(len(r) == 30 for r in results)
+    assert data_fetcher.get_cache_stats()['inflight_dedup'] - before == 4
+
+
+def test_shorter_period_is_sliced_from_cached_longer_one(fake_yahoo, monkeypatch):
+    calls = []
+    monkeypatch.setattr(SlowTicker, 'history', lambda self, **kw: (calls.append(kw), make_history(260))[1])
+    full = data_fetcher.get_history('SLC', period='1y')
+    three = data_fetcher.get_history('SLC', period='3mo')
+    five = data_fetcher.get_history('SLC', period='5d')
+    assert len(calls) == 1
+    assert len(five) == 5 and five.index[-1] == full.index[-1]
+    assert full.index[0] < three.index[0] and len(three) < len(full)
+
+
+def test_fetch_histories_bounds_concurrency_and_splits_chunks(fake_yahoo, monkeypatch):
+    import asyncio
+    state = {'active': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    def fake_download(chunk, **kw):
+        assert kw.get('threads') is False
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(0.05)
+        with lock:
+            state['active'] -= 1
+        return pd.concat({t: make_history() for t in chunk}, axis=1)
+
+    monkeypatch.setattr(data_fetcher.yf, 'download', fake_download)
+    monkeypatch.setattr(data_fetcher, '_YF_BATCH_SIZE', 2)
+    tickers = [f'T{i}' for i in range(9)]
+    seen_sessions(monkeypatch, tickers)
+    out = asyncio.run(data_fetcher.fetch_histories(tickers, period='1mo', concurrency=2))
+    assert sorted(out) == tickers
+    assert all(list(df.columns) == ['Open', 'High', 'Low', 'Close', 'Volume'] and len(df) == 30 for df in out.values())
+    assert state['peak'] <= 2
+    # second call is served from the in-memory cache through the sync wrapper
+    monkeypatch.setattr(data_fetcher.yf, 'download', lambda *a, **k: pytest.fail('unexpected download'))
+    assert sorted(data_fetcher.get_histories(tickers, period='1mo')) == tickers
+
+
+class RecoveringTicker(SlowTicker):
+    """Per-ticker fetches after a bulk download: GONE is a genuinely unknown symbol."""
+
+    def history(self, **kw):
+        if self.symbol == 'GONE':
+            raise YFTzMissingError('$GONE: possibly delisted; no timezone found')
+        return make_history()
+
+
+def test_bulk_download_errors_come_from_the_chunk_itself(fake_yahoo, fresh_breaker, monkeypatch):
+    import asyncio
+    import yfinance.shared
+
+    def fake_download(chunk, **kw):
+        # another download's error for a good ticker must not leak into this chunk
+        monkeypatch.setattr(yfinance.shared, '_ERRORS', {'GOOD': 'possibly delisted; no timezone found'})
+        frames = {t: make_history() for t in chunk if t != 'GONE'}
+        # NANS was throttled inside yf.download, which hands back an empty frame for it
+        frames['NANS'] = frames['NANS'] * np.nan
+        return pd.concat(frames, axis=1)
+
+    monkeypatch.setattr(data_fetcher.yf, 'download', fake_download)
+    monkeypatch.setattr(data_fetcher, 'get_ticker', RecoveringTicker)
+    seen_sessions(monkeypatch, ['GOOD', 'GONE', 'NANS'])
+    out = asyncio.run(data_fetcher.fetch_histories(['GOOD', 'GONE', 'NANS'], period='1mo'))
+    # tickers missing from the chunk are refetched one by one and classified by their own error
+    assert len(out['GOOD']) == 30 and out['GONE'].empty and len(out['NANS']) == 30
+    assert data_fetcher._negative_reason('GOOD', '1mo', '1d') is None
+    assert data_fetcher._negative_reason('NANS', '1mo', '1d') is None
+    assert 'no timezone found' in data_fetcher._negative_reason('GONE', '1mo', '1d')
+
+
+def test_bulk_download_takes_a_token_per_ticker(fake_yahoo, monkeypatch):
+    import asyncio
+    limiter = AdaptiveRateLimiter(1000)
+    monkeypatch.setattr(data_fetcher, '_limiter', limiter)
+    monkeypatch.setattr(data_fetcher.yf, 'download', lambda chunk, **kw: pd.concat({t: make_history() for t in chunk}, axis=1))
+    monkeypatch.setattr(data_fetcher, '_YF_BATCH_SIZE', 4)
+    tickers = [f'TOK{i}' for i in range(10)]
+    seen_sessions(monkeypatch, tickers)
+    out = asyncio.run(data_fetcher.fetch_histories(tickers, period='1mo'))
+    assert sorted(out) == tickers
+    assert limiter.stats()['chart']['acquired'] == 10
+
+
+def test_empty_single_ticker_chunk_counts_as_a_throttle(fake_yahoo, fresh_breaker, monkeypatch):
+    import asyncio
+    downloads = []
+
+    def fake_download(chunk, **kw):
+        downloads.append(list(chunk))
+        return pd.DataFrame()
+
+    monkeypatch.setattr(data_fetcher.yf, 'download', fake_download)
+    # keep the rate cut away from the shared limiter the other tests use
+    monkeypatch.setattr(data_fetcher, '_limiter', AdaptiveRateLimiter(data_fetcher._RATE_LIMIT_PER_SEC))
+    before = data_fetcher.get_cache_stats()['throttle_events']
+    seen_sessions(monkeypatch, ['ONE'])
+    out = asyncio.run(data_fetcher.fetch_histories(['ONE'], period='1mo'))
+    assert downloads == [['ONE']]  # no backoff retries; get_history refetches it right away
+    assert len(out['ONE']) == 30
+    assert data_fetcher.get_cache_stats()['throttle_events'] == before + 1
+    assert data_fetcher._negative_reason('ONE', '1mo', '1d') is None
+
+
+def test_bulk_fetch_learns_sessions_and_serves_stale(fake_yahoo, monkeypatch):
+    import asyncio
+
+    class MetaTicker(SlowTicker):
+        history_metadata = NY_META
+
+    downloads = []
+    monkeypatch.setattr(data_fetcher, 'get_ticker', MetaTicker)
+    monkeypatch.setattr(data_fetcher.yf, 'download',
+                        lambda chunk, **kw: downloads.append(list(chunk)) or pd.concat({t: make_history() for t in chunk}, axis=1))
+    monkeypatch.setattr(data_fetcher, '_history_meta', {})
+    # first sight: fetched one by one so the exchange session gets recorded
+    asyncio.run(data_fetcher.fetch_histories(['NEW1', 'NEW2'], period='1mo'))
+    assert downloads == [] and data_fetcher.get_history_metadata('NEW1') == NY_META
+    # expired in memory: served at once as stale while a background refresh runs
+    monkeypatch.setattr(data_fetcher, '_STALE_WHILE_REVALIDATE', True)
+    monkeypatch.setattr(data_fetcher, '_CACHE_TTL', 0)
+    t0 = time.perf_counter()
+    out = asyncio.run(data_fetcher.fetch_histories(['NEW1', 'NEW2'], period='1mo'))
+    assert time.perf_counter() - t0 < 0.15
+    assert all(df.attrs['fresh'] is False and len(df) == 30 for df in out.values())
+    deadline = time.monotonic() + 3
+    while data_fetcher._revalidating:
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    assert downloads == []
+
+
+def test_stale_while_revalidate_serves_stale_and_refreshes(fake_yahoo, monkeypatch):
+    monkeypatch.setattr(data_fetcher, '_STALE_WHILE_REVALIDATE', True)
+    old = make_history()
+    data_fetcher._HISTORY_CACHE[('SWR', '1y', '1d')] = (time.time() - data_fetcher._CACHE_TTL - 1, old)
+    t0 = time.monotonic()
+    df = data_fetcher.get_history('SWR', period='1y')
+    assert time.monotonic() - t0 < 0.15  # did not wait for SlowTicker's 0.2s download
+    assert df.attrs['fresh'] is False
+    deadline = time.monotonic() + 3
+    while SlowTicker.calls == 0 or data_fetcher._revalidating:
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    assert data_fetcher.get_history('SWR', period='1y').attrs['fresh'] is True
+    assert SlowTicker.calls == 1
+
+
+@pytest.fixture
+def sqlite_cache(monkeypatch, tmp_path):
+    import queue
+    monkeypatch.setattr(data_fetcher, '_USE_SQLITE_CACHE', True)
+    monkeypatch.setattr(data_fetcher, '_SQLITE_CACHE_PATH', str(tmp_path / 'cache.sqlite'))
+    monkeypatch.setattr(data_fetcher, '_conn_pool', queue.Queue(maxsize=2))
+    data_fetcher._init_sqlite_cache()
+    data_fetcher._HISTORY_CACHE.clear()
+    yield
+    data_fetcher.flush_sqlite_writes(5)
+    data_fetcher._HISTORY_CACHE.clear()
+
+
+def test_chunk_is_written_in_one_batch(sqlite_cache):
+    frames = {t: make_history() for t in ('AAA', 'BBB', 'CCC')}
+    before = data_fetcher._metrics.get('sqlite_write_batches')
+    data_fetcher._store_histories(frames, '1mo', '1d')
+    # queued frames are readable before the writer commits them
+    assert data_fetcher._get_sqlite_cache('BBB|1mo|1d') is not None
+    assert data_fetcher.flush_sqlite_writes(5)
+    assert data_fetcher._metrics.get('sqlite_write_batches') - before == 1
+    assert not data_fetcher._pending_writes
+    ts, df = data_fetcher._get_sqlite_cache('CCC|1mo|1d')
+    pd.testing.assert_frame_equal(df, frames['CCC'], check_freq=False)
+
+
+def test_maintenance_evicts_least_recently_used(sqlite_cache):
+    data_fetcher._store_histories({t: make_history() for t in ('AAA', 'BBB', 'CCC')}, '1mo', '1d')
+    data_fetcher.flush_sqlite_writes(5)
+    time.sleep(0.01)
+    assert data_fetcher._get_sqlite_cache('AAA|1mo|1d') is not None  # AAA is now the most recent
+    size = data_fetcher.run_cache_maintenance(max_age=3600)['payload_bytes']
+    report = data_fetcher.run_cache_maintenance(max_bytes=size // 2, max_age=3600)
+    assert report['evicted'] == 2
+    assert report['entries'] == 1
+    assert data_fetcher._get_sqlite_cache('AAA|1mo|1d') is not None
+    assert data_fetcher._get_sqlite_cache('BBB|1mo|1d') is None
+    assert data_fetcher.get_cache_stats()['sqlite_cache_entries'] == 1
+
+
+def test_shared_cache_serves_other_processes(fake_yahoo, monkeypatch, tmp_path):
+    from app import shared_cache
+    monkeypatch.setattr(data_fetcher, '_USE_SHARED_CACHE', True)
+    monkeypatch.setattr(data_fetcher, '_shared', shared_cache.SharedHistoryCache(str(tmp_path / 'shm')))
+    first = data_fetcher.get_history('AAA', period='1mo')
+    assert SlowTicker.calls == 1
+    # a fresh process starts with an empty in-memory cache but maps the same file
+    data_fetcher._HISTORY_CACHE.clear()
+    again = data_fetcher.get_history('AAA', period='1mo')
+    assert SlowTicker.calls == 1
+    pd.testing.assert_frame_equal(again, first, check_freq=False)
+    ts, mapped = data_fetcher._shared.get('AAA|1mo|1d')
+    assert not mapped['Close'].to_numpy().flags.writeable
+
+
+class YFTzMissingError(Exception):
+    pass
+
+
+class YFPricesMissingError(Exception):
+    pass
+
+
+class YFDataException(Exception):
+    pass
+
+
+@pytest.fixture
+def fresh_breaker(monkeypatch):
+    from app.circuit_breaker import CircuitBreaker, NegativeCache
+    monkeypatch.setattr(data_fetcher, '_breaker', CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    monkeypatch.setattr(data_fetcher, '_negative', NegativeCache(ttl=60))
+
+
+def test_bad_symbol_is_negatively_cached(fake_yahoo, fresh_breaker, monkeypatch):
+    calls = []
+
+    class BadTicker:
+        def __init__(self, symbol):
+            pass
+
+        def history(self, **kw):
+            calls.append(kw)
+            raise YFTzMissingError('$ZZZZ: possibly delisted; no timezone found')
+
+    monkeypatch.setattr(data_fetcher, 'get_ticker', BadTicker)
+    assert data_fetcher.get_history('ZZZZ', period='1y').empty
+    assert data_fetcher.get_history('ZZZZ', period='1mo').empty
+    assert len(calls) == 1
+    assert data_fetcher._breaker.state == 'closed'
+
+
+def test_missing_prices_are_cached_briefly(fake_yahoo, fresh_breaker, monkeypatch):
+    class GapTicker:
+        def __init__(self, symbol):
+            pass
+
+        def history(self, **kw):
+            raise YFPricesMissingError('$GAP: possibly delisted; no price data found (1d 1mo)')
+
+    monkeypatch.setattr(data_fetcher, 'get_ticker', GapTicker)
+    monkeypatch.setattr(data_fetcher, '_NEGATIVE_PRICE_TTL', 0.05)
+    assert data_fetcher.get_history('GAP', period='1mo').empty
+    assert data_fetcher._negative_reason('GAP', '1mo', '1d')
+    time.sleep(0.06)
+    assert data_fetcher._negative_reason('GAP', '1mo', '1d') is None
+
+
+def test_breaker_serves_stale_during_outage(fake_yahoo, fresh_breaker, monkeypatch):
+    good = data_fetcher.get_history('AAA', period='1mo')
+    calls = []
+
+    class DownTicker:
+        def __init__(self, symbol):
+            pass
+
+        def history(self, **kw):
+            calls.append(kw)
+            raise YFDataException('*** YAHOO! FINANCE IS CURRENTLY DOWN! ***')
+
+    monkeypatch.setattr(data_fetcher, 'get_ticker', DownTicker)
+    monkeypatch.setattr(data_fetcher, '_CACHE_TTL', 0)
+    for t in ('BBB', 'CCC'):
+        with pytest.raises(Exception):
+            data_fetcher.get_history(t, period='1mo')
+    assert data_fetcher._breaker.state == 'open'
+    stale = data_fetcher.get_history('AAA', period='1mo')
+    assert len(calls) == 2
+    assert stale.attrs['fresh'] is False
+    pd.testing.assert_frame_equal(stale, good, check_freq=False, check_flags=False)
+
+
+def test_cache_hits_share_data_without_exposing_the_cache(fake_yahoo):
+    first = data_fetcher.get_history('AAA', period='1mo')
+    second = data_fetcher.get_history('AAA', period='1mo')
+    assert second is not first
+    assert np.shares_memory(first['Close'].to_numpy(), second['Close'].to_numpy())
+    try:
+        second.loc[second.index[-1], 'Close'] = -1.0
+    except ValueError:
+        pass  # read-only arrays without copy-on-write
+    third = data_fetcher.get_history('AAA', period='1mo')
+    assert third['Close'].iloc[-1] != -1.0
+
+
+def test_freeze_without_copy_on_write_keeps_the_frame(monkeypatch):
+    monkeypatch.setattr(data_fetcher, '_COPY_ON_WRITE', False)
+    df = make_history()
+    df['Note'] = pd.array(['x'] * len(df), dtype='string')
+    df.attrs['src'] = 'test'
+    frozen = data_fetcher._freeze(df)
+    pd.testing.assert_frame_equal(frozen, df)
+    assert frozen.attrs == {'src': 'test'}
+    assert not frozen['Close'].to_numpy().flags.writeable
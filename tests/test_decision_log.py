@@ -0,0 +1,43 @@
+import json
+
+from app.decision_log import DecisionLogSink
+from app.indicators import calc_peg
+from app import decision_log
+
+
+def _lines(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_sink_batches_in_background_and_dedupes_per_session(tmp_path):
+    path = str(tmp_path / 'peg.log')
+    sink = DecisionLogSink(path=path, async_writes=True)
+    for _ in range(3):
+        sink.submit('peg', 'AAA', 'pegRatio', 1.2, 'used pegRatio directly')
+    sink.submit('peg', 'AAA', 'pegRatio', 1.3, 'used pegRatio directly')
+    sink.submit('peg', 'BBB', 'estimated', {'pe': 20.0, 'growth_pct': 10.0}, 'estimated')
+    assert sink.flush(5.0)
+    recs = _lines(path)
+    assert [(r['symbol'], r['value']) for r in recs] == [('AAA', 1.2), ('AAA', 1.3), ('BBB', {'pe': 20.0, 'growth_pct': 10.0})]
+    sink.new_session()
+    sink.submit('peg', 'AAA', 'pegRatio', 1.2, 'used pegRatio directly')
+    assert sink.flush(5.0)
+    assert len(_lines(path)) == 4
+    sink.close()
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path, monkeypatch):
+    sink = DecisionLogSink(path=str(tmp_path / 'peg.log'), queue_size=1)
+    monkeypatch.setattr(sink, '_start', lambda: None)  # no writer: the queue stays full
+    dropped = decision_log._metrics.get('decision_log_dropped')
+    sink.submit('peg', 'AAA', 'pegRatio', 1.0)
+    sink.submit('peg', 'AAA', 'pegRatio', 2.0)
+    assert decision_log._metrics.get('decision_log_dropped') == dropped + 1
+
+
+def test_indicators_log_through_the_sink(monkeypatch):
+    seen = []
+    monkeypatch.setattr(decision_log.sink, 'submit', lambda *a, **kw: seen.append(a))
+    assert calc_peg({'symbol': 'AAA', 'pegRatio': 1.5}) == 1.5
+    assert seen == [('peg', 'AAA', 'pegRatio', 1.5, 'used pegRatio directly')]
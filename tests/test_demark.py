@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from app import demark
+
+
+def _bars(n=120, tickers=3, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, tickers)), axis=0))
+    open_ = close * (1 + rng.normal(0, 0.01, close.shape))
+    open_[5, 0] = close[5, 0]  # a doji
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, close.shape))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, close.shape))
+    return open_, high, low, close
+
+
+def _conditional(o, h, l, c):
+    # the scalar version stock_analysis and the GUI used
+    if c > o:
+        pivot = (h * 2 + l + c) / 4
+    elif c < o:
+        pivot = (h + l * 2 + c) / 4
+    else:
+        pivot = (h + l + c * 2) / 4
+    return pivot, pivot * 2 - h, pivot * 2 - l
+
+
+def test_both_variants_match_scalar_formulas():
+    o, h, l, c = _bars()
+    cond = demark.levels(o, h, l, c, variant=demark.CONDITIONAL)
+    simple = demark.levels(None, h, l, c, variant=demark.SIMPLE)
+    for i in range(o.shape[0]):
+        for j in range(o.shape[1]):
+            pivot, buy, sell = _conditional(o[i, j], h[i, j], l[i, j], c[i, j])
+            assert abs(cond['pivot'][i, j] - pivot) < 1e-9
+            assert abs(cond['buy_limit'][i, j] - buy) < 1e-9
+            assert abs(cond['sell_limit'][i, j] - sell) < 1e-9
+            x = h[i, j] + l[i, j] + c[i, j]
+            assert abs(simple['support'][i, j] - (x / 2 - h[i, j])) < 1e-9
+            assert abs(simple['resistance'][i, j] - (x / 2 - l[i, j])) < 1e-9
+
+
+def test_limit_entries_match_bar_by_bar_loop():
+    o, h, l, c = _bars()
+    res = demark.limit_entries(o, h, l, c)
+    assert not res['filled'][0].any()
+    for i in range(1, o.shape[0]):
+        for j in range(o.shape[1]):
+            _, buy, _ = _conditional(o[i - 1, j], h[i - 1, j], l[i - 1, j], c[i - 1, j])
+            if l[i, j] <= buy:
+                entry = min(o[i, j], buy)
+                assert res['filled'][i, j]
+                assert abs(res['ret'][i, j] - (c[i, j] / entry - 1)) < 1e-12
+            else:
+                assert not res['filled'][i, j] and np.isnan(res['ret'][i, j])
+
+
+def test_ohlc_panel_from_histories():
+    o, h, l, c = _bars(n=10, tickers=1)
+    idx = pd.date_range('2024-01-01', periods=10, freq='B')
+    df = pd.DataFrame({'Open': o[:, 0], 'High': h[:, 0], 'Low': l[:, 0], 'Close': c[:, 0]}, index=idx)
+    p = demark.ohlc_panel({'AAA': df, 'BBB': df.iloc[:4]})
+    lv = demark.next_bar_levels(p['Open'].values, p['High'].values, p['Low'].values, p['Close'].values)
+    expected = _conditional(o[8, 0], h[8, 0], l[8, 0], c[8, 0])
+    assert abs(lv['buy_limit'][-1, 0] - expected[1]) < 1e-9
+    assert abs(lv['buy_limit'][-1, 1] - _conditional(o[2, 0], h[2, 0], l[2, 0], c[2, 0])[1]) < 1e-9
@@ -0,0 +1,43 @@
+import pickle
+import numpy as np
+import pandas as pd
+
+from app import frame_codec
+
+
+def make_df(days=30):
+    idx = pd.date_range('2024-01-01', periods=days, freq='B', tz='Asia/Seoul', name='Date')
+    price = np.linspace(100.0, 130.0, days)
+    return pd.DataFrame({'Open': price, 'High': price + 1, 'Low': price - 1, 'Close': price,
+                         'Volume': np.arange(days, dtype='int64')}, index=idx)
+
+
+def test_roundtrip_preserves_frame():
+    df = make_df()
+    out = frame_codec.decode(frame_codec.encode(df))
+    pd.testing.assert_frame_equal(out, df, check_freq=False)
+
+
+def test_decode_is_zero_copy_view():
+    blob = frame_codec.encode(make_df())
+    out = frame_codec.decode(blob)
+    assert not out['Close'].to_numpy().flags.writeable
+
+
+def test_legacy_pickle_blob_still_decodes():
+    df = make_df()
+    pd.testing.assert_frame_equal(frame_codec.decode(pickle.dumps(df)), df)
+
+
+def test_multiindex_columns_fall_back_to_pickle():
+    df = pd.DataFrame({('Close', 'AAA'): [1.0, 2.0], ('Close', 'BBB'): [3.0, 4.0]})
+    blob = frame_codec.encode(df)
+    assert not blob.startswith(frame_codec.MAGIC)
+    pd.testing.assert_frame_equal(frame_codec.decode(blob), df)
+
+
+def test_read_file_memory_maps(tmp_path):
+    df = make_df()
+    path = str(tmp_path / 'aaa.yfc')
+    frame_codec.write_file(path, df)
+    pd.testing.assert_frame_equal(frame_codec.read_file(path), df, check_freq=False)
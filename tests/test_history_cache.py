@@ -0,0 +1,47 @@
+import time
+import numpy as np
+import pandas as pd
+
+from app.history_cache import HistoryCache, frame_nbytes
+
+
+def frame(rows=100):
+    return pd.DataFrame({'Close': np.arange(rows, dtype=float)})
+
+
+def test_evicts_least_recently_used_over_budget():
+    size = frame_nbytes(frame())
+    cache = HistoryCache(max_bytes=size * 2 + 1)
+    now = time.time()
+    cache['a'] = (now, frame())
+    cache['b'] = (now, frame())
+    assert cache.get('a') is not None  # touch a, so b is now the LRU entry
+    cache['c'] = (now, frame())
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    st = cache.stats()
+    assert st['evictions'] == 1 and st['bytes'] <= st['max_bytes']
+
+
+def test_old_entries_expire():
+    cache = HistoryCache(max_bytes=10 ** 9, max_age=60)
+    cache['old'] = (time.time() - 120, frame())
+    cache['new'] = (time.time(), frame())
+    assert cache.get('old') is None
+    assert cache.get('new') is not None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_oversize_frame_is_not_cached():
+    cache = HistoryCache(max_bytes=16)
+    cache['big'] = (time.time(), frame())
+    assert len(cache) == 0 and cache.stats()['oversize'] == 1
+
+
+def test_evicted_entries_are_handed_to_on_evict():
+    size = frame_nbytes(frame())
+    evicted = []
+    cache = HistoryCache(max_bytes=size + 1, on_evict=lambda k, ts, df: evicted.append(k))
+    cache['a'] = (time.time(), frame())
+    cache['b'] = (time.time(), frame())
+    assert evicted == ['a']
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from app.indicator_memo import IndicatorMemo, data_version
+
+
+def _close(n=30):
+    return pd.Series(np.arange(n, dtype=float), index=pd.date_range('2024-01-01', periods=n, freq='B'))
+
+
+def test_memo_hits_until_data_version_changes():
+    memo = IndicatorMemo()
+    calls = []
+
+    def compute(s):
+        calls.append(len(s))
+        return float(s.mean())
+
+    close = _close()
+    for _ in range(3):
+        assert memo.get('AAA', 'ma', (20,), data_version(close), lambda: compute(close)) == close.mean()
+    assert calls == [30]
+    # a tick revising the latest bar and a new bar both invalidate
+    revised = close.copy()
+    revised.iloc[-1] = 100.0
+    memo.get('AAA', 'ma', (20,), data_version(revised), lambda: compute(revised))
+    longer = _close(31)
+    memo.get('AAA', 'ma', (20,), data_version(longer), lambda: compute(longer))
+    # other params are separate entries
+    memo.get('AAA', 'ma', (50,), data_version(longer), lambda: compute(longer))
+    assert calls == [30, 30, 31, 31]
+    st = memo.stats()
+    assert st['ma'] == {'hits': 2, 'misses': 4, 'hit_ratio': 2 / 6}
+    assert st['total']['invalidations'] == 2
+    assert st['total']['entries'] == 2
+
+
+def test_memo_is_bounded_and_returns_copies_of_dicts():
+    memo = IndicatorMemo(max_entries=2)
+    close = _close()
+    v = data_version(close)
+    levels = memo.get('AAA', 'demark', (), v, lambda: {'pivot': 1.0})
+    levels['pivot'] = 99.0
+    assert memo.get('AAA', 'demark', (), v, lambda: {'pivot': 2.0}) == {'pivot': 1.0}
+    memo.get('BBB', 'demark', (), v, lambda: {})
+    memo.get('CCC', 'demark', (), v, lambda: {})
+    assert memo.stats()['total']['entries'] == 2
+
+
+def test_data_version_sees_revisions_before_the_last_bar():
+    ohlc = pd.DataFrame({'High': np.arange(30.0) + 1, 'Low': np.arange(30.0), 'Close': np.arange(30.0) + 0.5},
+                        index=pd.date_range('2024-01-01', periods=30, freq='B'))
+    v = data_version(ohlc)
+    assert data_version(ohlc.copy()) == v
+    prev_bar = ohlc.copy()
+    prev_bar.iloc[-2, 0] = 50.0
+    assert data_version(prev_bar) != v
+    # a 2:1 split back-adjusts every bar before the last one
+    adjusted = ohlc.copy()
+    adjusted.iloc[:-1] = adjusted.iloc[:-1] / 2
+    assert data_version(adjusted) != v
+
+
+def test_memo_stats_are_part_of_the_cache_stats():
+    from app import data_fetcher
+    stats = data_fetcher.get_cache_stats()
+    for k in ('indicator_memo_hits', 'indicator_memo_misses', 'indicator_memo_entries', 'indicator_memo_hit_ratio'):
+        assert k in stats
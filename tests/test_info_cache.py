@@ -0,0 +1,37 @@
+import time
+
+from app import info_cache
+from app.info_cache import InfoCache, STATIC, FUNDAMENTAL, PRICE
+
+
+INFO = {'symbol': 'AAA', 'sector': 'Technology', 'pegRatio': 1.2, 'regularMarketPrice': 101.5}
+
+
+def test_field_classes():
+    assert info_cache.field_class('sector') == STATIC
+    assert info_cache.field_class('regularMarketPrice') == PRICE
+    assert info_cache.field_class('pegRatio') == FUNDAMENTAL
+    assert info_cache.classes_for(['sector', 'industry']) == (STATIC,)
+
+
+def test_stale_price_does_not_invalidate_profile(tmp_path):
+    cache = InfoCache(str(tmp_path / 'info.sqlite'), ttls={PRICE: 0.05})
+    cache.put('AAA', INFO)
+    time.sleep(0.1)
+    assert cache.get('AAA', (PRICE,)) is None
+    assert cache.get('AAA', (STATIC, FUNDAMENTAL))['sector'] == 'Technology'
+
+
+def test_entries_survive_restart(tmp_path):
+    path = str(tmp_path / 'info.sqlite')
+    InfoCache(path).put('AAA', INFO)
+    warm = InfoCache(path)
+    assert warm.get('AAA', (STATIC,)) == INFO
+
+
+def test_database_is_opened_on_first_use(tmp_path):
+    path = tmp_path / 'sub' / 'info.sqlite'
+    cache = InfoCache(str(path))
+    assert not path.exists()
+    assert cache.get('AAA') is None
+    assert path.exists()
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import market_context
+from app.strategy import evaluate_ticker
+
+
+def _closes(n=30):
+    idx = pd.date_range('2024-01-01', periods=n, freq='D')
+    return pd.DataFrame({'Close': np.linspace(100.0, 100.0 + n - 1, n)}, index=idx)
+
+
+def test_context_fetches_once_and_memoizes_returns(monkeypatch):
+    calls = {'vix': 0, 'bulk': [], 'single': []}
+
+    def fake_vix():
+        calls['vix'] += 1
+        return 18.5
+
+    def fake_histories(symbols, period='1y', **kw):
+        calls['bulk'].append(list(symbols))
+        return {s: _closes() for s in symbols if s == '^IXIC'}
+
+    def fake_history(symbol, period='1y', **kw):
+        calls['single'].append(symbol)
+        return _closes()
+
+    monkeypatch.setattr(market_context, 'get_vix', fake_vix)
+    monkeypatch.setattr(market_context, 'get_histories', fake_histories)
+    monkeypatch.setattr(market_context, 'get_history', fake_history)
+
+    ctx = market_context.build_market_context(['^IXIC'])
+    assert ctx.vix == 18.5
+    expected = 129.0 / 109.0 - 1
+    for _ in range(5):
+        assert abs(ctx.benchmark_return('^IXIC', 20) - expected) < 1e-12
+    # a benchmark missing from the bulk fetch is fetched lazily, once
+    ctx.benchmark_return('^KS11')
+    ctx.benchmark_return('^ks11')
+    assert calls['vix'] == 1
+    assert calls['bulk'] == [['^IXIC']]
+    assert calls['single'] == ['^KS11']
+
+
+def test_evaluate_ticker_takes_vix_from_context(monkeypatch):
+    from app import strategy
+    monkeypatch.setattr(strategy, 'get_history', lambda *a, **kw: pd.DataFrame())
+    monkeypatch.setattr(strategy, 'get_quote', lambda *a, **kw: {'last': 100.0, 'info': {}})
+    r = evaluate_ticker('AAPL', context=market_context.MarketContext(42.0, {}))
+    assert r['grade'] == 'F'
+    assert r['reasons'][0].startswith('VIX 42.0')
+
+
+def test_stock_analysis_uses_the_shared_context(monkeypatch):
+    from app import stock_analysis
+    n = 60
+    idx = pd.date_range('2024-01-01', periods=n, freq='B')
+    price = np.linspace(100.0, 130.0, n)
+    hist = pd.DataFrame({'Open': price, 'High': price + 1, 'Low': price - 1, 'Close': price}, index=idx)
+    fetched = []
+    monkeypatch.setattr(stock_analysis, 'get_history', lambda t, period='1y', **kw: (fetched.append(t), hist)[1])
+    monkeypatch.setattr(stock_analysis, 'get_info', lambda t, **kw: {'pegRatio': 1.0})
+    monkeypatch.setattr(stock_analysis, 'build_market_context', lambda **kw: pytest.fail('context rebuilt'))
+    context = market_context.MarketContext(35.0, {'^KS11': _closes()})
+    out = stock_analysis.analyze_stock_logic('AAA', benchmark_ticker='^KS11', context=context)
+    assert fetched == ['AAA']
+    assert 'vix_high' in out['reasons'] and out['rating'] == 'A-CLASS'
@@ -0,0 +1,46 @@
+import pandas as pd
+
+from app.market_schedule import RefreshScheduler, market_for, market_state, session_for, SESSIONS
+
+
+def ny(s):
+    return pd.Timestamp(s, tz='America/New_York').timestamp()
+
+
+def test_market_for_suffixes():
+    assert market_for('AAPL') == 'US'
+    assert market_for('005930.KS') == 'KR'
+    assert market_for('^KS11') == 'KR'
+    assert session_for('7203.T').tz == 'Asia/Tokyo'
+
+
+def test_market_state_over_weekend():
+    is_open, last_close, next_open = market_state(SESSIONS['US'], ny('2026-10-17 12:00'))  # Saturday
+    assert not is_open
+    assert last_close == ny('2026-10-16 16:00')
+    assert next_open == ny('2026-10-19 09:30')
+
+
+def test_open_cadence_then_once_after_close_then_prefetch():
+    s = RefreshScheduler(['AAPL'], open_interval=60, post_close_grace=900, prefetch_lead=900)
+    assert s.due(ny('2026-10-14 11:00')) == ['AAPL']  # never refreshed
+    s.mark_refreshed(['AAPL'], ny('2026-10-14 11:00'))
+    assert s.due(ny('2026-10-14 11:00:30')) == []
+    assert s.due(ny('2026-10-14 11:01:01')) == ['AAPL']
+
+    s.mark_refreshed(['AAPL'], ny('2026-10-14 15:59:30'))
+    assert s.due(ny('2026-10-14 16:05')) == []
+    assert s.due(ny('2026-10-14 16:16')) == ['AAPL']
+    s.mark_refreshed(['AAPL'], ny('2026-10-14 16:16'))
+    # nothing until the pre-open prefetch
+    assert s.due(ny('2026-10-14 22:00')) == []
+    assert s.seconds_until_due(ny('2026-10-14 22:00')) == ny('2026-10-15 09:15') - ny('2026-10-14 22:00')
+    assert s.due(ny('2026-10-15 09:15')) == ['AAPL']
+
+
+def test_metadata_overrides_static_session():
+    start = pd.Timestamp('2026-10-14 10:00', tz='Asia/Seoul').timestamp()
+    meta = {'exchangeTimezoneName': 'Asia/Seoul',
+            'currentTradingPeriod': {'regular': {'start': start, 'end': start + 3600}}}
+    sess = session_for('005930.KS', meta)
+    assert sess.open.hour == 10 and sess.close.hour == 11
@@ -0,0 +1,39 @@
+import json
+import threading
+
+from app.metrics import MetricsRegistry
+
+
+def test_counters_are_atomic_across_threads():
+    reg = MetricsRegistry()
+
+    def work():
+        for _ in range(10000):
+            reg.incr('hits')
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert reg.get('hits') == 80000
+
+
+def test_latency_percentiles_and_slow_calls(tmp_path):
+    reg = MetricsRegistry(slow_threshold=0.5)
+    for i in range(1, 101):
+        reg.observe('fetch_history', i / 1000.0, 'AAA')  # 1ms .. 100ms
+    reg.observe('fetch_history', 2.0, 'SLOW')
+    h = reg.histograms()['fetch_history']
+    assert h['count'] == 101
+    assert 0.04 <= h['p50_s'] <= 0.06
+    assert 0.09 <= h['p95_s'] <= 0.11
+    assert h['max_s'] == 2.0
+    slow = reg.slow_calls()
+    assert [r['label'] for r in slow] == ['SLOW']
+
+    path = reg.dump(str(tmp_path / 'm.json'))
+    with open(path, encoding='utf-8') as f:
+        snap = json.load(f)
+    assert snap['slow_by_label']['SLOW']['count'] == 1
+    assert 'fetch_history' in snap['latency']
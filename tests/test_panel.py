@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from app import indicators, panel
+
+
+def _histories(seed=0, count=6):
+    rng = np.random.default_rng(seed)
+    out = {}
+    for i in range(count):
+        n = int(rng.integers(5, 260))
+        idx = pd.date_range('2024-01-01', periods=n, freq='B', tz='America/New_York')
+        out[f'T{i}'] = pd.DataFrame({'Close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))}, index=idx)
+    out['EMPTY'] = pd.DataFrame()
+    return out
+
+
+def _same(expected, got):
+    if expected is None:
+        return np.isnan(got)
+    return abs(expected - got) < 1e-9
+
+
+def test_bar_aligned_panel_matches_per_ticker_indicators():
+    hists = _histories()
+    p = panel.build_panel(hists)
+    r = panel.compute(p, ma_windows=(20, 200), rsi_window=14, return_periods=(20,))
+    for j, t in enumerate(p.tickers):
+        close = hists[t]['Close'] if not hists[t].empty else None
+        assert _same(indicators.ma(close, 20), panel.last(r['ma20'])[j])
+        assert _same(indicators.ma(close, 200), panel.last(r['ma200'])[j])
+        assert _same(indicators.rsi(close, 14), panel.last(r['rsi14'])[j])
+        ret = close.pct_change(20).iloc[-1] if close is not None and len(close) > 20 else None
+        assert _same(ret, panel.last(r['ret20'])[j])
+
+
+def test_sma_matches_pandas_rolling_with_gaps():
+    hists = _histories(seed=1)
+    p = panel.build_panel(hists, align='dates')
+    frame = panel.to_frame(p, p.values)
+    expected = frame.rolling(20).mean().to_numpy()
+    np.testing.assert_allclose(panel.sma(p.values, 20), expected, rtol=1e-9, equal_nan=True)
+
+
+def test_date_alignment_joins_exchanges_on_local_date():
+    us = pd.DataFrame({'Close': [1.0, 2.0]}, index=pd.DatetimeIndex(['2024-03-04', '2024-03-05']).tz_localize('America/New_York'))
+    kr = pd.DataFrame({'Close': [10.0, 11.0]}, index=pd.DatetimeIndex(['2024-03-05', '2024-03-06']).tz_localize('Asia/Seoul'))
+    p = panel.build_panel({'AAPL': us, '005930.KS': kr}, align='dates')
+    assert list(p.index.strftime('%Y-%m-%d')) == ['2024-03-04', '2024-03-05', '2024-03-06']
+    np.testing.assert_array_equal(p.values, [[1.0, np.nan], [2.0, 10.0], [np.nan, 11.0]])
+    assert abs(panel.gap_pct(np.array([110.0]), np.array([100.0]))[0] - 10.0) < 1e-9
+    assert np.isnan(panel.gap_pct(np.array([1.0]), np.array([0.0]))[0])
+
+
+def test_multi_window_kernel_matches_rolling_for_series_and_panel():
+    hists = _histories(seed=2)
+    close = hists['T0']['Close'].copy()
+    close.iloc[-30] = np.nan
+    mas = indicators.moving_averages(close, (20, 50, 200))
+    for w in (20, 50, 200):
+        expected = close.rolling(w).mean().iloc[-1] if len(close) >= w else None
+        if expected is None or np.isnan(expected):
+            assert mas[w] is None or np.isnan(mas[w])
+        else:
+            assert abs(mas[w] - expected) < 1e-9
+    p = panel.build_panel(hists, align='dates')
+    multi = panel.sma_windows(p.values, (20, 50))
+    for w in (20, 50):
+        np.testing.assert_allclose(multi[w], panel.to_frame(p, p.values).rolling(w).mean().to_numpy(), rtol=1e-9, equal_nan=True)
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from app.periods import covers, period_start, slice_period
+
+
+NOW = pd.Timestamp('2024-06-14 15:00', tz='UTC')
+
+
+def test_covers_orders_periods():
+    assert covers('1y', '3mo', NOW)
+    assert covers('max', '10y', NOW)
+    assert covers('1mo', '5d', NOW)
+    assert not covers('3mo', '1y', NOW)
+    assert not covers('5d', '1mo', NOW)
+    assert not covers('1y', 'max', NOW)
+
+
+def test_ytd_early_in_year_does_not_cover_sessions():
+    jan = pd.Timestamp('2024-01-03', tz='UTC')
+    assert not covers('ytd', '5d', jan)
+    assert covers('ytd', '5d', NOW)
+
+
+def test_slice_period_counts_sessions_for_day_periods():
+    idx = pd.date_range(end='2024-06-14', periods=60, freq='B', tz='America/New_York')
+    df = pd.DataFrame({'Close': range(60)}, index=idx)
+    assert len(slice_period(df, '5d', NOW)) == 5
+    sliced = slice_period(df, '1mo', NOW)
+    assert sliced.index[0] >= period_start('1mo', NOW)
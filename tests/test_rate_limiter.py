@@ -0,0 +1,49 @@
+import threading
+import time
+
+from app.rate_limiter import AdaptiveRateLimiter, is_rate_limit_error
+
+
+def test_throttle_cuts_rate_and_success_recovers():
+    lim = AdaptiveRateLimiter(4.0, increase=1.0)
+    lim.on_throttle('chart')
+    assert lim.stats()['chart']['rate'] == 2.0
+    assert lim.stats()['chart']['throttles'] == 1
+    # other endpoints are unaffected
+    assert lim.stats()['quoteSummary']['rate'] == 4.0
+    lim.on_success('chart')
+    lim.on_success('chart')
+    lim.on_success('chart')
+    assert lim.stats()['chart']['rate'] == 4.0
+
+
+def test_acquire_waits_for_next_token():
+    lim = AdaptiveRateLimiter(10.0)
+    for _ in range(10):
+        assert lim.try_acquire('chart') == 0.0
+    t0 = time.monotonic()
+    assert lim.acquire('chart')
+    assert 0.05 <= time.monotonic() - t0 < 0.5
+    assert lim.stats()['chart']['waits'] == 1
+
+
+def test_acquire_timeout_and_concurrent_waiters():
+    lim = AdaptiveRateLimiter(1.0, min_rate=1.0)
+    assert lim.try_acquire('quote') == 0.0
+    assert not lim.acquire('quote', timeout=0.05)
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(lim.acquire('quote', timeout=1.5))) for _ in range(2)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    # one token per second: only one of the two waiters gets through within the timeout
+    assert sorted(got) == [False, True]
+
+
+def test_is_rate_limit_error():
+    class YFRateLimitError(Exception):
+        pass
+    assert is_rate_limit_error(YFRateLimitError('Too Many Requests. Rate limited. Try after a while.'))
+    assert is_rate_limit_error(Exception('HTTP Error 429'))
+    assert not is_rate_limit_error(Exception('No timezone found'))
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from app import sector
+
+
+def test_sector_stats_compute_all_windows_from_dataframe_histories(monkeypatch):
+    idx = pd.date_range('2024-01-01', periods=250, freq='B')
+    hists = {'AAA': pd.DataFrame({'Close': np.arange(250, dtype=float)}, index=idx),
+             'BBB': pd.DataFrame({'Close': np.full(10, 5.0)}, index=idx[:10])}
+    monkeypatch.setattr(sector, 'get_histories', lambda tickers, **kw: hists)
+    monkeypatch.setattr(sector, 'get_info', lambda t, fields=None: {'sector': 'Tech'})
+    stats = sector.compute_sector_stats(['AAA', 'BBB', 'CCC'], ma_window=20, ma_windows=(200,))
+    # a DataFrame in the batch result is used directly (no truth-value error swallowing it)
+    assert stats['ticker_ma']['AAA'] == np.arange(230, 250).mean()
+    assert stats['ticker_mas']['AAA'][200] == np.arange(50, 250).mean()
+    # short history falls back to the plain mean; MA200 is unavailable
+    assert stats['ticker_ma']['BBB'] == 5.0
+    assert stats['ticker_mas']['BBB'][200] is None
+    assert stats['ticker_ma']['CCC'] is None
+    assert stats['sector_mean_ma']['Tech'] == (np.arange(230, 250).mean() + 5.0) / 2
@@ -0,0 +1,35 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.shared_cache import SharedHistoryCache
+
+
+def make_frame(n=50):
+    idx = pd.date_range('2024-01-01', periods=n, freq='B')
+    return pd.DataFrame({'Close': np.arange(n, dtype=float), 'Volume': np.arange(n, dtype='int64')}, index=idx)
+
+
+def test_put_get_keeps_fetch_time(tmp_path):
+    cache = SharedHistoryCache(str(tmp_path))
+    ts = time.time() - 30
+    cache.put('^VIX|5d|1d', ts, make_frame())
+    got_ts, df = cache.get('^VIX|5d|1d')
+    assert abs(got_ts - ts) < 1e-3
+    pd.testing.assert_frame_equal(df, make_frame(), check_freq=False)
+    assert cache.get('MISSING|5d|1d') is None
+
+
+def test_sweep_by_age_and_size(tmp_path):
+    cache = SharedHistoryCache(str(tmp_path))
+    now = time.time()
+    cache.put('OLD|1y|1d', now - 7200, make_frame())
+    cache.put('A|1y|1d', now - 10, make_frame())
+    cache.put('B|1y|1d', now, make_frame())
+    assert cache.sweep(max_age=3600) == 1
+    size = os.path.getsize(cache._path('B|1y|1d'))
+    assert cache.sweep(max_bytes=size) == 1
+    assert cache.get('A|1y|1d') is None
+    assert cache.get('B|1y|1d') is not None
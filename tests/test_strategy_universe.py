@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from app import strategy
+from app.indicator_memo import memo
+
+
+def _hist(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.001, 0.02, n)))
+    idx = pd.date_range(end='2026-10-16', periods=n, freq='B')
+    return pd.DataFrame({'Open': close * 0.995, 'High': close * 1.01, 'Low': close * 0.98, 'Close': close,
+                         'Volume': 1000}, index=idx)
+
+
+HISTS = {'AAA': _hist(250, 1), 'BBB': _hist(250, 2), 'CCC': _hist(120, 3), 'DDD': pd.DataFrame()}
+INFOS = {'AAA': {'symbol': 'AAA', 'sector': 'Tech', 'pegRatio': 0.8, 'revenueGrowth': 0.2},
+         'BBB': {'symbol': 'BBB', 'sector': 'Tech', 'pegRatio': 2.0, 'revenueGrowth': 0.1},
+         'CCC': {'symbol': 'CCC', 'sector': 'Energy', 'pegRatio': 1.0, 'revenueGrowth': 0.05},
+         'DDD': {'symbol': 'DDD', 'regularMarketPrice': 10.0}}
+
+
+def _quote(t):
+    h = HISTS[t]
+    q = {'info': INFOS[t], 'fresh': True}
+    if h.empty:
+        q.update(last=10.0, open=None, high=None, low=None)
+    else:
+        q.update(last=h['Close'].iloc[-1], open=h['Open'].iloc[-1], high=h['High'].iloc[-1], low=h['Low'].iloc[-1])
+    return q
+
+
+def test_universe_matches_per_ticker_evaluation(monkeypatch):
+    calls = []
+    monkeypatch.setattr(strategy, 'get_histories', lambda ts, period='1y', **kw: calls.append(list(ts)) or dict(HISTS))
+    monkeypatch.setattr(strategy, 'get_info_fresh', lambda t, **kw: (dict(INFOS[t]), True))
+    monkeypatch.setattr(strategy, 'get_history', lambda t, period='1y', **kw: HISTS[t])
+    monkeypatch.setattr(strategy, 'get_quote', _quote)
+    memo.clear()
+
+    out = strategy.evaluate_universe(list(HISTS), vix=15.0, ticker_ma={'OLD': 50.0}, ticker_sector={'OLD': 'Energy'})
+    assert calls == [list(HISTS)]
+    assert set(out['timings']) == {'fetch_histories', 'fetch_info', 'indicators', 'sector_stats', 'grade', 'total'}
+    assert out['ticker_ma']['OLD'] == 50.0
+    assert abs(out['ticker_ma']['CCC'] - HISTS['CCC']['Close'].iloc[-20:].mean()) < 1e-9
+    assert [r['ticker'] for r in out['results']] == list(HISTS)
+
+    memo.clear()
+    for r in out['results']:
+        t = r['ticker']
+        ind = r['indicators']
+        ref = strategy.evaluate_ticker(t, sector_ma20=ind['sector_ma'], vix=15.0)
+        assert r['grade'] == ref['grade']
+        assert r['reasons'] == ref['reasons']
+        for k in ('ma200', 'rsi14', 'last', 'gap_pct', 'peg', 'rev_growth'):
+            a, b = ind[k], ref['indicators'][k]
+            assert (a is None and b is None) or abs(a - b) < 1e-9, (t, k, a, b)
+        for k, v in ref['demark'].items():
+            assert abs(r['demark'][k] - v) < 1e-9
+    assert out['sector_stats']['sector_mean_ma']['Energy'] == (50.0 + out['ticker_ma']['CCC']) / 2
+
+
+def test_universe_reports_stale_inputs(monkeypatch):
+    stale = HISTS['AAA'].copy()
+    stale.attrs['fresh'] = False
+    monkeypatch.setattr(strategy, 'get_histories', lambda ts, **kw: {'AAA': stale, 'BBB': HISTS['BBB'], 'CCC': HISTS['CCC']})
+    monkeypatch.setattr(strategy, 'get_info_fresh', lambda t, **kw: (dict(INFOS[t]), t != 'BBB'))
+    out = strategy.evaluate_universe(['AAA', 'BBB', 'CCC'], vix=15.0)
+    assert [r['fresh'] for r in out['results']] == [False, False, True]
@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.history_cache import HistoryCache
+from app.tiered_cache import ArchiveTier, MemoryTier, Tier, TieredCache
+
+
+def make_history(days=300):
+    idx = pd.date_range(end=pd.Timestamp.today().normalize(), periods=days, freq='B')
+    return pd.DataFrame({'Close': np.linspace(100.0, 130.0, days)}, index=idx)
+
+
+def dict_tier(name, write_through=True):
+    data = {}
+    tier = Tier(name, data.get, lambda items: data.update({k: (ts, df) for k, ts, df in items}),
+                write_through=write_through)
+    tier.data = data
+    return tier
+
+
+def test_hit_in_slow_tier_is_promoted_and_sliced():
+    mem = MemoryTier(HistoryCache(10 ** 9))
+    slow = dict_tier('sqlite')
+    cache = TieredCache([mem, slow])
+    slow.data['AAA|1y|1d'] = (time.time(), make_history())
+    df = cache.lookup('AAA', '1mo', '1d', time.time(), ttl=60)
+    assert df is not None and len(df) < 30
+    # the covering 1y frame now lives in memory too
+    assert mem.cache.get(('AAA', '1y', '1d')) is not None
+    st = cache.stats()
+    assert st['sqlite']['hits'] == 1 and st['memory']['promotions'] == 1
+    assert cache.lookup('AAA', '1y', '1d', time.time(), ttl=60, stop=1) is not None
+
+
+def test_write_through_and_demotion():
+    mem = MemoryTier(HistoryCache(10 ** 9))
+    sqlite = dict_tier('sqlite')
+    archive = dict_tier('archive', write_through=False)
+    cache = TieredCache([mem, sqlite, archive])
+    item = ('AAA|1y|1d', time.time(), make_history())
+    cache.put_through([item], start=1)
+    assert 'AAA|1y|1d' in sqlite.data and not archive.data
+    cache.demote(0, [item])
+    assert 'AAA|1y|1d' in archive.data
+    assert cache.stats()['archive']['demotions'] == 1
+
+
+def test_parquet_archive_tier(tmp_path):
+    pytest.importorskip('pyarrow')
+    from app.parquet_archive import ParquetArchive
+    archive = ParquetArchive(str(tmp_path))
+    tier = ArchiveTier(lambda: archive)
+    hist = make_history()
+    tier.put([('AAA|1y|1d', time.time(), hist)])
+    ts, df = tier.get('AAA|6mo|1d')
+    assert len(df) < len(hist)
+    assert tier.get('AAA|5y|1d') is None  # archive does not reach that far back
+
+
+def test_demoted_stale_frame_keeps_its_age(tmp_path):
+    pytest.importorskip('pyarrow')
+    from app.parquet_archive import ParquetArchive
+    archive = ParquetArchive(str(tmp_path))
+    cache = TieredCache([MemoryTier(HistoryCache(10 ** 9)), ArchiveTier(lambda: archive)])
+    now = time.time()
+    stale = make_history()
+    cache.demote(0, [('AAA|1y|1d', now - 7200, stale)])
+    assert archive.fetched_at('AAA', '1d') == now - 7200
+    assert cache.lookup('AAA', '1y', '1d', now, ttl=60) is None
+
+    # a fresh frame revises the last bar; demoting the stale one again must not undo that
+    fresh = stale.copy()
+    fresh.iloc[-1, 0] = 999.0
+    cache.demote(0, [('AAA|1y|1d', now, fresh)])
+    cache.demote(0, [('AAA|1y|1d', now - 7200, stale)])
+    df = archive.load('AAA', '1d')
+    assert archive.fetched_at('AAA', '1d') == now
+    assert df['Close'].iloc[-1] == 999.0 and len(df) == len(stale)
+    assert cache.lookup('AAA', '1y', '1d', now, ttl=60) is not None